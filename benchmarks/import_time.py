@@ -0,0 +1,67 @@
+"""Measure the time taken to boot Django with djcompanyatlas installed.
+
+Each run starts a fresh interpreter, sets Django up and reports the wall time, then
+lists the slowest imports of the last run (``python -X importtime``).
+
+Usage:
+    python benchmarks/import_time.py [--runs 10] [--settings tests.settings] [--top 15]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BOOT = "import django; django.setup()"
+
+
+def run_once(settings: str, importtime: bool = False) -> tuple[float, str]:
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": settings,
+        "PYTHONPATH": os.pathsep.join(
+            filter(None, [str(ROOT / "src"), str(ROOT), os.environ.get("PYTHONPATH")])
+        ),
+    }
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", BOOT]
+    start = time.perf_counter()
+    process = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, process.stderr
+
+
+def slowest_imports(stderr: str, top: int) -> list[tuple[int, str]]:
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--settings", default="tests.settings")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    run_once(args.settings)  # Warm the filesystem and bytecode caches.
+    timings = [run_once(args.settings)[0] for _ in range(args.runs)]
+    print(
+        f"django.setup(): median {statistics.median(timings) * 1000:.1f} ms, "
+        f"min {min(timings) * 1000:.1f} ms over {args.runs} runs"
+    )
+
+    _, stderr = run_once(args.settings, importtime=True)
+    print("\nSlowest imports (cumulative):")
+    for cumulative, name in slowest_imports(stderr, args.top):
+        print(f"{cumulative / 1000:10.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""Benchmark virtual search, sync, bulk import, referentiel, enrichment and admin rendering.
+
+Benchmarks run against an in-memory test database, with the providers replaced by
+the fake provider (``djcompanyatlas.fake``), so no network access is needed. Results
+are written as JSON and can be compared with a previous run.
+
+Usage:
+    python benchmarks/run.py [--settings tests.settings] [--only search import]
+        [--latency 0.02] [--admin-rows 10000 1000000] [--output results.json]
+        [--compare previous.json]
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS = ROOT / "benchmarks" / "results"
+BENCHMARKS = ["search", "sync", "import", "referentiel", "enrich", "admin"]
+SEED_BATCH_SIZE = 10000
+COMPARED_METRICS = [
+    "median_ms", "p90_ms", "db_queries", "queries_per_s", "rows_per_s", "jobs_per_s",
+]
+
+
+def summarize(samples: list[float]) -> dict[str, Any]:
+    """Median, 90th percentile and extremes of durations, in milliseconds."""
+    samples = sorted(samples)
+    return {
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "p90_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.9))] * 1000, 3),
+        "min_ms": round(samples[0] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+def timed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+@contextmanager
+def fake_providers(**kwargs: Any) -> Iterator[None]:
+    """Replace the providers with one fake provider configured by ``kwargs``."""
+    from django.conf import settings
+    from django.test.utils import override_settings
+
+    from djcompanyatlas.pool import reset_provider_pool
+
+    provider = {"class": "djcompanyatlas.fake.CompanyAtlasFakeProvider", "kwargs": kwargs}
+    companyatlas = {**getattr(settings, "COMPANYATLAS", {}), "PROVIDERS": [provider]}
+    with override_settings(COMPANYATLAS=companyatlas):
+        reset_provider_pool()
+        try:
+            yield
+        finally:
+            reset_provider_pool()
+
+
+def bench_search(args: argparse.Namespace) -> dict[str, Any]:
+    """Virtual search latency, uncached and cached, and throughput."""
+    from djcompanyatlas.models import CompanyAtlasVirtualCompany
+
+    manager = CompanyAtlasVirtualCompany.objects
+    queries = [f"bench {n}" for n in range(args.queries)]
+    results = {}
+    latency = {"latency": args.latency, "latency_jitter": args.latency / 2}
+    with fake_providers(latency_distribution="lognormal", **latency):
+        list(manager.search_company("warm up", ignore_cache=True))
+        results["search.uncached"] = summarize([
+            timed(lambda q=query: list(manager.search_company(q, ignore_cache=True)))
+            for query in queries
+        ])
+        results["search.cached"] = summarize([
+            timed(lambda: list(manager.search_company("warm up"))) for _ in queries
+        ])
+
+        def search(query: str) -> None:
+            list(manager.search_company(query, ignore_cache=True))
+
+        with ThreadPoolExecutor(args.concurrency) as executor:
+            seconds = timed(lambda: list(executor.map(search, queries)))
+        results["search.concurrent"] = {
+            "queries": len(queries),
+            "concurrency": args.concurrency,
+            "queries_per_s": round(len(queries) / seconds, 1),
+        }
+        seconds = timed(lambda: manager.search_companies(queries, ignore_cache=True))
+        results["search.batch"] = {
+            "queries": len(queries),
+            "queries_per_s": round(len(queries) / seconds, 1),
+        }
+    return results
+
+
+def bench_sync(args: argparse.Namespace) -> dict[str, Any]:
+    """Rows per second stored by the document and event synchronization."""
+    from djcompanyatlas.models import CompanyAtlasCompany
+    from djcompanyatlas.sync import sync_company_documents, sync_company_events
+
+    companies = CompanyAtlasCompany.objects.bulk_create([
+        CompanyAtlasCompany(denomination=f"Sync {n}", code=f"S{n:08d}", source="fake")
+        for n in range(args.companies)
+    ])
+    results = {}
+    with fake_providers(documents=args.facets, events=args.facets):
+        for name, sync in [("documents", sync_company_documents), ("events", sync_company_events)]:
+            for run in ("insert", "resync"):
+                counts: dict[str, int] = {}
+                seconds = timed(lambda s=sync: counts.update(s(companies)))
+                rows = sum(counts.values())
+                results[f"sync.{name}.{run}"] = {
+                    **counts,
+                    "seconds": round(seconds, 3),
+                    "rows_per_s": round(rows / seconds, 1),
+                }
+    return results
+
+
+def bench_import(args: argparse.Namespace) -> dict[str, Any]:
+    """Rows per second of the data and address bulk upserts, without providers.
+
+    The rows are imported into empty tables, imported again unchanged, then with
+    every value changed.
+    """
+    from djcompanyatlas.models import CompanyAtlasAddress, CompanyAtlasCompany, CompanyAtlasData
+
+    companies = CompanyAtlasCompany.objects.bulk_create([
+        CompanyAtlasCompany(denomination=f"Import {n}", code=f"B{n:08d}", source="bench")
+        for n in range(args.import_rows)
+    ])
+
+    def build(model: Any, company: Any, version: int) -> Any:
+        if model is CompanyAtlasData:
+            return CompanyAtlasData(
+                company=company, source="bench", country_code="FR",
+                data_type="siren", value=f"{company.code}-{version}",
+            )
+        return CompanyAtlasAddress(
+            company=company, source="bench", country_code="FR", is_headquarters=True,
+            address={"address_line1": f"{version} rue {company.code}", "city": "Paris"},
+        )
+
+    results = {}
+    for model, key_fields in [
+        (CompanyAtlasData, ["company", "source", "country_code", "data_type"]),
+        (CompanyAtlasAddress, ["company", "source", "country_code", "is_headquarters"]),
+    ]:
+        for run, version in [("insert", 0), ("unchanged", 0), ("update", 1)]:
+            objs = [build(model, company, version) for company in companies]
+            counts: dict[str, int] = {}
+            seconds = timed(
+                lambda m=model, o=objs, k=key_fields: counts.update(m.objects.bulk_upsert(o, k))
+            )
+            results[f"import.{model._meta.model_name}.{run}"] = {
+                **counts,
+                "seconds": round(seconds, 3),
+                "rows_per_s": round(len(objs) / seconds, 1),
+            }
+    return results
+
+
+def bench_referentiel(args: argparse.Namespace) -> dict[str, Any]:
+    """Duration of ``load_referentiel`` on a generated CSV, loaded then reloaded."""
+    from django.core.management import call_command
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "referentiel.csv"
+        with open(path, "w", encoding="utf-8", newline="") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["category", "code", "name", "description", "priority"])
+            for n in range(args.referentiel_rows):
+                writer.writerow([f"Category {n % 10}", f"CODE_{n}", f"Name {n}", "Text", n % 5])
+        for run in ("insert", "update"):
+            seconds = timed(
+                lambda: call_command("load_referentiel", csv=str(path), stdout=io.StringIO())
+            )
+            results[f"referentiel.{run}"] = {
+                "rows": args.referentiel_rows,
+                "seconds": round(seconds, 3),
+                "rows_per_s": round(args.referentiel_rows / seconds, 1),
+            }
+    return results
+
+
+ENRICH_TASKS: list[tuple[str, tuple]] = []
+
+
+def record_task(path: str, *args: Any) -> None:
+    """Task runner keeping the enqueued tasks, run afterwards by ``bench_enrich``."""
+    ENRICH_TASKS.append((path, args))
+
+
+def bench_enrich(args: argparse.Namespace) -> dict[str, Any]:
+    """Enrichment job start latency, then duration of each job run to completion.
+
+    Jobs are recorded when started and run one at a time afterwards: the in-memory
+    SQLite test database does not take concurrent writers.
+    """
+    from django.conf import settings
+    from django.test.utils import override_settings
+    from django.utils.module_loading import import_string
+
+    from djcompanyatlas.enrich import get_job, start_enrich
+    from djcompanyatlas.models import CompanyAtlasCompany
+
+    companies = CompanyAtlasCompany.objects.bulk_create([
+        CompanyAtlasCompany(denomination=f"Enrich {n}", code=f"E{n:08d}", source="bench")
+        for n in range(args.enrich_jobs)
+    ])
+    ENRICH_TASKS.clear()
+    with fake_providers(latency=args.latency, documents=args.facets, events=args.facets):
+        companyatlas = {
+            **settings.COMPANYATLAS,
+            # Single process: the jobs may stay in a process-local cache.
+            "ENRICH_LOCAL_CACHE": True,
+            "TASK_RUNNER": f"{__name__}.record_task",
+        }
+        with override_settings(COMPANYATLAS=companyatlas):
+            starts = [timed(lambda c=company: start_enrich(c.pk)) for company in companies]
+            runs = [
+                timed(lambda p=path, a=task_args: import_string(p)(*a))
+                for path, task_args in ENRICH_TASKS
+            ]
+            jobs = [get_job(task_args[0]) for _, task_args in ENRICH_TASKS]
+    failed = sum(job["status"] == "failed" for job in jobs)
+    return {
+        "enrich.start": summarize(starts),
+        "enrich.run": {
+            **summarize(runs),
+            "failed": failed,
+            "jobs_per_s": round(len(runs) / sum(runs), 1),
+        },
+    }
+
+
+def seed_admin(count: int) -> None:
+    """Grow the companies to ``count``, each with one data row and one address."""
+    from djcompanyatlas.models import CompanyAtlasAddress, CompanyAtlasCompany, CompanyAtlasData
+
+    start = CompanyAtlasCompany.objects.count()
+    for offset in range(start, count, SEED_BATCH_SIZE):
+        companies = CompanyAtlasCompany.objects.bulk_create([
+            CompanyAtlasCompany(
+                denomination=f"Company {n:07d}", code=f"{n:09d}", source="bench", country_code="FR"
+            )
+            for n in range(offset, min(count, offset + SEED_BATCH_SIZE))
+        ])
+        source = {"source": "bench", "country_code": "FR"}
+        CompanyAtlasData.objects.bulk_create([
+            CompanyAtlasData(company=company, data_type="siren", value=company.code, **source)
+            for company in companies
+        ])
+        CompanyAtlasAddress.objects.bulk_create([
+            CompanyAtlasAddress(
+                company=company, address={"city": "Paris"}, is_headquarters=True, **source
+            )
+            for company in companies
+        ])
+
+
+def bench_admin(args: argparse.Namespace) -> dict[str, Any]:
+    """Render time and query count of admin changelists as rows grow."""
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    user = get_user_model().objects.create_superuser("bench", "bench@example.com", "bench")
+    client = Client()
+    client.force_login(user)
+    results = {}
+    for rows in sorted(args.admin_rows):
+        seed_admin(rows)
+        for model in ("companyatlascompany", "companyatlasdata"):
+            url = f"/admin/djcompanyatlas/{model}/"
+            client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            # Read the count now: each request resets the connection's query log.
+            result = {"status": response.status_code, "db_queries": len(queries)}
+            samples = [timed(lambda u=url: client.get(u)) for _ in range(args.repeat)]
+            results[f"admin.{model}.{rows}"] = {**result, **summarize(samples)}
+    return results
+
+
+def get_meta(args: argparse.Namespace) -> dict[str, Any]:
+    import django
+    from django.db import connection
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "platform": platform.platform(),
+        "database": connection.vendor,
+        "settings": args.settings,
+        "args": {
+            key: value for key, value in vars(args).items() if key not in ("output", "compare")
+        },
+    }
+
+
+def compare(previous: dict[str, Any], current: dict[str, Any]) -> None:
+    """Print the ``COMPARED_METRICS`` present in both runs with their relative change."""
+    print(f"\nCompared with {previous['meta'].get('commit') or previous['meta']['date']}:")
+    for name, metrics in current["results"].items():
+        before = previous["results"].get(name, {})
+        for metric in COMPARED_METRICS:
+            old, value = before.get(metric), metrics.get(metric)
+            if not old or value is None:
+                continue
+            print(f"  {name:40} {metric:14} {old:>12} -> {value:>12} ({(value - old) / old:+.1%})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--settings", default="tests.settings")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake provider latency (s)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--companies", type=int, default=500)
+    parser.add_argument("--facets", type=int, default=10, help="Documents and events per company")
+    parser.add_argument("--import-rows", type=int, default=10000)
+    parser.add_argument("--referentiel-rows", type=int, default=1000)
+    parser.add_argument("--enrich-jobs", type=int, default=50)
+    parser.add_argument("--admin-rows", type=int, nargs="+", default=[10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path)
+    args = parser.parse_args()
+
+    sys.path[:0] = [str(ROOT / "src"), str(ROOT)]
+    os.environ["DJANGO_SETTINGS_MODULE"] = args.settings
+    import django
+
+    django.setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment(debug=False)
+    connection.creation.create_test_db(verbosity=0)
+
+    report = {"meta": get_meta(args), "results": {}}
+    for name in args.only:
+        start = time.perf_counter()
+        report["results"].update(globals()[f"bench_{name}"](args))
+        print(f"{name}: {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+    output = args.output or RESULTS / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    for name, metrics in report["results"].items():
+        print(f"{name:40} {json.dumps(metrics)}")
+    print(f"\nWritten to {output}")
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,7 @@ class CompanyAtlasAddressAdmin(AdminBoostModel):
         "is_headquarters",
         "created_at",
     ]
+    list_select_related = ["company"]
     list_filter = ["source", "country_code", "is_headquarters", "created_at"]
     search_fields = ["company__denomination", "company__to_companyatlasdata__value"]
     readonly_fields = ["created_at", "updated_at"]
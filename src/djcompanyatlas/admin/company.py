@@ -30,7 +30,8 @@ class CompanyAtlasCompanyAdmin(AdminBoostModel):
         self.add_to_fieldset(_("Source"), COMPANYATLAS_FIELDS_SOURCE)
 
     def headquarters_address_display(self, obj: CompanyAtlasCompany) -> str:
-        return str(obj.headquarters_address.address) if obj.headquarters_address else "-"
+        address = obj.headquarters_address
+        return str(address.address) if address else "-"
     headquarters_address_display.short_description = _("Headquarters Address")
 
     def handle_refresh_person(self, request, object_id):
@@ -9,6 +9,7 @@ from ..models.source import COMPANYATLAS_FIELDS_SOURCE
 @admin.register(CompanyAtlasData)
 class CompanyAtlasDataAdmin(AdminBoostModel):
     list_display = ["company", "data_type", "value", "created_at"]
+    list_select_related = ["company"]
     list_filter = ["data_type", "created_at"]
     search_fields = ["company__denomination", "data_type", "value"]
     readonly_fields = ["created_at", "updated_at"]
@@ -21,8 +21,9 @@ class CompanyDocumentAdmin(admin.ModelAdmin):
         "date",
         "created_at",
     ]
+    list_select_related = ["company"]
     list_filter = ["source", "country_code", "document_type", "date", "created_at"]
-    search_fields = ["company__name", "title", "document_type", "source"]
+    search_fields = ["company__denomination", "title", "document_type", "source"]
     readonly_fields = ["created_at", "updated_at"]
 
     fieldsets = (
@@ -17,6 +17,7 @@ class CompanyAtlasPersonInline(admin.TabularInline):
 class CompanyAtlasPersonAdmin(AdminBoostModel):
     form = CompanyAtlasPersonForm
     list_display = ["company", "officer_or_owner", "physical_or_moral", "full_name", "created_at"]
+    list_select_related = ["company"]
     list_filter = ["officer_or_owner", "physical_or_moral", "created_at"]
     search_fields = ["company__denomination", "full_name"]
     readonly_fields = ["created_at", "updated_at"]
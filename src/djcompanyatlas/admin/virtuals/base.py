@@ -0,0 +1,48 @@
+from typing import Any
+
+from django.contrib.admin.views.main import ALL_VAR, ORDER_VAR, PAGE_VAR
+
+
+class CompanyAtlasVirtualAdminMixin:
+    """Pass the changelist page and sort down to the virtual managers.
+
+    The search term is sent to the providers, so results are not filtered again
+    locally. Counts are lower bounds while providers hold more rows, hence no full
+    result count. Rows are listed in provider order (``pk``), which also keeps the
+    changelist from adding a reversing ``-pk``.
+    """
+
+    show_full_result_count = False
+    ordering = ["pk"]
+
+    def get_window(self, request) -> dict[str, Any]:
+        if ALL_VAR in request.GET:
+            return {}
+        try:
+            page = max(int(request.GET.get(PAGE_VAR, 1)), 1)
+        except ValueError:
+            page = 1
+        return {
+            "offset": (page - 1) * self.list_per_page,
+            "limit": self.list_per_page,
+            "ordering": self.get_window_ordering(request),
+        }
+
+    def get_window_ordering(self, request) -> list[str] | None:
+        list_display = list(self.get_list_display(request))
+        if self.get_actions(request):
+            list_display.insert(0, "action_checkbox")
+        field_names = {field.name for field in self.model._meta.fields}
+        ordering = []
+        for part in request.GET.get(ORDER_VAR, "").split("."):
+            prefix = "-" if part.startswith("-") else ""
+            try:
+                field = list_display[int(part.lstrip("-"))]
+            except (ValueError, IndexError):
+                continue
+            if field in field_names:
+                ordering.append(f"{prefix}{field}")
+        return ordering or None
+
+    def get_search_results(self, request, queryset, search_term):
+        return queryset, False
@@ -10,11 +10,12 @@ from djproviderkit.admin.service import BackendServiceAdminFilter, FirstServiceA
 
 from ...models.virtuals.company import CompanyAtlasVirtualCompany
 from ...models.virtuals.provider import CompanyAtlasProviderModel
+from .base import CompanyAtlasVirtualAdminMixin
 
 BackendServiceAdminFilter.provider_model = CompanyAtlasProviderModel
 
 @admin.register(CompanyAtlasVirtualCompany)
-class CompanyAtlasVirtualCompanyAdmin(AdminBoostModel):
+class CompanyAtlasVirtualCompanyAdmin(CompanyAtlasVirtualAdminMixin, AdminBoostModel):
     list_display = ["denomination", "reference", "address", "backend_name_display"]
     search_fields = ["denomination",]
     list_filter = [FirstServiceAdminFilter, BackendServiceAdminFilter]
@@ -50,7 +51,7 @@ class CompanyAtlasVirtualCompanyAdmin(AdminBoostModel):
     def get_queryset(self, request):
         query = request.GET.get("q")
         if query:
-            kwargs = {"first": bool(request.GET.get("first"))}
+            kwargs = {"first": bool(request.GET.get("first")), **self.get_window(request)}
             if request.GET.get("bck"):
                 kwargs["attribute_search"] = {"name": request.GET.get("bck")}
             return self.model.objects.search_company(query=query, **kwargs)
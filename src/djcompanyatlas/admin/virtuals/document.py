@@ -1,12 +1,15 @@
 from django.contrib import admin
+from django.utils.translation import gettext_lazy as _
 
 from ...models.virtuals.document import CompanyAtlasVirtualDocument
+from .base import CompanyAtlasVirtualAdminMixin
 
 
 @admin.register(CompanyAtlasVirtualDocument)
-class CompanyAtlasVirtualDocumentAdmin(admin.ModelAdmin):
+class CompanyAtlasVirtualDocumentAdmin(CompanyAtlasVirtualAdminMixin, admin.ModelAdmin):
     list_display = ["__str__"]
     readonly_fields = []
+    search_help_text = _("Company code")
 
     def has_add_permission(self, request):
         return False
@@ -17,3 +20,8 @@ class CompanyAtlasVirtualDocumentAdmin(admin.ModelAdmin):
     def has_delete_permission(self, request, obj=None):
         return False
 
+    def get_queryset(self, request):
+        code = request.GET.get("q")
+        if code:
+            return self.model.objects.get_company_documents(code=code, **self.get_window(request))
+        return self.model.objects.none()
@@ -1,9 +1,12 @@
 """Admin for provider model."""
 
 from django.contrib import admin
+from django.utils.translation import gettext_lazy as _
+from django_boosted import admin_boost_view
 from djproviderkit.admin.provider import BaseProviderAdmin
 
 from ...models.virtuals.provider import CompanyAtlasProviderModel
+from ...timing import get_timing_report
 
 
 @admin.register(CompanyAtlasProviderModel)
@@ -28,4 +31,13 @@ class CompanyAtlasProviderModelAdmin(BaseProviderAdmin):
         super().change_fieldsets()
         self.add_to_fieldset(None, ['geo_data'])
 
+    @admin_boost_view(
+        "message",
+        _("Request timings"),
+        template_name="admin/djcompanyatlas/companyatlasprovidermodel/timings.html",
+    )
+    def request_timings(self, request):
+        """Request time breakdowns kept by ``CompanyAtlasTimingMiddleware``."""
+        return get_timing_report()
+
 __all__ = ["CompanyAtlasProviderModelAdmin"]
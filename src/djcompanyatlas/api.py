@@ -0,0 +1,212 @@
+"""Read-only JSON API over companies and their facets.
+
+Responses only load what the client asks for: ``?fields=`` picks the company
+columns, ``?include=`` the prefetched facets and ``?fields[<facet>]=`` their
+columns. Lists are paginated with an opaque ``cursor`` on the primary key.
+Responses expose persons' names and birth dates: the views are staff only.
+"""
+
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Prefetch, QuerySet
+from django.http import QueryDict
+
+from .conf import get_companyatlas_setting
+from .models import (
+    CompanyAtlasAddress,
+    CompanyAtlasCompany,
+    CompanyAtlasData,
+    CompanyAtlasDocument,
+    CompanyAtlasEvent,
+    CompanyAtlasPerson,
+)
+
+COMPANYATLAS_API_PAGE_SIZE = 50
+COMPANYATLAS_API_MAX_PAGE_SIZE = 500
+
+COMPANYATLAS_API_FIELDS = [
+    "id",
+    "denomination",
+    "code",
+    "named_id",
+    "source",
+    "country_code",
+    "created_at",
+    "updated_at",
+]
+
+# Facet name to its related name, model and fields.
+COMPANYATLAS_API_INCLUDES: dict[str, tuple[str, Any, list[str]]] = {
+    "data": (
+        "to_companyatlasdata",
+        CompanyAtlasData,
+        ["source", "country_code", "data_type", "value_type", "value", "updated_at"],
+    ),
+    "addresses": (
+        "to_companyatlasaddress",
+        CompanyAtlasAddress,
+        ["source", "country_code", "address", "is_headquarters", "updated_at"],
+    ),
+    "persons": (
+        "to_companyatlasperson",
+        CompanyAtlasPerson,
+        [
+            "source",
+            "country_code",
+            "officer_or_owner",
+            "physical_or_moral",
+            "denomination",
+            "code",
+            "first_name",
+            "last_name",
+            "birth_date",
+            "updated_at",
+        ],
+    ),
+    "events": (
+        "events",
+        CompanyAtlasEvent,
+        ["source", "country_code", "event_type", "title", "date", "description", "updated_at"],
+    ),
+    "documents": (
+        "documents",
+        CompanyAtlasDocument,
+        ["source", "country_code", "document_type", "title", "date", "url", "updated_at"],
+    ),
+}
+
+
+class CompanyAtlasJSONEncoder(DjangoJSONEncoder):
+    """JSON encoder falling back to ``str`` for custom field values."""
+
+    def default(self, o: Any) -> Any:
+        try:
+            return super().default(o)
+        except TypeError:
+            return str(o)
+
+
+def _parse_list(value: str | None, allowed: list[str], label: str) -> list[str] | None:
+    if value is None:
+        return None
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown {label}: {', '.join(unknown)}")
+    return names
+
+
+def encode_cursor(pk: Any) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"after": pk}).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["after"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def parse_api_params(query: QueryDict) -> dict[str, Any]:
+    """Read the API parameters of a request.
+
+    Raises:
+        ValueError: On unknown fields or facets, or an invalid cursor or limit.
+    """
+    fields = _parse_list(query.get("fields"), COMPANYATLAS_API_FIELDS, "field")
+    includes = {}
+    for name in _parse_list(query.get("include"), list(COMPANYATLAS_API_INCLUDES), "include") or []:
+        facet_fields = COMPANYATLAS_API_INCLUDES[name][2]
+        includes[name] = (
+            _parse_list(query.get(f"fields[{name}]"), facet_fields, f"{name} field") or facet_fields
+        )
+
+    page_size = get_companyatlas_setting("API_PAGE_SIZE", COMPANYATLAS_API_PAGE_SIZE)
+    max_limit = get_companyatlas_setting("API_MAX_PAGE_SIZE", COMPANYATLAS_API_MAX_PAGE_SIZE)
+    try:
+        limit = int(query.get("limit") or page_size)
+    except ValueError as e:
+        raise ValueError("Invalid limit") from e
+    if limit < 1:
+        raise ValueError("Invalid limit")
+    return {
+        "fields": fields or COMPANYATLAS_API_FIELDS,
+        "includes": includes,
+        "limit": min(limit, max_limit),
+        "after": decode_cursor(query["cursor"]) if query.get("cursor") else None,
+    }
+
+
+def get_api_queryset(params: dict[str, Any]) -> QuerySet:
+    """Companies loading only the requested columns and facets."""
+    queryset = CompanyAtlasCompany.objects.only("id", *params["fields"])
+    for name, fields in params["includes"].items():
+        related_name, model, _ = COMPANYATLAS_API_INCLUDES[name]
+        queryset = queryset.prefetch_related(
+            Prefetch(related_name, queryset=model.objects.only("id", "company", *fields))
+        )
+    return queryset
+
+
+def serialize_company(company: CompanyAtlasCompany, params: dict[str, Any]) -> dict[str, Any]:
+    data = {field: getattr(company, field) for field in params["fields"]}
+    for name, fields in params["includes"].items():
+        related_name = COMPANYATLAS_API_INCLUDES[name][0]
+        data[name] = [
+            {field: getattr(item, field) for field in fields}
+            for item in getattr(company, related_name).all()
+        ]
+    return data
+
+
+def get_api_page(params: dict[str, Any]) -> tuple[list[dict[str, Any]], str | None]:
+    """Return a page of serialized companies and the cursor of the next one."""
+    queryset = get_api_queryset(params).order_by("pk")
+    if params["after"] is not None:
+        queryset = queryset.filter(pk__gt=params["after"])
+    limit = params["limit"]
+    companies = list(queryset[: limit + 1])
+    cursor = encode_cursor(companies[limit - 1].pk) if len(companies) > limit else None
+    return [serialize_company(company, params) for company in companies[:limit]], cursor
+
+
+def get_api_state(query: QueryDict, pk: Any = None) -> dict[str, Any] | None:
+    """Return the ``etag`` and ``last_modified`` of an API response.
+
+    They come from the primary keys and ``updated_at`` of the companies of the page
+    (or of company ``pk``), plus the latest ``updated_at`` and row counts of their
+    included facets, so deletions change the ETag too. Only the rows of the page
+    are read. Returns ``None`` on invalid parameters.
+    """
+    try:
+        params = parse_api_params(query)
+    except ValueError:
+        return None
+    companies = CompanyAtlasCompany.objects.order_by("pk")
+    if pk is not None:
+        companies = companies.filter(pk=pk)
+    else:
+        if params["after"] is not None:
+            companies = companies.filter(pk__gt=params["after"])
+        # The extra row tells whether a next page exists, as in ``get_api_page``.
+        companies = companies[: params["limit"] + 1]
+    rows = list(companies.values_list("pk", "updated_at"))
+    pks = [company_pk for company_pk, _ in rows]
+    states = [{"latest": max((row[1] for row in rows), default=None), "rows": rows}]
+    for name in params["includes"]:
+        facets = COMPANYATLAS_API_INCLUDES[name][1].objects.order_by()
+        states.append(
+            facets.filter(company__in=pks).aggregate(latest=Max("updated_at"), count=Count("pk"))
+        )
+
+    latest = max((state["latest"] for state in states if state["latest"]), default=None)
+    signature = json.dumps([sorted(query.lists()), pk, states], cls=CompanyAtlasJSONEncoder)
+    return {
+        "etag": hashlib.md5(signature.encode(), usedforsecurity=False).hexdigest(),
+        "last_modified": latest if isinstance(latest, datetime) else None,
+    }
@@ -1,6 +1,7 @@
 """Django app configuration."""
 
 from django.apps import AppConfig
+from django.core import checks
 
 
 class CompanyAtlasConfig(AppConfig):
@@ -10,3 +11,11 @@ class CompanyAtlasConfig(AppConfig):
     name = "djcompanyatlas"
     verbose_name = "Company Atlas"
 
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .checks import check_enrich_cache
+        from .timing import time_template_rendering
+
+        checks.register(check_enrich_cache)
+        time_template_rendering()
+
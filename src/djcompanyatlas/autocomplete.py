@@ -0,0 +1,121 @@
+"""Company autocomplete reusing cached results of shorter prefixes."""
+
+import hashlib
+from collections.abc import Callable
+from typing import Any
+
+from django.core.cache import cache
+
+from .conf import get_companyatlas_setting
+from .dedup import normalize_denomination
+from .models import CompanyAtlasCompany, CompanyAtlasVirtualCompany
+
+COMPANYATLAS_AUTOCOMPLETE_MIN_LENGTH = 3
+COMPANYATLAS_AUTOCOMPLETE_LIMIT = 10
+COMPANYATLAS_AUTOCOMPLETE_FETCH = 50
+COMPANYATLAS_AUTOCOMPLETE_CACHE_TTL = 300
+COMPANYATLAS_AUTOCOMPLETE_CACHE_PREFIX = "companyatlas:autocomplete:"
+# Provider lookups allowed per client and minute, ``None`` for no limit.
+COMPANYATLAS_AUTOCOMPLETE_RATE = 30
+
+
+def _get_cache_key(query: str) -> str:
+    digest = hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()
+    return COMPANYATLAS_AUTOCOMPLETE_CACHE_PREFIX + digest
+
+
+def _get_min_length() -> int:
+    return get_companyatlas_setting(
+        "AUTOCOMPLETE_MIN_LENGTH", COMPANYATLAS_AUTOCOMPLETE_MIN_LENGTH
+    )
+
+
+def _search_providers(query: str) -> dict[str, Any]:
+    fetch = get_companyatlas_setting("AUTOCOMPLETE_FETCH", COMPANYATLAS_AUTOCOMPLETE_FETCH)
+    queryset = CompanyAtlasVirtualCompany.objects.search_company(query=query, limit=fetch)
+    return {
+        "complete": queryset.complete and queryset.count() <= fetch,
+        "results": [
+            {
+                "id": company.companyatlas_id,
+                "denomination": company.denomination,
+                "reference": company.reference,
+                "backend": company.backend,
+                "country_code": company.country_code,
+            }
+            for company in queryset[:fetch]
+        ],
+    }
+
+
+def get_provider_suggestions(
+    query: str, allow_providers: Callable[[], bool] | None = None
+) -> tuple[list[dict[str, Any]], str]:
+    """Return provider suggestions for ``query`` and where they came from.
+
+    Results are cached by normalized query. When a shorter prefix returned a
+    complete result set, its results are filtered instead of calling providers.
+    Otherwise providers are called when ``allow_providers`` (if given) returns true.
+
+    Returns:
+        Suggestions and their origin: ``cache``, ``prefix``, ``providers`` or
+        ``throttled``.
+    """
+    timeout = get_companyatlas_setting(
+        "AUTOCOMPLETE_CACHE_TTL", COMPANYATLAS_AUTOCOMPLETE_CACHE_TTL
+    )
+    cached = cache.get(_get_cache_key(query))
+    if cached is not None:
+        return cached["results"], "cache"
+
+    ends = range(len(query) - 1, _get_min_length() - 1, -1)
+    prefixes = [_get_cache_key(query[:end]) for end in ends]
+    found = cache.get_many(prefixes)
+    for prefix in (found[key] for key in prefixes if key in found):
+        if prefix["complete"]:
+            results = [
+                result for result in prefix["results"]
+                if normalize_denomination(result["denomination"]).startswith(query)
+            ]
+            cache.set(_get_cache_key(query), {"complete": True, "results": results}, timeout)
+            return results, "prefix"
+
+    if allow_providers is not None and not allow_providers():
+        return [], "throttled"
+    entry = _search_providers(query)
+    cache.set(_get_cache_key(query), entry, timeout)
+    return entry["results"], "providers"
+
+
+def autocomplete(
+    query: str,
+    limit: int | None = None,
+    allow_providers: Callable[[], bool] | None = None,
+) -> dict[str, Any]:
+    """Suggest companies for a partial denomination.
+
+    Local companies whose denomination starts with the query come first, followed by
+    provider suggestions not already known locally (see ``get_provider_suggestions``
+    for ``allow_providers``).
+    """
+    limit = limit or get_companyatlas_setting(
+        "AUTOCOMPLETE_LIMIT", COMPANYATLAS_AUTOCOMPLETE_LIMIT
+    )
+    normalized = normalize_denomination(query)
+    if len(normalized) < _get_min_length():
+        return {"query": query, "origin": None, "results": []}
+
+    local = [
+        {**company, "local": True}
+        for company in CompanyAtlasCompany.objects.filter(denomination__istartswith=query.strip())
+        .order_by("denomination")
+        .values("id", "denomination", "code", "source", "country_code")[:limit]
+    ]
+    known = {(company["source"], company["code"]) for company in local}
+    suggestions, origin = get_provider_suggestions(normalized, allow_providers)
+    results = local + [
+        {**suggestion, "local": False}
+        for suggestion in suggestions
+        if (suggestion["backend"], suggestion["reference"]) not in known
+    ]
+    return {"query": query, "origin": origin, "results": results[:limit]}
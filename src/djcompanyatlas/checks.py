@@ -0,0 +1,15 @@
+"""System checks of the companyatlas settings."""
+
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+
+
+def check_enrich_cache(app_configs, **kwargs):
+    """Warn when enrichment jobs have no shared cache, the enrich views answering 503."""
+    from .enrich import get_job_cache
+
+    try:
+        get_job_cache()
+    except ImproperlyConfigured as e:
+        return [checks.Warning(str(e), id="djcompanyatlas.W001")]
+    return []
@@ -0,0 +1,18 @@
+"""Settings access for companyatlas."""
+
+from typing import Any
+
+from django.conf import settings
+
+
+def get_companyatlas_setting(name: str, default: Any = None) -> Any:
+    """Return a key of the ``COMPANYATLAS`` settings dict.
+
+    Args:
+        name: Key to read (e.g. ``"CACHE_TIMEOUT"``).
+        default: Value returned when the key is not configured.
+
+    Returns:
+        The configured value or ``default``.
+    """
+    return getattr(settings, "COMPANYATLAS", {}).get(name, default)
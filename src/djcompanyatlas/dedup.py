@@ -0,0 +1,196 @@
+"""Duplicate company detection and merge."""
+
+import re
+import unicodedata
+from typing import Any
+
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.utils import timezone
+
+from .conf import get_companyatlas_setting
+from .detail import invalidate_company_details
+from .models import (
+    CompanyAtlasAddress,
+    CompanyAtlasCompany,
+    CompanyAtlasData,
+    CompanyAtlasDocument,
+    CompanyAtlasEvent,
+    CompanyAtlasPerson,
+)
+
+COMPANYATLAS_IDENTIFIER_TYPES = [
+    "siren",
+    "siret",
+    "vat",
+    "vat_number",
+    "lei",
+    "duns",
+    "company_number",
+    "registration_number",
+    "ein",
+]
+
+# Fields identifying a child row within a company, used to drop rows the merge
+# would duplicate (and that unique constraints would reject).
+COMPANYATLAS_MERGE_KEYS: dict[Any, list[str] | None] = {
+    CompanyAtlasData: ["source", "country_code", "data_type"],
+    CompanyAtlasAddress: None,
+    CompanyAtlasPerson: None,
+    CompanyAtlasEvent: ["natural_key"],
+    CompanyAtlasDocument: ["natural_key"],
+}
+
+# Companies merged per update, two parameters each in the ``Case``, keeping queries
+# under the parameter limit of SQLite (999 before 3.32).
+COMPANYATLAS_MERGE_BATCH_SIZE = 300
+
+POSTCODE_KEYS = ["postal_code", "postcode", "zip_code", "zipcode", "zip"]
+
+
+def normalize_denomination(value: str) -> str:
+    """Lowercase, strip accents and punctuation, and collapse whitespace."""
+    value = unicodedata.normalize("NFKD", value or "")
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^0-9a-z\s]", "", value.lower()).split())
+
+
+def _get_postcode(address: Any) -> str:
+    for key in POSTCODE_KEYS:
+        value = address.get(key) if isinstance(address, dict) else getattr(address, key, None)
+        if value:
+            return str(value).replace(" ", "").upper()
+    return ""
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self.parent: dict[int, int] = {}
+
+    def find(self, pk: int) -> int:
+        root = self.parent.setdefault(pk, pk)
+        while root != self.parent[root]:
+            self.parent[root] = self.parent[self.parent[root]]
+            root = self.parent[root]
+        return root
+
+    def union(self, first: int, second: int) -> None:
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            self.parent[max(first, second)] = min(first, second)
+
+
+def find_duplicate_groups(chunk_size: int = 5000) -> list[list[int]]:
+    """Group companies describing the same legal entity.
+
+    Companies are candidates when they share an identifier value in
+    ``CompanyAtlasData`` (types from ``COMPANYATLAS["IDENTIFIER_TYPES"]``) or a
+    normalized denomination and headquarters postcode. Each source is read in a
+    single streamed query and candidates are only compared within their key, so the
+    cost grows linearly with the number of rows.
+
+    Returns:
+        Groups of company primary keys, smallest (oldest) first.
+    """
+    groups = _UnionFind()
+    identifier_types = get_companyatlas_setting("IDENTIFIER_TYPES", COMPANYATLAS_IDENTIFIER_TYPES)
+    rows = (
+        CompanyAtlasData.objects.filter(data_type__in=identifier_types)
+        .exclude(value="")
+        .order_by("data_type", "value")
+        .values_list("data_type", "value", "company_id")
+    )
+    previous_key, previous_company = None, None
+    for data_type, value, company_id in rows.iterator(chunk_size=chunk_size):
+        key = (data_type, value)
+        if key == previous_key and company_id != previous_company:
+            groups.union(previous_company, company_id)
+        previous_key, previous_company = key, company_id
+
+    seen: dict[tuple[str, str], int] = {}
+    rows = CompanyAtlasAddress.objects.filter(is_headquarters=True).values_list(
+        "company_id", "company__denomination", "address",
+    )
+    for company_id, denomination, address in rows.iterator(chunk_size=chunk_size):
+        postcode = _get_postcode(address)
+        denomination = normalize_denomination(denomination)
+        if not postcode or not denomination:
+            continue
+        key = (denomination, postcode)
+        if key in seen:
+            groups.union(seen[key], company_id)
+        else:
+            seen[key] = company_id
+
+    members: dict[int, list[int]] = {}
+    for pk in groups.parent:
+        members.setdefault(groups.find(pk), []).append(pk)
+    return [sorted(group) for group in members.values() if len(group) > 1]
+
+
+def _drop_conflicts(model: Any, fields: list[str], targets: dict[int, int]) -> None:
+    rows = model.objects.filter(company_id__in=targets).order_by("-updated_at")
+    if "natural_key" in fields:
+        rows = rows.exclude(natural_key="")
+    rows = sorted(
+        rows.values_list("pk", "company_id", *fields),
+        key=lambda row: targets[row[1]] != row[1],
+    )
+    seen, conflicts = set(), []
+    for pk, company_id, *key in rows:
+        key = (targets[company_id], *key)
+        if key in seen:
+            conflicts.append(pk)
+        else:
+            seen.add(key)
+    model.objects.filter(pk__in=conflicts).delete()
+
+
+def _chunk_groups(groups: list[list[int]], size: int) -> Any:
+    chunk, count = [], 0
+    for group in groups:
+        if chunk and count + len(group) > size:
+            yield chunk
+            chunk, count = [], 0
+        chunk.append(group)
+        count += len(group)
+    if chunk:
+        yield chunk
+
+
+def _merge_chunk(groups: list[list[int]]) -> int:
+    targets = {pk: group[0] for group in groups for pk in group}
+    duplicates = [pk for pk, target in targets.items() if pk != target]
+    if not duplicates:
+        return 0
+    now = timezone.now()
+    for model, fields in COMPANYATLAS_MERGE_KEYS.items():
+        if fields:
+            _drop_conflicts(model, fields, targets)
+        model.objects.filter(company_id__in=duplicates).update(
+            company_id=Case(*[When(company_id=pk, then=Value(targets[pk])) for pk in duplicates]),
+            updated_at=now,
+        )
+    CompanyAtlasCompany.objects.filter(pk__in=duplicates).delete()
+    invalidate_company_details(set(targets.values()))
+    return len(duplicates)
+
+
+@transaction.atomic
+def merge_groups(groups: list[list[int]], batch_size: int = COMPANYATLAS_MERGE_BATCH_SIZE) -> int:
+    """Merge each group into its first company.
+
+    Groups are merged by chunks of about ``batch_size`` companies. Children of a
+    chunk (data, addresses, persons, events, documents) are moved with one update
+    per model, after dropping the rows that would duplicate a row of the target
+    company. Moved rows get a new ``updated_at``, so the cached details and ETags of
+    the target companies change. Duplicate companies are then deleted.
+
+    Args:
+        groups: Groups of company primary keys, the first one being kept.
+        batch_size: Companies merged per update.
+
+    Returns:
+        Number of deleted companies.
+    """
+    return sum(_merge_chunk(chunk) for chunk in _chunk_groups(groups, batch_size))
@@ -0,0 +1,105 @@
+"""Company detail loading and rendered fragment cache."""
+
+from collections.abc import Iterable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import DateTimeField, F, Max, OuterRef, Subquery, prefetch_related_objects
+from django.db.models.functions import Coalesce, Greatest
+from django.template.loader import render_to_string
+from django.utils.translation import get_language
+
+from .conf import get_companyatlas_setting
+from .models import (
+    CompanyAtlasAddress,
+    CompanyAtlasCompany,
+    CompanyAtlasData,
+    CompanyAtlasDocument,
+    CompanyAtlasEvent,
+    CompanyAtlasPerson,
+)
+
+COMPANYATLAS_DETAIL_CACHE_TTL = 3600
+COMPANYATLAS_DETAIL_CACHE_PREFIX = "companyatlas:detail:"
+COMPANYATLAS_DETAIL_TEMPLATE = "djcompanyatlas/company_detail_content.html"
+
+# Related name of each model shown on the detail page.
+COMPANYATLAS_DETAIL_RELATIONS = {
+    "to_companyatlasdata": CompanyAtlasData,
+    "to_companyatlasaddress": CompanyAtlasAddress,
+    "to_companyatlasperson": CompanyAtlasPerson,
+    "events": CompanyAtlasEvent,
+    "documents": CompanyAtlasDocument,
+}
+
+
+def _get_cache_key(pk: Any, language: str | None = None) -> str:
+    language = language if language is not None else get_language() or ""
+    return f"{COMPANYATLAS_DETAIL_CACHE_PREFIX}{language}:{pk}"
+
+
+def get_detail_queryset() -> Any:
+    """Companies annotated with ``detail_updated_at``, the latest ``updated_at`` of
+    the company and its related rows, computed in the same query."""
+    latest = [
+        Coalesce(
+            Subquery(
+                model.objects.filter(company=OuterRef("pk"))
+                .order_by()
+                .values("company")
+                .annotate(latest=Max("updated_at"))
+                .values("latest"),
+                output_field=DateTimeField(),
+            ),
+            F("updated_at"),
+        )
+        for model in COMPANYATLAS_DETAIL_RELATIONS.values()
+    ]
+    return CompanyAtlasCompany.objects.annotate(
+        detail_updated_at=Greatest(F("updated_at"), *latest)
+    )
+
+
+def prefetch_company_detail(company: CompanyAtlasCompany) -> CompanyAtlasCompany:
+    """Load every relation shown on the detail page, one query per relation.
+
+    Prefetched rows get ``company`` set, so their ``__str__`` runs no query.
+    """
+    prefetch_related_objects([company], *COMPANYATLAS_DETAIL_RELATIONS)
+    return company
+
+
+def render_company_detail(company: CompanyAtlasCompany) -> str:
+    """Render the detail fragment of a company from ``get_detail_queryset``.
+
+    The fragment is cached per active language until the company or one of its
+    related rows is saved or deleted (see ``signals``) or bulk written (see
+    ``invalidate_company_details``), or their latest ``updated_at`` changes. The TTL
+    comes from ``COMPANYATLAS["DETAIL_CACHE_TTL"]``.
+    """
+    key = _get_cache_key(company.pk)
+    cached = cache.get(key)
+    if cached is not None and cached["updated_at"] == company.detail_updated_at:
+        return cached["html"]
+
+    html = render_to_string(
+        COMPANYATLAS_DETAIL_TEMPLATE, {"company": prefetch_company_detail(company)}
+    )
+    timeout = get_companyatlas_setting("DETAIL_CACHE_TTL", COMPANYATLAS_DETAIL_CACHE_TTL)
+    cache.set(key, {"updated_at": company.detail_updated_at, "html": html}, timeout)
+    return html
+
+
+def invalidate_company_details(pks: Iterable[Any]) -> None:
+    """Drop the cached fragments of companies, in every language.
+
+    Bulk writes (``update``, ``bulk_create``, ``bulk_update``) send no signal:
+    callers writing related rows that way invalidate their companies with this.
+    """
+    languages = {"", settings.LANGUAGE_CODE, *(code for code, _ in settings.LANGUAGES)}
+    cache.delete_many([_get_cache_key(pk, language) for pk in pks for language in languages])
+
+
+def invalidate_company_detail(pk: Any) -> None:
+    invalidate_company_details([pk])
@@ -0,0 +1,176 @@
+"""Cached companyatlas metadata used to define the virtual model fields.
+
+Virtual models need the provider services and field configurations at import time.
+Reading them means importing companyatlas and its providers, so they are kept in a
+JSON snapshot, rebuilt when the installed versions of companyatlas and providerkit
+or the ``COMPANYATLAS["PROVIDERS"]`` setting change. Only when companyatlas runs
+from a source tree (editable install, or not installed at all) are the modification
+times of its modules checked too. The path comes from
+``COMPANYATLAS["DISCOVERY_SNAPSHOT"]``, by default in the user cache directory,
+``None`` disabling the snapshot.
+
+Labels and descriptions are stored untranslated and translated when displayed.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from functools import cache
+from importlib import metadata, util
+from pathlib import Path
+from typing import Any
+
+from django.utils import translation
+from django.utils.translation import gettext_lazy
+
+from .conf import get_companyatlas_setting
+
+COMPANYATLAS_DISCOVERY_SNAPSHOT = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "djcompanyatlas"
+    / "discovery.json"
+)
+COMPANYATLAS_DISCOVERY_PACKAGES = ["python-companyatlas", "providerkit", "django-providerkit"]
+COMPANYATLAS_FIELD_KEYS = ["label", "description", "format"]
+COMPANYATLAS_TRANSLATED_KEYS = ["label", "description"]
+
+
+def _get_version() -> str:
+    try:
+        return metadata.version("python-companyatlas")
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+def _get_versions() -> dict[str, str]:
+    versions = {}
+    for name in COMPANYATLAS_DISCOVERY_PACKAGES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = ""
+    return versions
+
+
+def _is_source_tree() -> bool:
+    """Whether companyatlas is installed in editable mode (PEP 610) or not installed."""
+    try:
+        direct_url = metadata.distribution("python-companyatlas").read_text("direct_url.json")
+    except metadata.PackageNotFoundError:
+        return True
+    try:
+        return bool(json.loads(direct_url or "{}").get("dir_info", {}).get("editable"))
+    except ValueError:
+        return False
+
+
+def _get_fingerprint() -> str:
+    """Hash of the installed package versions and the ``PROVIDERS`` setting.
+
+    Source trees can change without a new version: the paths, sizes and
+    modification times of their modules are hashed too.
+    """
+    digest = hashlib.sha256()
+    key = [_get_versions(), get_companyatlas_setting("PROVIDERS")]
+    digest.update(json.dumps(key, sort_keys=True, default=str).encode())
+    if not _is_source_tree():
+        return digest.hexdigest()
+    spec = util.find_spec("companyatlas")
+    for location in (spec and spec.submodule_search_locations) or []:
+        for path in sorted(Path(location).rglob("*.py")):
+            stat = path.stat()
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _get_fields(fields: dict[str, Any]) -> dict[str, Any]:
+    with translation.override(None):
+        return {
+            name: {key: str(cfg[key]) for key in COMPANYATLAS_FIELD_KEYS if key in cfg}
+            for name, cfg in fields.items()
+        }
+
+
+def _translate_fields(fields: dict[str, Any]) -> dict[str, Any]:
+    return {
+        name: {
+            key: gettext_lazy(value) if key in COMPANYATLAS_TRANSLATED_KEYS else value
+            for key, value in cfg.items()
+        }
+        for name, cfg in fields.items()
+    }
+
+
+def build_snapshot() -> dict[str, Any]:
+    """Import companyatlas and collect the metadata the virtual models need."""
+    from companyatlas import COMPANYATLAS_SEARCH_COMPANY_FIELDS
+    from companyatlas.helpers import ADD_FIELDS
+    from companyatlas.providers import CompanyAtlasProvider
+
+    services_cfg = getattr(
+        CompanyAtlasProvider,
+        "services_cfg",
+        getattr(CompanyAtlasProvider, "_default_services_cfg", {}),
+    )
+    return {
+        "version": _get_version(),
+        "fingerprint": _get_fingerprint(),
+        "services": list(services_cfg.keys()),
+        "provider_fields": _get_fields(ADD_FIELDS),
+        "search_company_fields": _get_fields(COMPANYATLAS_SEARCH_COMPANY_FIELDS),
+    }
+
+
+def write_snapshot(path: str | Path | None = None) -> dict[str, Any]:
+    """Rebuild the snapshot and write it to ``path`` (defaults to the setting).
+
+    The file is written next to its destination and renamed over it, so readers
+    never see a partial snapshot.
+    """
+    snapshot = build_snapshot()
+    path = Path(
+        path or get_companyatlas_setting("DISCOVERY_SNAPSHOT", COMPANYATLAS_DISCOVERY_SNAPSHOT)
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(snapshot, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    return snapshot
+
+
+def _load_snapshot() -> dict[str, Any]:
+    path = get_companyatlas_setting("DISCOVERY_SNAPSHOT", COMPANYATLAS_DISCOVERY_SNAPSHOT)
+    if path is None:
+        return build_snapshot()
+    try:
+        snapshot = json.loads(Path(path).read_text(encoding="utf-8"))
+        key = (snapshot.get("version"), snapshot.get("fingerprint"))
+        if key == (_get_version(), _get_fingerprint()):
+            return snapshot
+    except (OSError, ValueError):
+        pass
+    try:
+        return write_snapshot(path)
+    except OSError:
+        return build_snapshot()
+
+
+@cache
+def get_snapshot() -> dict[str, Any]:
+    """Return the snapshot, rebuilding it when missing or outdated.
+
+    The rebuilt snapshot is written back when the path is writable. Field labels
+    and descriptions are lazily translated.
+    """
+    snapshot = _load_snapshot()
+    return {
+        **snapshot,
+        "provider_fields": _translate_fields(snapshot["provider_fields"]),
+        "search_company_fields": _translate_fields(snapshot["search_company_fields"]),
+    }
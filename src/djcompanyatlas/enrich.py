@@ -0,0 +1,124 @@
+"""Background company enrichment jobs with per-facet progress.
+
+Jobs run through ``tasks.enqueue`` and report their progress in the cache named by
+``COMPANYATLAS["ENRICH_CACHE"]``, so web workers only start jobs and read their
+state, never waiting on providers. That cache is shared by every web and task
+worker: it must not be process-local (see ``get_job_cache``). Without
+``COMPANYATLAS["TASK_RUNNER"]``, jobs run in threads of the web worker that
+started them (see ``tasks.enqueue``).
+"""
+
+import uuid
+from typing import Any
+
+from django.core.cache import BaseCache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from .conf import get_companyatlas_setting
+from .refresh import COMPANYATLAS_REFRESH_FACETS, refresh_company
+from .tasks import enqueue
+
+COMPANYATLAS_ENRICH_JOB_TTL = 3600
+COMPANYATLAS_ENRICH_JOB_PREFIX = "companyatlas:enrich:"
+COMPANYATLAS_ENRICH_DONE = ("done", "failed")
+COMPANYATLAS_ENRICH_CACHE = "default"
+# Enrichment jobs a client may start per minute, ``None`` for no limit.
+COMPANYATLAS_ENRICH_RATE = 10
+
+
+def _get_cache_key(job_id: str) -> str:
+    return f"{COMPANYATLAS_ENRICH_JOB_PREFIX}{job_id}"
+
+
+def get_job_cache() -> BaseCache:
+    """Return the cache holding the jobs, ``COMPANYATLAS["ENRICH_CACHE"]``.
+
+    Raises:
+        ImproperlyConfigured: When the cache does not store anything
+            (``DummyCache``), or is process-local (``LocMemCache``) without
+            ``COMPANYATLAS["ENRICH_LOCAL_CACHE"]``, meant for single-process
+            setups only: other workers would never see the jobs.
+    """
+    alias = get_companyatlas_setting("ENRICH_CACHE", COMPANYATLAS_ENRICH_CACHE)
+    job_cache = caches[alias]
+    if isinstance(job_cache, DummyCache) or (
+        isinstance(job_cache, LocMemCache)
+        and not get_companyatlas_setting("ENRICH_LOCAL_CACHE", False)
+    ):
+        raise ImproperlyConfigured(
+            f"Enrichment jobs need a cache shared by every worker, not the "
+            f"{type(job_cache).__name__} of cache {alias!r}: set "
+            f"COMPANYATLAS['ENRICH_CACHE'] to a shared cache alias."
+        )
+    return job_cache
+
+
+def get_job(job_id: str) -> dict[str, Any] | None:
+    return get_job_cache().get(_get_cache_key(job_id))
+
+
+def _save_job(job: dict[str, Any]) -> dict[str, Any]:
+    job["updated_at"] = timezone.now().isoformat()
+    job["version"] = job.get("version", 0) + 1
+    timeout = get_companyatlas_setting("ENRICH_JOB_TTL", COMPANYATLAS_ENRICH_JOB_TTL)
+    get_job_cache().set(_get_cache_key(job["id"]), job, timeout)
+    return job
+
+
+def start_enrich(company_pk: int, facets: list[str] | None = None) -> dict[str, Any]:
+    """Create an enrichment job for a company and enqueue it.
+
+    Args:
+        company_pk: Primary key of the company.
+        facets: Facets from ``COMPANYATLAS_REFRESH_FACETS``, all of them by default.
+
+    Returns:
+        The job, with its ``id``, ``status`` and per-facet ``facets`` progress.
+    """
+    facets = facets or list(COMPANYATLAS_REFRESH_FACETS)
+    unknown = [facet for facet in facets if facet not in COMPANYATLAS_REFRESH_FACETS]
+    if unknown:
+        raise ValueError(f"Unknown facets: {', '.join(unknown)}")
+    job = _save_job({
+        "id": uuid.uuid4().hex,
+        "company": company_pk,
+        "status": "queued",
+        "facets": {facet: {"status": "pending"} for facet in facets},
+    })
+    enqueue(run_enrich, job["id"])
+    return job
+
+
+def run_enrich(job_id: str) -> dict[str, Any] | None:
+    """Run an enrichment job, one provider service at a time.
+
+    Facets served by the same service (data and address) are refreshed together and
+    the job is saved after each service.
+    """
+    job = get_job(job_id)
+    if job is None:
+        return None
+    job["status"] = "running"
+    _save_job(job)
+
+    services: dict[str, list[str]] = {}
+    for facet in job["facets"]:
+        services.setdefault(COMPANYATLAS_REFRESH_FACETS[facet]["service"], []).append(facet)
+    for facets in services.values():
+        for facet in facets:
+            job["facets"][facet]["status"] = "running"
+        _save_job(job)
+        try:
+            progress = {"status": "done", "counts": refresh_company(job["company"], facets)}
+        except Exception as e:
+            progress = {"status": "failed", "error": str(e)}
+        for facet in facets:
+            job["facets"][facet] = progress
+        _save_job(job)
+
+    failed = any(progress["status"] == "failed" for progress in job["facets"].values())
+    job["status"] = "failed" if failed else "done"
+    return _save_job(job)
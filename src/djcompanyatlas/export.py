@@ -0,0 +1,143 @@
+"""Streaming export of companies with their data and addresses."""
+
+import csv
+import json
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from django.db.models import QuerySet
+
+from .models import CompanyAtlasCompany
+
+COMPANYATLAS_EXPORT_FIELDS = [
+    "id",
+    "denomination",
+    "code",
+    "source",
+    "country_code",
+    "created_at",
+    "updated_at",
+    "data",
+    "addresses",
+]
+
+COMPANYATLAS_EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+def company_to_dict(company: CompanyAtlasCompany) -> dict[str, Any]:
+    """Serialize a company with its prefetched data and addresses."""
+    return {
+        "id": company.pk,
+        "denomination": company.denomination,
+        "code": company.code,
+        "source": company.source,
+        "country_code": company.country_code,
+        "created_at": company.created_at.isoformat(),
+        "updated_at": company.updated_at.isoformat(),
+        "data": [
+            {
+                "source": data.source,
+                "country_code": data.country_code,
+                "data_type": data.data_type,
+                "value_type": data.value_type,
+                "value": data.value,
+            }
+            for data in company.to_companyatlasdata.all()
+        ],
+        "addresses": [
+            {
+                "source": address.source,
+                "country_code": address.country_code,
+                "address": address.address,
+                "is_headquarters": address.is_headquarters,
+            }
+            for address in company.to_companyatlasaddress.all()
+        ],
+    }
+
+
+def iter_export_rows(
+    queryset: QuerySet | None = None, chunk_size: int = 1000
+) -> Iterator[dict[str, Any]]:
+    """Yield serialized companies, ``chunk_size`` at a time.
+
+    Chunks are read by primary key ranges, each with its own prefetch of data and
+    addresses, so memory stays bounded by the chunk size whatever the table size
+    (``iterator()`` only prefetches from Django 4.1).
+    """
+    if queryset is None:
+        queryset = CompanyAtlasCompany.objects.all()
+    queryset = queryset.order_by("pk").prefetch_related(
+        "to_companyatlasdata", "to_companyatlasaddress",
+    )
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk[:chunk_size])
+        if not chunk:
+            return
+        for company in chunk:
+            yield company_to_dict(company)
+        last_pk = chunk[-1].pk
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+class _Echo:
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv(rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Yield CSV lines, nested values being JSON encoded."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COMPANYATLAS_EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([
+            _dumps(row[field]) if isinstance(row[field], list | dict) else row[field]
+            for field in COMPANYATLAS_EXPORT_FIELDS
+        ])
+
+
+def iter_jsonl(rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Yield one JSON document per line."""
+    for row in rows:
+        yield _dumps(row) + "\n"
+
+
+def write_parquet(rows: Iterable[dict[str, Any]], path: str, chunk_size: int = 1000) -> None:
+    """Write rows to a Parquet file, one row group per chunk.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        *[(field, pa.string()) for field in COMPANYATLAS_EXPORT_FIELDS[1:]],
+    ])
+
+    def to_table(chunk: list[dict[str, Any]]) -> Any:
+        columns = {field: [] for field in COMPANYATLAS_EXPORT_FIELDS}
+        for row in chunk:
+            for field in COMPANYATLAS_EXPORT_FIELDS:
+                value = row[field]
+                columns[field].append(_dumps(value) if isinstance(value, list) else value)
+        return pa.Table.from_pydict(columns, schema=schema)
+
+    with pq.ParquetWriter(path, schema) as writer:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                writer.write_table(to_table(chunk))
+                chunk = []
+        if chunk:
+            writer.write_table(to_table(chunk))
@@ -0,0 +1,204 @@
+"""Deterministic fake companyatlas provider for offline load testing.
+
+Register it through the provider discovery with ``COMPANYATLAS["PROVIDERS"]``::
+
+    COMPANYATLAS = {
+        "PROVIDERS": [
+            {
+                "class": "djcompanyatlas.fake.CompanyAtlasFakeProvider",
+                "kwargs": {"name": "fake_fr", "latency": 0.2, "error_rate": 0.05},
+            },
+        ],
+    }
+"""
+
+import math
+import random
+import threading
+import time
+from typing import Any
+
+from companyatlas.providers import CompanyAtlasProvider
+
+COMPANYATLAS_FAKE_WORDS = [
+    "Industries", "Conseil", "Services", "Technologies", "Distribution", "Holding",
+    "Logistique", "Energie", "Immobilier", "Solutions", "Partners", "Group",
+]
+COMPANYATLAS_FAKE_CITIES = [
+    ("75001", "Paris"), ("69001", "Lyon"), ("13001", "Marseille"), ("31000", "Toulouse"),
+    ("33000", "Bordeaux"), ("59000", "Lille"), ("44000", "Nantes"), ("67000", "Strasbourg"),
+]
+COMPANYATLAS_FAKE_DOCUMENT_TYPES = ["statuts", "kbis", "comptes_annuels", "bodacc"]
+COMPANYATLAS_FAKE_EVENT_TYPES = ["creation", "modification", "radiation", "depot_comptes"]
+
+
+def _siren(rng: random.Random) -> str:
+    digits = [rng.randint(0, 9) for _ in range(8)]
+    total = 0
+    for index, digit in enumerate(reversed(digits)):
+        digit = digit * 2 if index % 2 == 0 else digit
+        total += digit - 9 if digit > 9 else digit
+    return "".join(map(str, digits)) + str((10 - total % 10) % 10)
+
+
+def _date(rng: random.Random) -> str:
+    return f"{rng.randint(2000, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+
+class CompanyAtlasFakeProvider(CompanyAtlasProvider):
+    """Serve synthetic companies, documents and events without network access.
+
+    Rows only depend on ``seed``, the provider name and the query or code, so runs
+    are reproducible. Every call waits for a latency drawn from
+    ``latency_distribution`` and fails with ``ConnectionError`` at ``error_rate``,
+    both drawn from a generator seeded by ``seed``.
+
+    The attributes below can be overridden through the provider ``kwargs``.
+
+    ``calls`` and ``errors`` count the calls and simulated failures of the provider
+    and of its copies.
+
+    Attributes:
+        results: Companies returned per search.
+        documents: Documents per company.
+        events: Events per company.
+        latency: Mean response time in seconds.
+        latency_jitter: Standard deviation (normal, lognormal) or half range (uniform).
+        latency_distribution: ``fixed``, ``uniform``, ``normal``, ``lognormal`` or
+            ``exponential``.
+        error_rate: Share of calls failing, from 0 to 1.
+        payload_size: Characters of filler added to every row.
+        seed: Seed of the rows and of the latency and error draws.
+    """
+
+    name = "fake"
+    display_name = "Fake"
+    description = "Deterministic synthetic companies for offline testing"
+    priority = 0
+    geo_data = "FR"
+    country_code = "FR"
+
+    results = 20
+    documents = 5
+    events = 5
+    latency = 0.0
+    latency_jitter = 0.0
+    latency_distribution = "fixed"
+    error_rate = 0.0
+    payload_size = 0
+    seed = 0
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        if "country_code" not in kwargs and isinstance(self.geo_data, str):
+            self.country_code = self.geo_data
+        # Shared with the shallow copies made for each call (see ``providers.call_provider``).
+        self._state = {"calls": 0, "errors": 0}
+        self._random = random.Random(f"{self.seed}:{self.name}")
+        self._lock = threading.Lock()
+
+    @property
+    def calls(self) -> int:
+        return self._state["calls"]
+
+    @property
+    def errors(self) -> int:
+        return self._state["errors"]
+
+    def _get_latency(self) -> float:
+        rng, mean, jitter = self._random, self.latency, self.latency_jitter
+        if self.latency_distribution == "uniform":
+            return rng.uniform(mean - jitter, mean + jitter)
+        if self.latency_distribution == "normal":
+            return rng.gauss(mean, jitter)
+        if self.latency_distribution == "lognormal" and mean > 0:
+            sigma2 = math.log(1 + (jitter / mean) ** 2)
+            return rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+        if self.latency_distribution == "exponential" and mean > 0:
+            return rng.expovariate(1 / mean)
+        return mean
+
+    def _simulate(self) -> None:
+        with self._lock:
+            self._state["calls"] += 1
+            delay = max(0.0, self._get_latency())
+            failed = self._random.random() < self.error_rate
+            self._state["errors"] += failed
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise ConnectionError(f"{self.name}: simulated provider failure")
+
+    def _rng(self, *key: Any) -> random.Random:
+        return random.Random(":".join(map(str, (self.seed, self.name, *key))))
+
+    def _filler(self) -> dict[str, str]:
+        return {"filler": "x" * self.payload_size} if self.payload_size else {}
+
+    def _company(self, siren: str, denomination: str | None = None) -> dict[str, Any]:
+        rng = self._rng("company", siren)
+        postal_code, city = rng.choice(COMPANYATLAS_FAKE_CITIES)
+        street = f"{rng.randint(1, 200)} rue {rng.choice(COMPANYATLAS_FAKE_WORDS)}"
+        return {
+            "companyatlas_id": f"{self.name}_{siren}",
+            "denomination": denomination or f"{rng.choice(COMPANYATLAS_FAKE_WORDS)} {siren[:4]}",
+            "reference": siren,
+            "source_field": "siren",
+            "backend": self.name,
+            "country_code": self.country_code,
+            "address": f"{street}, {postal_code} {city}",
+            "address_json": {"address_line1": street, "postal_code": postal_code, "city": city},
+            **self._filler(),
+        }
+
+    def search_company(
+        self,
+        query: str = "",
+        offset: int = 0,
+        limit: int | None = None,
+        ordering: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[dict[str, Any]]:
+        self._simulate()
+        rng = self._rng("search", query.lower())
+        rows = []
+        for index in range(self.results):
+            denomination = f"{query.title()} {rng.choice(COMPANYATLAS_FAKE_WORDS)} {index}"
+            rows.append(self._company(_siren(rng), denomination))
+        for field in reversed(ordering or []):
+            name = field.lstrip("-")
+            rows.sort(key=lambda row: str(row.get(name, "")), reverse=field.startswith("-"))
+        return rows[offset:offset + limit] if limit else rows[offset:]
+
+    def search_company_by_reference(self, code: str = "", **kwargs: Any) -> dict[str, Any]:
+        self._simulate()
+        return self._company(code)
+
+    def get_company_documents(self, code: str = "", **kwargs: Any) -> list[dict[str, Any]]:
+        self._simulate()
+        rng = self._rng("documents", code)
+        return [
+            {
+                "document_type": rng.choice(COMPANYATLAS_FAKE_DOCUMENT_TYPES),
+                "title": f"Document {index + 1}",
+                "date": _date(rng),
+                "url": f"https://fake.invalid/{self.name}/{code}/{index + 1}",
+                "backend": self.name,
+                **self._filler(),
+            }
+            for index in range(self.documents)
+        ]
+
+    def get_company_events(self, code: str = "", **kwargs: Any) -> list[dict[str, Any]]:
+        self._simulate()
+        rng = self._rng("events", code)
+        return [
+            {
+                "event_type": rng.choice(COMPANYATLAS_FAKE_EVENT_TYPES),
+                "title": f"Event {index + 1}",
+                "date": _date(rng),
+                "backend": self.name,
+                **self._filler(),
+            }
+            for index in range(self.events)
+        ]
@@ -0,0 +1,84 @@
+"""Country inference from company identifiers and provider coverage."""
+
+import re
+from typing import Any
+
+# VAT prefixes that are not ISO 3166 country codes.
+COMPANYATLAS_VAT_PREFIXES = {"EL": "GR", "XI": "GB"}
+
+COMPANYATLAS_GLOBAL_GEO_DATA = {"*", "ALL", "GLOBAL", "INT", "WORLD", "WW"}
+
+COMPANYATLAS_VAT_COUNTRIES = (
+    "AT|BE|BG|CH|CY|CZ|DE|DK|EE|EL|ES|FI|FR|GB|HR|HU|IE|IT|LT|LU|LV|MT|NL|NO|PL|PT|RO|SE|SI|SK|XI"
+)
+
+COMPANYATLAS_IDENTIFIER_PATTERNS: list[tuple[str, re.Pattern, str]] = [
+    ("siren", re.compile(r"^\d{9}$"), "FR"),
+    ("siret", re.compile(r"^\d{14}$"), "FR"),
+    ("company_number", re.compile(r"^(?:\d{8}|(?:SC|NI|OC|SO|NC|NL|LP|SL|FC|GE)\d{6})$"), "GB"),
+    ("ein", re.compile(r"^\d{2}-\d{7}$"), "US"),
+    (
+        "vat",
+        re.compile(rf"^({COMPANYATLAS_VAT_COUNTRIES})(?=(?:[A-Z]*\d){{6}})[0-9A-Z]{{8,12}}$"),
+        "",
+    ),
+]
+
+
+def _luhn(value: str) -> bool:
+    total = 0
+    for index, digit in enumerate(reversed(value)):
+        digit = int(digit) * (2 if index % 2 else 1)
+        total += digit - 9 if digit > 9 else digit
+    return total % 10 == 0
+
+
+def infer_identifier(value: str) -> tuple[str, str] | None:
+    """Guess the type and country of a company identifier.
+
+    SIREN and SIRET numbers must pass their Luhn check and eight digit numbers are
+    read as UK company numbers. European VAT numbers take their country from the
+    prefix.
+
+    Returns:
+        ``(identifier_type, country_code)``, or ``None`` when unrecognized.
+    """
+    value = re.sub(r"[\s.]", "", str(value or "")).upper()
+    for identifier_type, pattern, country_code in COMPANYATLAS_IDENTIFIER_PATTERNS:
+        match = pattern.match(value)
+        if not match:
+            continue
+        if identifier_type in ("siren", "siret") and not _luhn(value):
+            continue
+        if identifier_type == "vat":
+            prefix = match.group(1)
+            return identifier_type, COMPANYATLAS_VAT_PREFIXES.get(prefix, prefix)
+        return identifier_type, country_code
+    return None
+
+
+def infer_country_code(value: str) -> str | None:
+    """Return the country of a company identifier, if it can be inferred."""
+    identifier = infer_identifier(value)
+    return identifier[1] if identifier else None
+
+
+def get_geo_data(provider: Any) -> set[str]:
+    """Country codes covered by a provider, empty when it is global."""
+    geo_data = getattr(provider, "geo_data", None)
+    if callable(geo_data):
+        geo_data = geo_data()
+    if not geo_data:
+        return set()
+    if isinstance(geo_data, str):
+        geo_data = re.split(r"[\s,;|]+", geo_data)
+    countries = {str(country).strip().upper() for country in geo_data if str(country).strip()}
+    return set() if countries & COMPANYATLAS_GLOBAL_GEO_DATA else countries
+
+
+def provider_covers(provider: Any, country_code: str | None) -> bool:
+    """Whether the provider serves ``country_code`` (always true without one)."""
+    if not country_code:
+        return True
+    countries = get_geo_data(provider)
+    return not countries or country_code.upper() in countries
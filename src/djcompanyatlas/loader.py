@@ -0,0 +1,164 @@
+"""Request-scoped batching of company and facet lookups.
+
+While a loader is active (see ``CompanyAtlasLoaderMiddleware`` and ``loader_scope``),
+companyatlas model instances are registered as they are loaded. The first lazy
+access to a company or a facet then resolves it for every registered instance at
+once, one query per relation, instead of one query per instance.
+
+The ``post_init`` receivers registering instances are only connected while a
+scope is open, so instances created outside of scopes cost nothing.
+"""
+
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from django.db.models import prefetch_related_objects
+from django.db.models.signals import post_init
+
+from .conf import get_companyatlas_setting
+
+COMPANYATLAS_LOADER_MAX_INSTANCES = 10000
+
+
+class CompanyAtlasLoader:
+    """Instances loaded in the current scope, batched on first lazy access.
+
+    Instances are indexed by model. A batch only covers the instances registered
+    since the previous batch of the same model and attribute, the earlier ones
+    being resolved already. Companies are loaded for the rows of every model at
+    once. At most ``COMPANYATLAS["LOADER_MAX_INSTANCES"]`` instances are registered.
+    """
+
+    def __init__(self) -> None:
+        self.instances: dict[type, list[Any]] = {}
+        self.count = 0
+        self.max_instances = get_companyatlas_setting(
+            "LOADER_MAX_INSTANCES", COMPANYATLAS_LOADER_MAX_INSTANCES
+        )
+        self.batches = 0
+        # (model, attribute) to the number of instances already batched.
+        self._batched: dict[tuple[type, str], int] = {}
+
+    def register(self, instance: Any) -> None:
+        if self.count < self.max_instances:
+            self.instances.setdefault(type(instance), []).append(instance)
+            self.count += 1
+
+    def _pending(
+        self, instance: Any, models: list[type], attribute: str, is_pending: Any
+    ) -> list[Any]:
+        pending = {}
+        for model in models:
+            instances = self.instances.get(model, [])
+            start = self._batched.get((model, attribute), 0)
+            self._batched[(model, attribute)] = len(instances)
+            pending.update((id(obj), obj) for obj in instances[start:] if is_pending(obj))
+        pending[id(instance)] = instance
+        return list(pending.values())
+
+    def load_company(self, instance: Any) -> Any:
+        """Return ``instance.company``, fetching the companies of all registered rows."""
+        field = instance._meta.get_field("company")
+        if not field.is_cached(instance):
+
+            def is_pending(obj: Any) -> bool:
+                return (
+                    "company_id" in obj.__dict__
+                    and obj.company_id is not None
+                    and not obj._meta.get_field("company").is_cached(obj)
+                )
+
+            pending = self._pending(instance, list(self.instances), "company", is_pending)
+            company_ids = {obj.company_id for obj in pending}
+            companies = field.related_model._base_manager.in_bulk(company_ids)
+            for obj in pending:
+                obj._meta.get_field("company").set_cached_value(obj, companies.get(obj.company_id))
+            self.batches += 1
+        return field.get_cached_value(instance)
+
+    def load_related(self, company: Any, relation: str) -> list[Any]:
+        """Return the rows of ``relation``, prefetched for all registered companies."""
+        if relation not in getattr(company, "_prefetched_objects_cache", {}):
+
+            def is_pending(obj: Any) -> bool:
+                return (
+                    obj.pk is not None
+                    and relation not in getattr(obj, "_prefetched_objects_cache", {})
+                )
+
+            pending = self._pending(company, [type(company)], relation, is_pending)
+            prefetch_related_objects(pending, relation)
+            self.batches += 1
+        return list(getattr(company, relation).all())
+
+
+_loader: ContextVar[CompanyAtlasLoader | None] = ContextVar("companyatlas_loader", default=None)
+_scopes = 0
+_scopes_lock = threading.Lock()
+
+
+def get_loader() -> CompanyAtlasLoader | None:
+    return _loader.get()
+
+
+def register_instance(sender: Any, instance: Any, **kwargs: Any) -> None:
+    """``post_init`` receiver registering instances in the loader of the context.
+
+    Receivers are connected while any scope is open, in any thread: instances
+    created in a context without a loader are ignored.
+    """
+    loader = _loader.get()
+    if loader is not None:
+        loader.register(instance)
+
+
+def _connect_receivers(connect: bool) -> None:
+    from .detail import COMPANYATLAS_DETAIL_RELATIONS
+    from .models import CompanyAtlasCompany
+
+    for model in [CompanyAtlasCompany, *COMPANYATLAS_DETAIL_RELATIONS.values()]:
+        dispatch_uid = f"companyatlas_loader_{model.__name__}"
+        if connect:
+            post_init.connect(register_instance, sender=model, dispatch_uid=dispatch_uid)
+        else:
+            post_init.disconnect(sender=model, dispatch_uid=dispatch_uid)
+
+
+@contextmanager
+def loader_scope() -> Iterator[CompanyAtlasLoader]:
+    """Activate a loader for the duration of the block."""
+    global _scopes
+    with _scopes_lock:
+        _scopes += 1
+        if _scopes == 1:
+            _connect_receivers(True)
+    token = _loader.set(CompanyAtlasLoader())
+    try:
+        yield _loader.get()
+    finally:
+        _loader.reset(token)
+        with _scopes_lock:
+            _scopes -= 1
+            if not _scopes:
+                _connect_receivers(False)
+
+
+def load_company(instance: Any) -> Any:
+    """``instance.company``, batched when a loader is active."""
+    loader = _loader.get()
+    if loader is None:
+        return instance.company
+    return loader.load_company(instance)
+
+
+def load_related(company: Any, relation: str) -> list[Any] | None:
+    """Rows of a company relation when batched or prefetched, ``None`` otherwise."""
+    loader = _loader.get()
+    if loader is not None:
+        return loader.load_related(company, relation)
+    if relation in getattr(company, "_prefetched_objects_cache", {}):
+        return list(getattr(company, relation).all())
+    return None
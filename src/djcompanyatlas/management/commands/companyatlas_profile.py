@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from djcompanyatlas.profiling import (
+    COMPANYATLAS_PROFILE_COMMANDS,
+    COMPANYATLAS_PROFILE_INTERVAL,
+    profile_command,
+)
+
+
+class Command(BaseCommand):
+    help = "Profile one companyatlas provider command end to end"
+
+    def add_arguments(self, parser):
+        parser.add_argument("service", choices=COMPANYATLAS_PROFILE_COMMANDS)
+        parser.add_argument("value", help="Search query, or company code")
+        parser.add_argument("--backend", type=str, help="Only call this provider")
+        parser.add_argument("--country", type=str, help="Only call providers covering this country")
+        parser.add_argument(
+            "--output-dir",
+            type=str,
+            default=".",
+            help="Directory of the .prof and .collapsed (flamegraph) files",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=COMPANYATLAS_PROFILE_INTERVAL,
+            help="Seconds between two stack samples",
+        )
+        parser.add_argument("--top", type=int, default=20, help="Functions and allocations listed")
+        parser.add_argument("--no-memory", action="store_true", help="Do not trace allocations")
+
+    def handle(self, **options):
+        try:
+            report = profile_command(
+                options["service"],
+                options["value"],
+                output_dir=options["output_dir"],
+                backend=options["backend"],
+                country_code=options["country"],
+                interval=options["interval"],
+                memory=not options["no_memory"],
+                top=options["top"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+        timings = report["timings"]
+        self.stdout.write(
+            self.style.SUCCESS(f"{report['rows']} rows in {report['seconds'] * 1000:.1f} ms")
+        )
+        if report["peak_memory"] is not None:
+            self.stdout.write(f"Peak traced memory: {report['peak_memory'] / 1024:.1f} KiB")
+
+        self.stdout.write(f"\n{'Bucket':<12} {'ms':>10} {'count':>7}")
+        for name, entry in timings["buckets"].items():
+            self.stdout.write(f"{name:<12} {entry['ms']:>10.1f} {entry['count']:>7}")
+
+        self.stdout.write(f"\n{'Provider':<30} {'calls':>7} {'total ms':>10} {'avg ms':>10}")
+        for name, entry in sorted(timings["providers"].items(), key=lambda item: -item[1]["ms"]):
+            average = entry["ms"] / max(entry["count"], 1)
+            self.stdout.write(
+                f"{name:<30} {entry['count']:>7} {entry['ms']:>10.1f} {average:>10.1f}"
+            )
+
+        self.stdout.write(f"\n{report['stats']}")
+        if report["allocations"]:
+            self.stdout.write("Top allocations:")
+            for allocation in report["allocations"]:
+                self.stdout.write(f"  {allocation}")
+
+        for kind, path in report["files"].items():
+            self.stdout.write(self.style.SUCCESS(f"Written {kind}: {path}"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from djcompanyatlas.discovery import write_snapshot
+
+
+class Command(BaseCommand):
+    help = "Rebuild the cached companyatlas discovery snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            type=str,
+            help="Snapshot path (defaults to COMPANYATLAS['DISCOVERY_SNAPSHOT'])",
+        )
+
+    def handle(self, **options):
+        snapshot = write_snapshot(options["output"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Snapshot written: {len(snapshot['services'])} services, "
+                f"{len(snapshot['search_company_fields'])} company fields"
+            )
+        )
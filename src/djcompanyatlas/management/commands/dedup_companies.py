@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from djcompanyatlas.dedup import find_duplicate_groups, merge_groups
+
+
+class Command(BaseCommand):
+    help = "Detect duplicate companies and merge them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of duplicate groups merged per transaction",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only display the duplicate groups",
+        )
+
+    def handle(self, **options):
+        groups = find_duplicate_groups()
+        self.stdout.write(f"Found {len(groups)} duplicate groups")
+        if options["dry_run"]:
+            for group in groups:
+                self.stdout.write(", ".join(str(pk) for pk in group))
+            return
+
+        batch_size = options["batch_size"]
+        deleted = 0
+        for i in range(0, len(groups), batch_size):
+            deleted += merge_groups(groups[i:i + batch_size])
+        self.stdout.write(self.style.SUCCESS(f"Completed: {deleted} companies merged"))
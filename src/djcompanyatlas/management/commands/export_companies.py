@@ -0,0 +1,47 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from djcompanyatlas.export import iter_csv, iter_export_rows, iter_jsonl, write_parquet
+
+
+class Command(BaseCommand):
+    help = "Export companies with their data and addresses"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl", "parquet"],
+            default="csv",
+            help="Output format (parquet requires pyarrow)",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            help="Output file (defaults to stdout, required for parquet)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of companies loaded per query",
+        )
+
+    def handle(self, **options):
+        rows = iter_export_rows(chunk_size=options["chunk_size"])
+
+        if options["format"] == "parquet":
+            if not options["output"]:
+                raise CommandError("--output is required for parquet exports")
+            try:
+                write_parquet(rows, options["output"], chunk_size=options["chunk_size"])
+            except ImportError as e:
+                raise CommandError("pyarrow is required for parquet exports") from e
+            return
+
+        lines = iter_csv(rows) if options["format"] == "csv" else iter_jsonl(rows)
+        if not options["output"]:
+            sys.stdout.writelines(lines)
+            return
+        with open(options["output"], "w", encoding="utf-8", newline="") as output:
+            output.writelines(lines)
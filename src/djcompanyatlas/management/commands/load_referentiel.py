@@ -3,7 +3,7 @@ from pathlib import Path
 
 from django.core.management.base import BaseCommand
 
-from djcompanyatlas.models import Referentiel
+from djcompanyatlas.models import CompanyAtlasReferentiel as Referentiel
 
 
 class Command(BaseCommand):
@@ -0,0 +1,48 @@
+from concurrent.futures import Future
+
+from django.core.management.base import BaseCommand
+
+from djcompanyatlas.refresh import get_refresh_plan, schedule_refresh
+
+
+class Command(BaseCommand):
+    help = "Refresh the stalest companies within a provider call budget"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--budget",
+            type=int,
+            default=1000,
+            help="Maximum number of provider calls",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of companies per enqueued batch",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only display the refresh plan",
+        )
+
+    def handle(self, **options):
+        if options["dry_run"]:
+            for company_pk, facets in get_refresh_plan(options["budget"]):
+                self.stdout.write(f"{company_pk}: {', '.join(facets)}")
+            return
+
+        handles = schedule_refresh(options["budget"], options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Enqueued {len(handles)} refresh batches"))
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        for handle in handles:
+            if isinstance(handle, Future):
+                for key, value in handle.result().items():
+                    counts[key] = counts.get(key, 0) + value
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Completed: {counts['inserted']} inserted, {counts['updated']} updated, "
+                f"{counts['unchanged']} unchanged"
+            )
+        )
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from djcompanyatlas.models import CompanyAtlasCompany
+from djcompanyatlas.sync import sync_company_documents, sync_company_events
+
+
+class Command(BaseCommand):
+    help = "Fetch company documents and events from providers into local tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company",
+            type=int,
+            action="append",
+            help="Company primary key (repeatable, defaults to all companies)",
+        )
+        parser.add_argument(
+            "--only",
+            choices=["documents", "events"],
+            help="Only sync documents or events",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of rows per bulk insert",
+        )
+
+    def handle(self, **options):
+        companies = CompanyAtlasCompany.objects.order_by("pk")
+        if options["company"]:
+            companies = companies.filter(pk__in=options["company"])
+        syncs = {"documents": sync_company_documents, "events": sync_company_events}
+        if options["only"]:
+            syncs = {options["only"]: syncs[options["only"]]}
+
+        for name, sync in syncs.items():
+            counts = sync(companies.iterator(chunk_size=500), batch_size=options["batch_size"])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{name}: {counts['inserted']} inserted, {counts['updated']} updated, "
+                    f"{counts['unchanged']} unchanged"
+                )
+            )
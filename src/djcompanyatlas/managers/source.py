@@ -0,0 +1,86 @@
+from typing import Any
+
+from django.db import models, transaction
+from django.utils import timezone
+
+
+class CompanyAtlasSourceManager(models.Manager):
+    def bulk_upsert(
+        self,
+        objs: list[Any],
+        key_fields: list[str],
+        batch_size: int = 500,
+        ignore_conflicts: bool = False,
+    ) -> dict[str, int]:
+        """Insert new rows and update only the rows whose content hash changed.
+
+        Existing rows are matched on ``key_fields``; unchanged rows are not written,
+        so their ``updated_at`` is left untouched.
+
+        Args:
+            objs: Unsaved model instances.
+            key_fields: Fields identifying a row (e.g. ``["company", "data_type"]``).
+            batch_size: Number of rows per query.
+            ignore_conflicts: Skip inserts violating a unique constraint, for rows
+                written concurrently since they were matched. Skipped rows are
+                counted as unchanged.
+
+        Returns:
+            Counts of ``inserted``, ``updated`` and ``unchanged`` rows.
+        """
+        opts = self.model._meta
+        key_attnames = [opts.get_field(field).attname for field in key_fields]
+
+        def get_key(obj: Any) -> tuple:
+            return tuple(getattr(obj, attname) for attname in key_attnames)
+
+        incoming = {}
+        for obj in objs:
+            obj.content_hash = obj.compute_content_hash()
+            incoming[get_key(obj)] = obj
+
+        first_values = list({key[0] for key in incoming})
+        scopes = [
+            self.filter(**{f"{key_attnames[0]}__in": first_values[i:i + batch_size]})
+            for i in range(0, len(first_values), batch_size)
+        ]
+        existing = {}
+        for rows in scopes:
+            for row in rows.only("pk", "content_hash", *key_attnames):
+                existing[get_key(row)] = row
+
+        now = timezone.now()
+        to_create, to_update, unchanged = [], [], 0
+        for key, obj in incoming.items():
+            row = existing.get(key)
+            if row is None:
+                to_create.append(obj)
+            elif row.content_hash == obj.content_hash:
+                unchanged += 1
+            else:
+                obj.pk = row.pk
+                obj.updated_at = now
+                to_update.append(obj)
+
+        inserted = len(to_create)
+        with transaction.atomic(using=self.db):
+            if ignore_conflicts and to_create:
+                # Skipped inserts are not reported: count the rows actually added.
+                before = sum(rows.count() for rows in scopes)
+                self.bulk_create(to_create, batch_size=batch_size, ignore_conflicts=True)
+                inserted = sum(rows.count() for rows in scopes) - before
+            else:
+                self.bulk_create(to_create, batch_size=batch_size)
+            if to_update:
+                fields = [
+                    *self.model.content_hash_fields,
+                    *self.model.content_derived_fields,
+                    "content_hash",
+                    "updated_at",
+                ]
+                self.bulk_update(to_update, fields, batch_size=batch_size)
+        return {
+            "inserted": inserted,
+            "updated": len(to_update),
+            "unchanged": unchanged + len(to_create) - inserted,
+        }
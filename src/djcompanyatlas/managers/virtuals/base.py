@@ -0,0 +1,395 @@
+"""Shared base for companyatlas virtual managers."""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from django.apps import apps
+from django.utils.module_loading import import_string
+from virtualqueryset.managers import VirtualManager
+
+from ...conf import get_companyatlas_setting
+from ...identifiers import infer_country_code
+from ...providers import call_provider, call_providers, get_companyatlas_providers
+from ...timing import timing_bucket
+from .queryset import CompanyAtlasLazyList, CompanyAtlasVirtualQuerySet, normalize_provider_results
+
+COMPANYATLAS_COMMAND_CACHE_SIZE = 128
+COMPANYATLAS_COMMAND_CACHE_TTL = 300
+COMPANYATLAS_NEGATIVE_CACHE_SIZE = 1024
+COMPANYATLAS_NEGATIVE_CACHE_TTL = 60
+
+# Guards the lazy creation of the managers' caches, so concurrent first calls share one.
+_cache_lock = threading.Lock()
+
+
+class CompanyAtlasCommandCache:
+    """Thread-safe LRU cache with a time to live.
+
+    Args:
+        maxsize: Maximum number of entries, the least recently used is evicted first.
+        ttl: Seconds an entry stays valid, ``0`` to never expire.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = COMPANYATLAS_COMMAND_CACHE_SIZE,
+        ttl: float = COMPANYATLAS_COMMAND_CACHE_TTL,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(command: str, **kwargs: Any) -> str:
+        return json.dumps([command, kwargs], sort_keys=True, default=str)
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (not self.ttl or entry[0] > time.monotonic()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self, prefix: str = "") -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def info(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+class CompanyAtlasCommandMixin:
+    """Run provider commands into lazy, cached virtual querysets.
+
+    Provider rows are normalized on access only (see ``CompanyAtlasVirtualQuerySet``)
+    and querysets are cached by the command and all its arguments. Pass
+    ``ignore_cache=True`` to a command to call the providers again. Size and TTL
+    come from ``COMPANYATLAS["COMMAND_CACHE_SIZE"]`` and
+    ``COMPANYATLAS["COMMAND_CACHE_TTL"]``.
+
+    With ``negative_cache_enabled``, empty results go to a separate, short-lived
+    negative cache (``COMPANYATLAS["NEGATIVE_CACHE_SIZE"]`` and
+    ``COMPANYATLAS["NEGATIVE_CACHE_TTL"]``) instead, unless a provider failed.
+
+    Providers whose ``geo_data`` covers ``country_code`` are called first, the
+    country being inferred from the ``code`` identifier format when not given (see
+    ``identifiers.infer_country_code``). The other providers follow, an identifier
+    format being shared by several registries. Pass ``country_code=None`` to keep
+    the priority order, or set ``COMPANYATLAS["ROUTE_BY_COUNTRY"]`` to ``False`` to
+    disable inference.
+    """
+
+    # Command name to the dotted path of its companyatlas helper, imported on use.
+    _commands: dict[str, str] = {}
+    queryset_class = CompanyAtlasVirtualQuerySet
+    negative_cache_enabled = False
+
+    def _get_cache(self, attr: str, setting: str, maxsize: int, ttl: float) -> Any:
+        cache = self.__dict__.get(attr)
+        if cache is None:
+            with _cache_lock:
+                cache = self.__dict__.get(attr)
+                if cache is None:
+                    cache = CompanyAtlasCommandCache(
+                        maxsize=get_companyatlas_setting(f"{setting}_SIZE", maxsize),
+                        ttl=get_companyatlas_setting(f"{setting}_TTL", ttl),
+                    )
+                    setattr(self, attr, cache)
+        return cache
+
+    @property
+    def command_cache(self) -> CompanyAtlasCommandCache:
+        return self._get_cache(
+            "_command_cache",
+            "COMMAND_CACHE",
+            COMPANYATLAS_COMMAND_CACHE_SIZE,
+            COMPANYATLAS_COMMAND_CACHE_TTL,
+        )
+
+    @property
+    def negative_cache(self) -> CompanyAtlasCommandCache:
+        return self._get_cache(
+            "_negative_cache",
+            "NEGATIVE_CACHE",
+            COMPANYATLAS_NEGATIVE_CACHE_SIZE,
+            COMPANYATLAS_NEGATIVE_CACHE_TTL,
+        )
+
+    def cache_info(self) -> dict[str, int]:
+        return self.command_cache.info()
+
+    def negative_cache_info(self) -> dict[str, int]:
+        return self.negative_cache.info()
+
+    def _clear_cached_command(self, command: str) -> None:
+        self.command_cache.clear(json.dumps([command])[:-1])
+        self.negative_cache.clear(json.dumps([command])[:-1])
+
+    def set_cached_command(self, command: str, cache: Any, **kwargs: Any) -> Any:
+        cache = self.queryset_class(model=self.model, data=cache)
+        self.command_cache.set(self.command_cache.make_key(command, **kwargs), cache)
+        return cache
+
+    def get_cached_command(self, command: str, **kwargs: Any) -> Any:
+        key = self.command_cache.make_key(command, **kwargs)
+        cached = self.command_cache.get(key)
+        if (
+            cached is None
+            and self.negative_cache_enabled
+            and self.negative_cache.get(key) is not None
+        ):
+            cached = self.queryset_class(model=self.model, data=[])
+        return cached
+
+    def cache_results(self, command: str, results: Any, data_list: Any, **kwargs: Any) -> Any:
+        """Cache the results in the positive or negative cache and return the queryset."""
+        if len(data_list) or not self.negative_cache_enabled:
+            return self.set_cached_command(command, data_list, **kwargs)
+        if not any("error" in result for result in results):
+            self.negative_cache.set(self.negative_cache.make_key(command, **kwargs), True)
+        return self.queryset_class(model=self.model, data=data_list)
+
+    def call_command(self, command: str, **kwargs: Any) -> list[dict[str, Any]]:
+        """Call the providers through the process-wide pool.
+
+        Set ``COMPANYATLAS["PROVIDER_POOL"]`` to ``False`` to use the companyatlas
+        helpers instead, which instantiate providers on each call. The helpers
+        cannot order providers by country: a routed command then instantiates
+        them through ``get_companyatlas_providers`` instead.
+        """
+        if get_companyatlas_setting("PROVIDER_POOL", True) or kwargs.get("country_code"):
+            return call_providers(command, **kwargs)
+        kwargs.pop("country_code", None)
+        with timing_bucket("provider"):
+            return import_string(self._commands[command])(**kwargs)
+
+    def get_country_code(self, **kwargs: Any) -> str | None:
+        """Country the command is routed to, inferred from its identifier if needed."""
+        if "country_code" in kwargs:
+            return kwargs["country_code"]
+        if not get_companyatlas_setting("ROUTE_BY_COUNTRY", True):
+            return None
+        return infer_country_code(kwargs.get("code") or "")
+
+    def get_command_data_list(self, results: Any, command: str) -> CompanyAtlasLazyList:
+        return normalize_provider_results(results, command)
+
+    def get_queryset_command(
+        self,
+        command: str,
+        offset: int = 0,
+        limit: int | None = None,
+        ordering: list[str] | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Return the command results as a virtual queryset.
+
+        When ``limit`` is given, only the rows needed to show ``limit`` results from
+        ``offset`` are fetched (see ``get_window_command``). The window needs the
+        process-wide pool: with ``COMPANYATLAS["PROVIDER_POOL"]`` set to ``False``,
+        the companyatlas helpers return every row and the page is sliced locally.
+        """
+        kwargs["country_code"] = self.get_country_code(**kwargs)
+        if limit is not None and get_companyatlas_setting("PROVIDER_POOL", True):
+            return self.get_window_command(command, offset, limit, ordering, **kwargs)
+        ignore_cache = kwargs.pop("ignore_cache", False)
+        cached = None if ignore_cache else self.get_cached_command(command, **kwargs)
+        if cached is None:
+            results = self.call_command(command, **kwargs)
+            self._cached_providers[command] = results
+            data_list = self.get_command_data_list(results, command)
+            cached = self.cache_results(command, results, data_list, **kwargs)
+        if ordering:
+            cached = cached.order_by(*ordering)
+        return cached
+
+    def _get_offset_window(
+        self, command: str, provider: Any, offset: int, limit: int, **kwargs: Any
+    ) -> Any:
+        """Ask ``provider`` for the page alone, when its service declares ``offset``.
+
+        Returns the results, or ``None`` when the provider cannot fill the page
+        plus one row, the following providers' rows being then needed.
+        """
+        result = call_provider(provider, command, {"offset": offset, "limit": limit + 1}, **kwargs)
+        rows = result.get("result")
+        if "offset" not in result["optional"] or "error" in result or not isinstance(rows, list):
+            return None
+        return [result] if len(rows) > limit else None
+
+    def get_window_command(
+        self,
+        command: str,
+        offset: int,
+        limit: int,
+        ordering: list[str] | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Fetch the rows of the page, plus one telling whether a next page exists.
+
+        Without ordering, a first provider whose service declares ``offset`` and
+        ``limit`` is asked for the page alone; when it fills it, no other provider
+        is called. Otherwise the rows up to ``offset + limit + 1`` are fetched:
+        providers are called one by one, by priority. Those whose service declares
+        ``limit`` (and ``ordering`` when sorting) get them, the others return all
+        their rows. Without ordering, no more providers are called once enough rows
+        are fetched; with ordering, every provider is called so the fetched rows
+        hold the global top. These windows are cached and reused by the previous
+        pages. Providers being called in turn, ``hedge`` is ignored.
+        """
+        ignore_cache = kwargs.pop("ignore_cache", False)
+        kwargs.pop("hedge", None)
+        stop = offset + limit + 1
+        cache_kwargs = {**kwargs, "ordering": ordering, "window": True}
+        page_kwargs = {**cache_kwargs, "offset": offset}
+        if not ignore_cache:
+            cached = self.get_cached_command(command, **cache_kwargs)
+            if cached is not None and (cached.complete or len(cached._result_cache) >= stop):
+                return cached.order_by(*ordering) if ordering else cached
+            cached = None if ordering else self.get_cached_command(command, **page_kwargs)
+            if cached is not None:
+                return cached
+
+        first = kwargs.pop("first", False)
+        providers = get_companyatlas_providers(
+            kwargs.pop("attribute_search", None), kwargs.pop("country_code", None)
+        )
+        if offset and not ordering and providers:
+            results = self._get_offset_window(command, providers[0], offset, limit, **kwargs)
+            if results is not None:
+                self._cached_providers[command] = results
+                data_list = self.get_command_data_list(results, command)
+                data_list.offset, data_list.complete = offset, False
+                return self.cache_results(command, results, data_list, **page_kwargs)
+
+        results, fetched, complete = [], 0, True
+        for index, provider in enumerate(providers):
+            window = {"limit": stop, "ordering": ordering}
+            result = call_provider(provider, command, window, **kwargs)
+            results.append(result)
+            if "error" in result:
+                continue
+            rows = result.get("result")
+            count = len(rows) if isinstance(rows, list) else int(rows is not None)
+            fetched += count
+            if "limit" in result["optional"] and count >= stop:
+                complete = False
+            if first:
+                break
+            if not ordering and fetched >= stop:
+                complete = complete and index == len(providers) - 1
+                break
+
+        self._cached_providers[command] = results
+        data_list = self.get_command_data_list(results, command)
+        data_list.complete = complete
+        cached = self.cache_results(command, results, data_list, **cache_kwargs)
+        return cached.order_by(*ordering) if ordering else cached
+
+
+class CompanyAtlasVirtualCommandManager(CompanyAtlasCommandMixin, VirtualManager):
+    """Base manager for virtual models listing a company's provider results.
+
+    Once a stored company's rows are synced to ``_local_model`` (see ``sync``), they
+    are read from that table instead of the providers.
+    """
+
+    _command: str = ""
+    # Local table the command's rows are synced to, and its refresh facet.
+    _local_model: str = ""
+    _local_facet: str = ""
+    # Local field to virtual row key, ``backend`` being the local ``source``.
+    _local_fields: dict[str, str] = {}
+
+    def __init__(self, code: str | None = None, **kwargs: Any):
+        super().__init__()
+        self.code = code
+        self.first = kwargs.get("first", False)
+        self.backend = kwargs.get("backend", None)
+        self.attribute_search = kwargs.get("attribute_search", None)
+        self._cached_providers = {}
+
+    def get_local_company(
+        self, code: str, backend: str | None = None, company: int | None = None
+    ) -> int | None:
+        """Return the primary key of the stored company with ``code`` once synced.
+
+        Companies of other sources may share a code: ``backend`` (the company's
+        ``source``) or ``company`` (its primary key) picks one. Returns ``None`` when
+        no company matches, or several do.
+        """
+        model = apps.get_model(self._local_model)
+        lookups = {"code": code, f"{self._local_facet}_refreshed_at__isnull": False}
+        if backend:
+            lookups["source"] = backend
+        if company is not None:
+            lookups["pk"] = company
+        companies = model._meta.get_field("company").related_model.objects
+        pks = list(companies.filter(**lookups).values_list("pk", flat=True)[:2])
+        return pks[0] if len(pks) == 1 else None
+
+    def get_local_queryset(self, company: int, ordering: list[str] | None = None) -> Any:
+        """Return the synced rows of the stored company with primary key ``company``."""
+        model = apps.get_model(self._local_model)
+        rows = model.objects.filter(company=company).order_by("-date").values(*self._local_fields)
+        data = [
+            {key: row[field] for field, key in self._local_fields.items()} for row in rows
+        ]
+        queryset = self.queryset_class(model=self.model, data=data)
+        return queryset.order_by(*ordering) if ordering else queryset
+
+    def get_company_rows(
+        self, code: str, local: bool = True, company: int | None = None, **kwargs: Any
+    ) -> Any:
+        """Return the rows of a company, from the local table when it is synced.
+
+        The local rows are those of the stored company picked by ``get_local_company``,
+        from the provider name of ``attribute_search`` and ``company``. Pass
+        ``local=False`` to call the providers anyway.
+        """
+        if local and self._local_model:
+            backend = (kwargs.get("attribute_search") or {}).get("name")
+            pk = self.get_local_company(code, backend, company)
+            if pk is not None:
+                return self.get_local_queryset(pk, kwargs.get("ordering"))
+        return self.get_queryset_command(self._command, code=code, **kwargs)
+
+    def fetch_command_data(self, command: str, **kwargs: Any) -> CompanyAtlasLazyList:
+        """Call providers and return the normalized results, bypassing the cache."""
+        results = self.call_command(command, **kwargs)
+        return self.get_command_data_list(results, command)
+
+    def get_data(self) -> Any:
+        if not self.code:
+            return self.queryset_class(model=self.model, data=[])
+        kwargs = {
+            "first": self.first,
+            "attribute_search": self.attribute_search,
+        }
+        if self.backend:
+            kwargs["attribute_search"] = {"name": self.backend}
+        return self.get_company_rows(self.code, **kwargs)
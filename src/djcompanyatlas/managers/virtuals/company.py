@@ -1,32 +1,100 @@
 from typing import Any
 
-from companyatlas.helpers import search_company, search_company_by_reference
 from djproviderkit.managers import BaseServiceProviderManager
 
+from ...conf import get_companyatlas_setting
+from ...providers import call_providers_batch, call_providers_hedged
+from .base import CompanyAtlasCommandMixin
 
-class CompanyAtlasVirtualCompanyManager(BaseServiceProviderManager):
+
+class CompanyAtlasVirtualCompanyManager(CompanyAtlasCommandMixin, BaseServiceProviderManager):
     """Manager for company search from companyatlas."""
 
+    negative_cache_enabled = True
+
     _commands = {
-        'search_company': search_company,
-        'search_company_by_reference': search_company_by_reference,
+        'search_company': 'companyatlas.helpers.search_company',
+        'search_company_by_reference': 'companyatlas.helpers.search_company_by_reference',
+    }
+
+    # Provider methods answering many queries of a command at once.
+    _batch_commands = {
+        'search_company': 'search_companies',
     }
 
     _args_available = ['query', 'code', 'first', 'backend']
 
     def search_company(self, query: str, first: bool = False, **kwargs: Any) -> Any:
+        """Search companies, only calling the providers covering ``country_code``."""
         return self.get_queryset_command('search_company', query=query, first=first, **kwargs)
 
-    def search_company_by_reference(self, code: str, **kwargs: Any) -> Any:
-        code = code.split("_")
-        reference = code[-1]
-        backend = "_".join(code[:-1])
+    def search_companies(
+        self, queries: list[str], first: bool = False, **kwargs: Any
+    ) -> dict[str, Any]:
+        """Search many queries at once, returning their querysets keyed by query.
+
+        Duplicate queries are searched once and cached queries are not searched
+        again. The others are dispatched concurrently (see ``call_providers_batch``),
+        using the providers' ``search_companies`` batch endpoint when they have one.
+        """
+        ignore_cache = kwargs.pop("ignore_cache", False)
+        querysets, misses = {}, {}
+        for query in dict.fromkeys(queries):
+            command_kwargs = {"query": query, "first": first, **kwargs}
+            command_kwargs["country_code"] = self.get_country_code(**command_kwargs)
+            cached = None
+            if not ignore_cache:
+                cached = self.get_cached_command("search_company", **command_kwargs)
+            if cached is not None:
+                querysets[query] = cached
+            else:
+                misses[query] = command_kwargs
+
+        if misses:
+            batch_command = self._batch_commands["search_company"]
+            batch = call_providers_batch("search_company", misses, batch_command)
+            for query, results in batch.items():
+                data_list = self.get_command_data_list(results, "search_company")
+                querysets[query] = self.cache_results(
+                    "search_company", results, data_list, **misses[query]
+                )
+        return {query: querysets[query] for query in queries}
+
+    def search_company_by_reference(
+        self, code: str, hedge: bool | None = None, backend: str | None = None, **kwargs: Any
+    ) -> Any:
+        """Look a reference up, ``hedge`` defaulting to ``COMPANYATLAS["HEDGE_REFERENCE"]``.
+
+        ``code`` is ``<backend>_<reference>``, unless ``backend`` is given: ``code`` is
+        then the reference itself, looked up with that backend only, or with every
+        backend when ``backend`` is empty.
+        """
+        if backend is None:
+            code = code.split("_")
+            reference = code[-1]
+            backend = "_".join(code[:-1])
+            kwargs["attribute_search"] = {"name": backend}
+        else:
+            reference = code
+            if backend:
+                kwargs["attribute_search"] = {"name": backend}
+        if hedge is None:
+            hedge = get_companyatlas_setting("HEDGE_REFERENCE", False)
+        if hedge:
+            kwargs["hedge"] = True
         return self.get_queryset_command(
             'search_company_by_reference',
             code=reference,
-            attribute_search={"name": backend},
             **kwargs)
 
+    def call_command(
+        self, command: str, hedge: bool = False, **kwargs: Any
+    ) -> list[dict[str, Any]]:
+        """Call the providers, returning the first good answer when ``hedge`` is set."""
+        if hedge:
+            return call_providers_hedged(command, **kwargs)
+        return super().call_command(command, **kwargs)
+
     def get_data(self) -> Any:
         if not self.query and not self.code:
             return []
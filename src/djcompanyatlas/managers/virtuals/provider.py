@@ -1,9 +1,22 @@
 """Manager for companyatlas providers."""
 
+from typing import Any
 
 from djproviderkit.managers import BaseProviderManager
 
+from ...providers import get_companyatlas_providers
+
 
 class CompanyAtlasProviderManager(BaseProviderManager):
     """Manager for companyatlas providers."""
     package_name = 'companyatlas'
+
+    def get_data(self) -> list[Any]:
+        if not self.model:
+            return []
+        providers = get_companyatlas_providers()
+        providers_by_name = getattr(self, "_providers_by_name", None)
+        if providers_by_name is not None:
+            providers_by_name.clear()
+            providers_by_name.update({provider.name: provider for provider in providers})
+        return providers
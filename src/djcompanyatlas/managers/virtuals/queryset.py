@@ -0,0 +1,180 @@
+"""Lazily evaluated virtual querysets for provider results."""
+
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from virtualqueryset.queryset import VirtualQuerySet
+
+from ...timing import timing_bucket
+
+
+class CompanyAtlasLazyList(Sequence):
+    """Sequence applying ``transform`` to an item on first access only.
+
+    Slicing transforms the selected items only, so a page of results costs the
+    same whatever the total number of results. ``complete`` is false when the
+    providers hold more results than the fetched ones. A list holding a single
+    page starts at ``offset``: reading a row before it raises ``IndexError``.
+    ``errors`` maps the providers that failed to their error.
+    """
+
+    def __init__(
+        self,
+        items: Sequence[Any],
+        transform: Callable[[Any], Any],
+        complete: bool = True,
+        offset: int = 0,
+        errors: dict[str, str] | None = None,
+    ):
+        self._items = items
+        self._transform = transform
+        self._transformed: dict[int, Any] = {}
+        self.complete = complete
+        self.offset = offset
+        self.errors = errors or {}
+
+    def __len__(self) -> int:
+        return self.offset + len(self._items)
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < self.offset:
+            raise IndexError(index)
+        if index not in self._transformed:
+            self._transformed[index] = self._transform(self._items[index - self.offset])
+        return self._transformed[index]
+
+    def then(self, transform: Callable[[Any], Any]) -> "CompanyAtlasLazyList":
+        return CompanyAtlasLazyList(self, transform, self.complete)
+
+    def reverse(self) -> "CompanyAtlasLazyList":
+        return CompanyAtlasLazyList(_ReversedSequence(self), lambda obj: obj, self.complete)
+
+
+class _ReversedSequence(Sequence):
+    def __init__(self, items: Sequence[Any]):
+        self._items = items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index: int) -> Any:
+        if not 0 <= index < len(self._items):
+            raise IndexError(index)
+        return self._items[len(self._items) - 1 - index]
+
+
+def normalize_provider_results(
+    results: Any, command: str, complete: bool = True
+) -> CompanyAtlasLazyList:
+    """Flatten ``call_providers`` results into a lazily normalized list.
+
+    Failed providers are skipped and listed in the ``errors`` of the returned list.
+    The rows of a provider are normalized with its ``get_service_normalize`` the
+    first time one of them is accessed, on the provider instance of the call (see
+    ``providers.get_call_instance``).
+    """
+    providers, items, errors = [], [], {}
+    for result in results:
+        if not isinstance(result, dict) or "provider" not in result:
+            continue
+        raw = result.get("result")
+        if "error" in result or (isinstance(raw, dict) and "error" in raw):
+            error = result["error"] if "error" in result else raw["error"]
+            errors[result.get("name", "")] = str(error)
+            continue
+        if isinstance(raw, list):
+            items.extend((len(providers), position) for position in range(len(raw)))
+        elif raw is not None:
+            items.append((len(providers), None))
+        providers.append(result["provider"])
+
+    normalized: dict[int, Any] = {}
+
+    def normalize(item: tuple[int, int | None]) -> Any:
+        index, position = item
+        if index not in normalized:
+            with timing_bucket("normalize"):
+                normalized[index] = providers[index].get_service_normalize(command)
+        rows = normalized[index]
+        return rows if position is None else rows[position]
+
+    return CompanyAtlasLazyList(items, normalize, complete, errors=errors)
+
+
+class CompanyAtlasVirtualQuerySet(VirtualQuerySet):
+    """Virtual queryset converting provider rows to model instances on demand.
+
+    ``count()``, ``exists()`` and slicing leave the other rows untouched. Ordering
+    on the primary key only keeps the provider order (``pk``) or reverses it
+    (``-pk``), without building every row. Provider windows fetch one row past the
+    page, so ``count()`` offers a next page only when it holds rows.
+    """
+
+    @property
+    def complete(self) -> bool:
+        return getattr(self._result_cache, "complete", True)
+
+    def count(self) -> int:
+        return len(self._result_cache)
+
+    def _from_data(self, data: Any) -> Any:
+        if isinstance(data, CompanyAtlasVirtualQuerySet):
+            return data._result_cache
+        if isinstance(data, CompanyAtlasLazyList):
+            return data.then(self._item_to_model)
+        return super()._from_data(data)
+
+    def _item_to_model(self, item: Any) -> Any:
+        if isinstance(item, self.model):
+            return item
+        if isinstance(item, dict):
+            return self._dict_to_model(item)
+        return self._object_to_model(item)
+
+    def _is_pk_ordering(self, fields: Any) -> bool:
+        names = {"pk", "-pk", self.model._meta.pk.name, f"-{self.model._meta.pk.name}"}
+        return all(field in names for field in fields)
+
+    def _is_descending(self, fields: Any) -> bool:
+        return bool(fields) and self._is_pk_ordering(fields) and fields[0].startswith("-")
+
+    def _with_result_cache(
+        self, result_cache: Any, query: Any = None
+    ) -> "CompanyAtlasVirtualQuerySet":
+        clone = self.__class__(
+            model=self.model,
+            query=query if query is not None else self.query.clone(),
+            using=self._db,
+            hints=self._hints,
+        )
+        clone._result_cache = result_cache
+        return clone
+
+    def _clone(self) -> "CompanyAtlasVirtualQuerySet":
+        return self._with_result_cache(self._result_cache)
+
+    def order_by(self, *fields: str) -> "CompanyAtlasVirtualQuerySet":
+        if not self._is_pk_ordering(fields):
+            ordered = super().order_by(*fields)
+            if not self.complete:
+                ordered._result_cache = CompanyAtlasLazyList(
+                    ordered._result_cache, lambda obj: obj, False
+                )
+            return ordered
+        query = self.query.clone()
+        query.order_by = list(fields)
+        result_cache = self._result_cache
+        if self._is_descending(fields) != self._is_descending(self.query.order_by):
+            if not isinstance(result_cache, CompanyAtlasLazyList):
+                result_cache = CompanyAtlasLazyList(result_cache, lambda obj: obj, self.complete)
+            result_cache = result_cache.reverse()
+        return self._with_result_cache(result_cache, query)
+
+    def __iter__(self) -> Any:
+        if self._is_pk_ordering(self.query.order_by):
+            return iter(self._result_cache)
+        return super().__iter__()
@@ -0,0 +1,67 @@
+"""Middleware for companyatlas."""
+
+from contextlib import ExitStack
+
+from django.db import connections
+
+from .conf import get_companyatlas_setting
+from .loader import loader_scope
+from .timing import (
+    COMPANYATLAS_TIMING_HEADER,
+    format_server_timing,
+    log_timings,
+    timing_bucket,
+    timing_scope,
+)
+
+
+class CompanyAtlasLoaderMiddleware:
+    """Batch company and facet lookups made while handling a request.
+
+    Add ``"djcompanyatlas.middleware.CompanyAtlasLoaderMiddleware"`` to ``MIDDLEWARE``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with loader_scope():
+            return self.get_response(request)
+
+
+def _time_query(execute, sql, params, many, context):
+    with timing_bucket("db"):
+        return execute(sql, params, many, context)
+
+
+class CompanyAtlasTimingMiddleware:
+    """Break each request's wall time down between providers, queries and rendering.
+
+    Add ``"djcompanyatlas.middleware.CompanyAtlasTimingMiddleware"`` first in
+    ``MIDDLEWARE`` (see ``djcompanyatlas.timing`` for the buckets). The breakdown is
+    sent in a ``Server-Timing`` header, to staff users only unless
+    ``COMPANYATLAS["TIMING_HEADER"]`` is ``True`` (everyone) or ``False`` (nobody), and
+    kept for the request timings page of the providers admin.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with timing_scope() as timings, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_time_query))
+            response = self.get_response(request)
+        summary = timings.finish()
+        log_timings({
+            "path": request.path,
+            "method": request.method,
+            "status": response.status_code,
+            **summary,
+        })
+        header = get_companyatlas_setting("TIMING_HEADER", COMPANYATLAS_TIMING_HEADER)
+        if header == "staff":
+            header = getattr(getattr(request, "user", None), "is_staff", False)
+        if header:
+            response["Server-Timing"] = format_server_timing(summary)
+        return response
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("djcompanyatlas", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="companyatlasaddress",
+            index=models.Index(
+                fields=["company", "updated_at"], name="djcompanyat_company_1d77b9_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="companyatlasdata",
+            index=models.Index(
+                fields=["company", "updated_at"], name="djcompanyat_company_26400f_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,71 @@
+import hashlib
+import json
+
+from django.db import migrations, models
+
+# Content fields hashed per model, as in their ``content_hash_fields``.
+CONTENT_HASH_FIELDS = {
+    "companyatlasdata": ["value_type", "value", "metadata"],
+    "companyatlasaddress": ["address", "metadata"],
+}
+BATCH_SIZE = 1000
+
+
+def backfill_content_hash(apps, schema_editor):
+    """Hash the existing rows, so the first upsert does not see them all as changed."""
+    for model_name, fields in CONTENT_HASH_FIELDS.items():
+        model = apps.get_model("djcompanyatlas", model_name)
+        rows = model.objects.using(schema_editor.connection.alias).only("pk", *fields)
+        batch = []
+        for row in rows.iterator(chunk_size=BATCH_SIZE):
+            content = json.dumps(
+                [getattr(row, field) for field in fields], sort_keys=True, default=str
+            )
+            row.content_hash = hashlib.sha256(content.encode()).hexdigest()
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                model.objects.bulk_update(batch, ["content_hash"])
+                batch = []
+        model.objects.bulk_update(batch, ["content_hash"])
+
+
+def content_hash_field():
+    return models.CharField(
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Hash of the content fields, used to skip unchanged rows",
+        max_length=64,
+        verbose_name="Content hash",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("djcompanyatlas", "0002_refresh_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="companyatlasaddress",
+            name="content_hash",
+            field=content_hash_field(),
+        ),
+        migrations.AddField(
+            model_name="companyatlasdata",
+            name="content_hash",
+            field=content_hash_field(),
+        ),
+        migrations.AddField(
+            model_name="companyatlasdocument",
+            name="content_hash",
+            field=content_hash_field(),
+        ),
+        migrations.AddField(
+            model_name="companyatlasevent",
+            name="content_hash",
+            field=content_hash_field(),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,118 @@
+import hashlib
+import json
+
+from django.db import migrations, models
+
+# Natural key and content fields per model, as in their ``natural_key_fields`` and
+# ``content_hash_fields``.
+HASH_FIELDS = {
+    "companyatlasdocument": (
+        ["source", "document_type", "date", "url", "title"],
+        ["content", "country_code", "metadata"],
+    ),
+    "companyatlasevent": (
+        ["source", "event_type", "date", "title"],
+        ["description", "country_code", "metadata"],
+    ),
+}
+BATCH_SIZE = 1000
+
+
+def get_hash(row, fields):
+    content = json.dumps([getattr(row, field) for field in fields], sort_keys=True, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def backfill_natural_key(apps, schema_editor):
+    """Key and hash the existing rows.
+
+    Only the first of the rows sharing a natural key within a company gets it; the
+    others keep an empty key, left out of the unique constraint.
+    """
+    for model_name, (key_fields, content_fields) in HASH_FIELDS.items():
+        model = apps.get_model("djcompanyatlas", model_name)
+        rows = model.objects.using(schema_editor.connection.alias).order_by("pk")
+        seen, batch = set(), []
+        for row in rows.iterator(chunk_size=BATCH_SIZE):
+            natural_key = get_hash(row, key_fields)
+            if (row.company_id, natural_key) not in seen:
+                seen.add((row.company_id, natural_key))
+                row.natural_key = natural_key
+            row.content_hash = get_hash(row, content_fields)
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                model.objects.bulk_update(batch, ["natural_key", "content_hash"])
+                batch = []
+        model.objects.bulk_update(batch, ["natural_key", "content_hash"])
+
+
+def natural_key_field():
+    return models.CharField(
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Hash of the fields identifying the row within its company",
+        max_length=64,
+        verbose_name="Natural key",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("djcompanyatlas", "0003_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="companyatlasdocument",
+            name="natural_key",
+            field=natural_key_field(),
+        ),
+        migrations.AddField(
+            model_name="companyatlasevent",
+            name="natural_key",
+            field=natural_key_field(),
+        ),
+        migrations.RunPython(backfill_natural_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="companyatlasdocument",
+            index=models.Index(
+                fields=["company", "-date"], name="djcompanyat_company_bec895_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="companyatlasdocument",
+            index=models.Index(
+                fields=["company", "updated_at"], name="djcompanyat_company_17e128_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="companyatlasevent",
+            index=models.Index(
+                fields=["company", "-date"], name="djcompanyat_company_84b188_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="companyatlasevent",
+            index=models.Index(
+                fields=["company", "updated_at"], name="djcompanyat_company_ea4eda_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="companyatlasdocument",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("natural_key", ""), _negated=True),
+                fields=("company", "natural_key"),
+                name="djcompanyatlas_companyatlasdocument_unique_natural_key",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="companyatlasevent",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("natural_key", ""), _negated=True),
+                fields=("company", "natural_key"),
+                name="djcompanyatlas_companyatlasevent_unique_natural_key",
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+import hashlib
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_value_hash(apps, schema_editor):
+    model = apps.get_model("djcompanyatlas", "companyatlasdata")
+    rows = model.objects.using(schema_editor.connection.alias).order_by("pk")
+    batch = []
+    for row in rows.only("pk", "value").iterator(chunk_size=BATCH_SIZE):
+        row.value_hash = hashlib.sha256(str(row.value).encode()).hexdigest()
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            model.objects.bulk_update(batch, ["value_hash"])
+            batch = []
+    model.objects.bulk_update(batch, ["value_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("djcompanyatlas", "0004_document_event_natural_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="companyatlasdata",
+            name="value_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="Hash of the value, indexed to resolve identifiers",
+                max_length=64,
+                verbose_name="Value hash",
+            ),
+        ),
+        migrations.RunPython(backfill_value_hash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="companyatlasdata",
+            index=models.Index(
+                fields=["data_type", "value_hash"], name="djcompanyat_data_ty_3d8955_idx"
+            ),
+        ),
+    ]
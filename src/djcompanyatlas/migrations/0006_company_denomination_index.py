@@ -0,0 +1,47 @@
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+INDEX_NAME = "djcompanyatlas_denom_upper_idx"
+
+
+def get_index():
+    return models.Index(Upper("denomination"), name=INDEX_NAME)
+
+
+def create_index(apps, schema_editor):
+    """Index ``UPPER(denomination)``.
+
+    PostgreSQL only uses an index for ``LIKE 'prefix%'`` with a pattern operator
+    class (or the C collation), and matches the expression of
+    ``denomination__istartswith`` lookups.
+    """
+    model = apps.get_model("djcompanyatlas", "CompanyAtlasCompany")
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.add_index(model, get_index())
+        return
+    table = schema_editor.quote_name(model._meta.db_table)
+    schema_editor.execute(
+        f'CREATE INDEX {schema_editor.quote_name(INDEX_NAME)} ON {table} '
+        f'((UPPER("denomination"::text)) text_pattern_ops)'
+    )
+
+
+def drop_index(apps, schema_editor):
+    model = apps.get_model("djcompanyatlas", "CompanyAtlasCompany")
+    schema_editor.remove_index(model, get_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("djcompanyatlas", "0005_data_type_value_index"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(create_index, drop_index)],
+            state_operations=[
+                migrations.AddIndex(model_name="companyatlascompany", index=get_index()),
+            ],
+        ),
+    ]
@@ -0,0 +1,114 @@
+from datetime import datetime
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+# Refresh facet to its stamp field, and the model whose last update stands for the
+# stamp of companies refreshed before the stamps were kept.
+FACETS = {
+    "data": ("data_refreshed_at", "companyatlasdata"),
+    "address": ("address_refreshed_at", "companyatlasaddress"),
+    "event": ("event_refreshed_at", None),
+    "document": ("document_refreshed_at", None),
+}
+BATCH_SIZE = 1000
+
+
+def backfill_refreshed_at(apps, schema_editor):
+    """Move the stamps kept in ``metadata["refreshed_at"]`` to their fields.
+
+    Events and documents are only stamped once synced, since a stamp switches their
+    reads to the local tables.
+    """
+    model = apps.get_model("djcompanyatlas", "companyatlascompany")
+    alias = schema_editor.connection.alias
+    rows = model.objects.using(alias).order_by("pk").annotate(
+        **{
+            f"last_{facet}": Subquery(
+                apps.get_model("djcompanyatlas", related)
+                .objects.using(alias)
+                .filter(company=OuterRef("pk"))
+                .order_by("-updated_at")
+                .values("updated_at")[:1]
+            )
+            for facet, (_, related) in FACETS.items()
+            if related
+        }
+    )
+    fields = [field for field, _ in FACETS.values()]
+    batch = []
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        stamps = (row.metadata or {}).pop("refreshed_at", {})
+        for facet, (field, related) in FACETS.items():
+            if stamps.get(facet):
+                setattr(row, field, datetime.fromisoformat(stamps[facet]))
+            elif related:
+                setattr(row, field, getattr(row, f"last_{facet}"))
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            model.objects.bulk_update(batch, [*fields, "metadata"])
+            batch = []
+    model.objects.bulk_update(batch, [*fields, "metadata"])
+
+
+def refreshed_at_field(verbose_name):
+    return models.DateTimeField(
+        blank=True, editable=False, null=True, verbose_name=verbose_name
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("djcompanyatlas", "0006_company_denomination_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="companyatlascompany",
+            name="data_refreshed_at",
+            field=refreshed_at_field("Data refreshed at"),
+        ),
+        migrations.AddField(
+            model_name="companyatlascompany",
+            name="address_refreshed_at",
+            field=refreshed_at_field("Address refreshed at"),
+        ),
+        migrations.AddField(
+            model_name="companyatlascompany",
+            name="event_refreshed_at",
+            field=refreshed_at_field("Events refreshed at"),
+        ),
+        migrations.AddField(
+            model_name="companyatlascompany",
+            name="document_refreshed_at",
+            field=refreshed_at_field("Documents refreshed at"),
+        ),
+        migrations.RunPython(backfill_refreshed_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="companyatlascompany",
+            index=models.Index(
+                fields=["data_refreshed_at", "created_at"], name="djcompanyat_data_re_5eb939_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="companyatlascompany",
+            index=models.Index(
+                fields=["address_refreshed_at", "created_at"],
+                name="djcompanyat_address_c156d4_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="companyatlascompany",
+            index=models.Index(
+                fields=["event_refreshed_at", "created_at"], name="djcompanyat_event_r_23f273_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="companyatlascompany",
+            index=models.Index(
+                fields=["document_refreshed_at", "created_at"],
+                name="djcompanyat_documen_be5be7_idx",
+            ),
+        ),
+    ]
@@ -4,11 +4,13 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from djgeoaddress.fields import GeoaddressField
 
+from ..loader import load_company
+from ..managers.source import CompanyAtlasSourceManager
 from .company import CompanyAtlasCompany
-from .source import CompanyAtlasSourceBase
+from .source import CompanyAtlasContentHashBase
 
 
-class CompanyAtlasAddress(CompanyAtlasSourceBase):
+class CompanyAtlasAddress(CompanyAtlasContentHashBase):
     """Company addresses from various backends."""
 
     company = models.ForeignKey(
@@ -28,14 +30,19 @@ class CompanyAtlasAddress(CompanyAtlasSourceBase):
         help_text=_("Whether this address is the company's headquarters"),
     )
 
+    objects = CompanyAtlasSourceManager()
+
+    content_hash_fields = ["address", "metadata"]
+
     class Meta:
         verbose_name = _("Company Address")
         verbose_name_plural = _("Company Addresses")
         indexes = [
             models.Index(fields=["company", "address"]),
             models.Index(fields=["company", "is_headquarters"]),
+            models.Index(fields=["company", "updated_at"]),
         ]
         ordering = ["-is_headquarters", "-created_at"]
 
     def __str__(self):
-        return f"{self.company.denomination} - {self.address}"
+        return f"{load_company(self).denomination} - {self.address}"
@@ -1,9 +1,11 @@
 """Company models with international and country-specific data."""
 
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
 from namedid.fields import NamedIDField
 
+from ..loader import load_related
 from ..managers.company import CompanyAtlasCompanyManager
 from .source import CompanyAtlasSourceBase
 
@@ -30,6 +32,32 @@ class CompanyAtlasCompany(CompanyAtlasSourceBase):
         verbose_name=_("Named ID"),
         help_text=_("Named ID"),
     )
+    # Last refresh of each facet (see ``djcompanyatlas.refresh``), indexed so the
+    # scheduler picks the stalest companies without aggregating their rows.
+    data_refreshed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Data refreshed at"),
+    )
+    address_refreshed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Address refreshed at"),
+    )
+    event_refreshed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Events refreshed at"),
+    )
+    document_refreshed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Documents refreshed at"),
+    )
 
     objects = CompanyAtlasCompanyManager()
 
@@ -39,6 +67,12 @@ class CompanyAtlasCompany(CompanyAtlasSourceBase):
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["-created_at"]),
+            # Prefix searches (``denomination__istartswith``) of the autocomplete.
+            models.Index(Upper("denomination"), name="djcompanyatlas_denom_upper_idx"),
+            models.Index(fields=["data_refreshed_at", "created_at"]),
+            models.Index(fields=["address_refreshed_at", "created_at"]),
+            models.Index(fields=["event_refreshed_at", "created_at"]),
+            models.Index(fields=["document_refreshed_at", "created_at"]),
         ]
 
     def __str__(self):
@@ -46,4 +80,7 @@ class CompanyAtlasCompany(CompanyAtlasSourceBase):
 
     @property
     def headquarters_address(self):
-        return self.to_companyatlasaddress.filter(is_headquarters=True).first()
+        addresses = load_related(self, "to_companyatlasaddress")
+        if addresses is None:
+            return self.to_companyatlasaddress.filter(is_headquarters=True).first()
+        return next((a for a in addresses if a.is_headquarters), None)
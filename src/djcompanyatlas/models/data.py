@@ -1,15 +1,18 @@
 """Company data models."""
 
+import hashlib
 
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from ..loader import load_company
+from ..managers.source import CompanyAtlasSourceManager
 from .company import CompanyAtlasCompany
 from .referentiel import CompanyAtlasReferentiel
-from .source import CompanyAtlasSourceBase
+from .source import CompanyAtlasContentHashBase
 
 
-class CompanyAtlasData(CompanyAtlasSourceBase):
+class CompanyAtlasData(CompanyAtlasContentHashBase):
     """Company data from various backends."""
 
     company = models.ForeignKey(
@@ -40,6 +43,14 @@ class CompanyAtlasData(CompanyAtlasSourceBase):
         verbose_name=_("Value"),
         help_text=_("Data value"),
     )
+    value_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        editable=False,
+        verbose_name=_("Value hash"),
+        help_text=_("Hash of the value, indexed to resolve identifiers"),
+    )
     referentiel = models.ManyToManyField(
         CompanyAtlasReferentiel,
         verbose_name=_("Referentiel"),
@@ -48,6 +59,11 @@ class CompanyAtlasData(CompanyAtlasSourceBase):
         blank=True,
     )
 
+    objects = CompanyAtlasSourceManager()
+
+    content_hash_fields = ["value_type", "value", "metadata"]
+    content_derived_fields = ["value_hash"]
+
     class Meta:
         verbose_name = _("Company Data")
         verbose_name_plural = _("Company Data")
@@ -55,15 +71,26 @@ class CompanyAtlasData(CompanyAtlasSourceBase):
         indexes = [
             models.Index(fields=["company", "country_code"]),
             models.Index(fields=["data_type"]),
+            models.Index(fields=["company", "updated_at"]),
+            models.Index(fields=["data_type", "value_hash"]),
         ]
         ordering = ["data_type", "-created_at"]
 
     def __str__(self):
         return (
-            f"{self.company.denomination} - {self.source} - "
+            f"{load_company(self).denomination} - {self.source} - "
             f"{self.country_code} - {self.data_type}"
         )
 
+    @staticmethod
+    def get_value_hash(value: str) -> str:
+        """Return the SHA-256 of a value, ``value`` being too long to index."""
+        return hashlib.sha256(str(value).encode()).hexdigest()
+
+    def compute_content_hash(self) -> str:
+        self.value_hash = self.get_value_hash(self.value)
+        return super().compute_content_hash()
+
     @property
     def referentiel_description(self):
         return self.sql_referentiel_description
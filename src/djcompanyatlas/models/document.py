@@ -1,11 +1,13 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from ..loader import load_company
+from ..managers.source import CompanyAtlasSourceManager
 from .company import CompanyAtlasCompany
-from .source import CompanyAtlasSourceBase
+from .source import CompanyAtlasNaturalKeyBase
 
 
-class CompanyAtlasDocument(CompanyAtlasSourceBase):
+class CompanyAtlasDocument(CompanyAtlasNaturalKeyBase):
     """Company documents from various backends."""
 
     company = models.ForeignKey(
@@ -42,6 +44,11 @@ class CompanyAtlasDocument(CompanyAtlasSourceBase):
         help_text=_("Document content or summary"),
     )
 
+    objects = CompanyAtlasSourceManager()
+
+    natural_key_fields = ["source", "document_type", "date", "url", "title"]
+    content_hash_fields = ["content", "country_code", "metadata"]
+
     class Meta:
         verbose_name = _("Company Document")
         verbose_name_plural = _("Company Documents")
@@ -49,7 +56,16 @@ class CompanyAtlasDocument(CompanyAtlasSourceBase):
             models.Index(fields=["company", "country_code"]),
             models.Index(fields=["document_type"]),
             models.Index(fields=["date"]),
+            models.Index(fields=["company", "-date"]),
+            models.Index(fields=["company", "updated_at"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company", "natural_key"],
+                condition=~models.Q(natural_key=""),
+                name="djcompanyatlas_%(class)s_unique_natural_key",
+            ),
         ]
 
     def __str__(self):
-        return f"{self.company.name} - {self.source} - {self.document_type}"
+        return f"{load_company(self).denomination} - {self.source} - {self.document_type}"
@@ -1,11 +1,13 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from ..loader import load_company
+from ..managers.source import CompanyAtlasSourceManager
 from .company import CompanyAtlasCompany
-from .source import CompanyAtlasSourceBase
+from .source import CompanyAtlasNaturalKeyBase
 
 
-class CompanyAtlasEvent(CompanyAtlasSourceBase):
+class CompanyAtlasEvent(CompanyAtlasNaturalKeyBase):
     """Company events from various backends."""
 
     company = models.ForeignKey(
@@ -37,6 +39,10 @@ class CompanyAtlasEvent(CompanyAtlasSourceBase):
         help_text=_("Event description"),
     )
 
+    objects = CompanyAtlasSourceManager()
+
+    natural_key_fields = ["source", "event_type", "date", "title"]
+    content_hash_fields = ["description", "country_code", "metadata"]
 
     class Meta:
         verbose_name = _("Company Event")
@@ -45,7 +51,16 @@ class CompanyAtlasEvent(CompanyAtlasSourceBase):
             models.Index(fields=["company", "country_code"]),
             models.Index(fields=["event_type"]),
             models.Index(fields=["date"]),
+            models.Index(fields=["company", "-date"]),
+            models.Index(fields=["company", "updated_at"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company", "natural_key"],
+                condition=~models.Q(natural_key=""),
+                name="djcompanyatlas_%(class)s_unique_natural_key",
+            ),
         ]
 
     def __str__(self):
-        return f"{self.company.name} - {self.source} - {self.event_type}"
+        return f"{load_company(self).denomination} - {self.source} - {self.event_type}"
@@ -2,6 +2,7 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from ..loader import load_company
 from .company import CompanyAtlasCompany
 from .source import CompanyAtlasSourceBase
 
@@ -85,4 +86,5 @@ class CompanyAtlasPerson(CompanyAtlasSourceBase):
         return self.denomination
 
     def __str__(self):
-        return f"{self.company.denomination} - {self.officer_or_owner} - {self.physical_or_moral}"
+        company = load_company(self)
+        return f"{company.denomination} - {self.officer_or_owner} - {self.physical_or_moral}"
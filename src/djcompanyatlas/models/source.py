@@ -1,3 +1,6 @@
+import hashlib
+import json
+
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -47,3 +50,82 @@ class CompanyAtlasSourceBase(models.Model):
             models.Index(fields=["source", "country_code"]),
             models.Index(fields=["country_code"]),
         ]
+
+
+class CompanyAtlasContentHashBase(CompanyAtlasSourceBase):
+    """Abstract base for source rows upserted by ``CompanyAtlasSourceManager``.
+
+    ``content_hash`` is the SHA-256 of ``content_hash_fields``, kept up to date on
+    save, so upserts can skip the rows whose content did not change. Fields listed
+    in ``content_derived_fields`` are set by ``compute_content_hash`` too and
+    written along with it.
+    """
+
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        editable=False,
+        verbose_name=_("Content hash"),
+        help_text=_("Hash of the content fields, used to skip unchanged rows"),
+    )
+
+    content_hash_fields: list[str] = []
+    content_derived_fields: list[str] = []
+
+    class Meta:
+        abstract = True
+
+    def compute_content_hash(self) -> str:
+        """Return the SHA-256 of ``content_hash_fields``, or an empty string if none."""
+        if not self.content_hash_fields:
+            return ""
+        content = [getattr(self, field) for field in self.content_hash_fields]
+        content = json.dumps(content, sort_keys=True, default=str)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.content_hash = self.compute_content_hash()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and set(update_fields) & set(self.content_hash_fields):
+            kwargs["update_fields"] = {
+                *update_fields, "content_hash", *self.content_derived_fields
+            }
+        super().save(*args, **kwargs)
+
+
+class CompanyAtlasNaturalKeyBase(CompanyAtlasContentHashBase):
+    """Abstract base for source rows identified by a natural key within a company.
+
+    ``natural_key`` is the SHA-256 of ``natural_key_fields``: rows sharing it within
+    a company are the same row, whose content may change (see ``content_hash``).
+    """
+
+    natural_key = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        editable=False,
+        verbose_name=_("Natural key"),
+        help_text=_("Hash of the fields identifying the row within its company"),
+    )
+
+    natural_key_fields: list[str] = []
+
+    class Meta:
+        abstract = True
+
+    def compute_natural_key(self) -> str:
+        """Return the SHA-256 of ``natural_key_fields``, or an empty string if none."""
+        if not self.natural_key_fields:
+            return ""
+        content = [getattr(self, field) for field in self.natural_key_fields]
+        content = json.dumps(content, sort_keys=True, default=str)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.natural_key = self.compute_natural_key()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and set(update_fields) & set(self.natural_key_fields):
+            kwargs["update_fields"] = {*update_fields, "natural_key"}
+        super().save(*args, **kwargs)
@@ -2,16 +2,15 @@
 
 from typing import Any
 
-from companyatlas import COMPANYATLAS_SEARCH_COMPANY_FIELDS
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from djproviderkit.models.service import define_fields_from_config
 from virtualqueryset.models import VirtualModel
 
-from djcompanyatlas.helpers import create_company
+from djcompanyatlas.discovery import get_snapshot
 from djcompanyatlas.managers.virtuals.company import CompanyAtlasVirtualCompanyManager
 
-FIELDS_COMPANYATLAS = COMPANYATLAS_SEARCH_COMPANY_FIELDS
+FIELDS_COMPANYATLAS = get_snapshot()['search_company_fields']
 
 companyatlas_id_config: dict[str, Any] = FIELDS_COMPANYATLAS['companyatlas_id']
 
@@ -42,4 +41,5 @@ class CompanyAtlasVirtualCompany(VirtualModel):
         return f"Company {companyatlas_id or 'unknown'}"
 
     def create_company(self):
+        from djcompanyatlas.helpers import create_company
         return create_company(self)
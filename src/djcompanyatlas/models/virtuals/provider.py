@@ -1,19 +1,16 @@
 """Provider model for companyatlas providers."""
 
-from companyatlas.helpers import ADD_FIELDS
-from companyatlas.providers import CompanyAtlasProvider
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from djproviderkit.models.service import define_provider_fields, define_service_fields
 from virtualqueryset.models import VirtualModel
 
+from ...discovery import get_snapshot
 from ...managers.virtuals.provider import CompanyAtlasProviderManager
 
-_default_cfg = getattr(CompanyAtlasProvider, '_default_services_cfg', {})
-services_cfg = getattr(CompanyAtlasProvider, 'services_cfg', _default_cfg)
-services = list(services_cfg.keys())
+services = get_snapshot()['services']
 
-@define_provider_fields(primary_key='name', add_fields=ADD_FIELDS)
+@define_provider_fields(primary_key='name', add_fields=get_snapshot()['provider_fields'])
 @define_service_fields(services)
 class CompanyAtlasProviderModel(VirtualModel):
     """Virtual model for companyatlas providers."""
@@ -0,0 +1,176 @@
+"""Process-wide pool of companyatlas providers and HTTP sessions."""
+
+import os
+import threading
+from collections import deque
+from typing import Any
+
+from providerkit.helpers import get_providerkit
+
+from .conf import get_companyatlas_setting
+
+COMPANYATLAS_LIB_NAME = "companyatlas"
+COMPANYATLAS_POOL_CONNECTIONS = 10
+COMPANYATLAS_POOL_MAXSIZE = 10
+COMPANYATLAS_LATENCY_WINDOW = 200
+
+
+def get_discovery_kwargs() -> dict[str, Any]:
+    """Providerkit discovery arguments.
+
+    ``COMPANYATLAS["PROVIDERS"]`` replaces the installed providers with a list of
+    providerkit configurations (``{"class": ..., "config": ..., "kwargs": ...}``),
+    for instance ``djcompanyatlas.fake.CompanyAtlasFakeProvider`` for load tests.
+    """
+    providers = get_companyatlas_setting("PROVIDERS")
+    kwargs: dict[str, Any] = {"lib_name": COMPANYATLAS_LIB_NAME}
+    if providers:
+        kwargs["config"] = providers
+    return kwargs
+
+
+class CompanyAtlasProviderPool:
+    """Provider instances and HTTP sessions kept warm for the whole process.
+
+    Providers are discovered and instantiated once; each call runs on a shallow copy
+    (see ``providers.get_call_instance``). When ``requests`` is installed, providers
+    declaring a ``session`` attribute get a pooled ``requests.Session`` there, and
+    keep their connections alive across calls. Pool sizes come from
+    ``COMPANYATLAS["POOL_CONNECTIONS"]`` (hosts kept per session) and
+    ``COMPANYATLAS["POOL_MAXSIZE"]`` (connections kept per host).
+
+    The pool also keeps the latest response times of each provider and command
+    (``COMPANYATLAS["LATENCY_WINDOW"]`` samples).
+    """
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+        self.lookups = 0
+        self._lock = threading.Lock()
+        self._providerkit: Any = None
+        self._providers: list[Any] | None = None
+        self._sessions: dict[str, Any] = {}
+        self._latencies: dict[tuple[str, str], deque] = {}
+
+    def _create_session(self) -> Any:
+        try:
+            import requests
+            from requests.adapters import HTTPAdapter
+        except ImportError:
+            return None
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=get_companyatlas_setting(
+                "POOL_CONNECTIONS", COMPANYATLAS_POOL_CONNECTIONS
+            ),
+            pool_maxsize=get_companyatlas_setting("POOL_MAXSIZE", COMPANYATLAS_POOL_MAXSIZE),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _load(self) -> list[Any]:
+        with self._lock:
+            if self._providers is None:
+                kwargs = get_discovery_kwargs()
+                self._providerkit = get_providerkit(**kwargs)
+                providers = self._providerkit.get_providers(**kwargs)
+                if isinstance(providers, dict):
+                    providers = list(providers.values())
+                for provider in providers:
+                    if not hasattr(provider, "session"):
+                        continue
+                    session = self._create_session()
+                    if session is not None:
+                        self._sessions[provider.name] = session
+                        provider.session = session
+                self._providers = list(providers)
+            return self._providers
+
+    def get_providers(self, attribute_search: dict[str, Any] | None = None) -> list[Any]:
+        """Return the pooled providers, highest priority first.
+
+        Args:
+            attribute_search: Attribute substrings to filter on, as in providerkit.
+        """
+        providers = self._providers if self._providers is not None else self._load()
+        self.lookups += 1
+        if attribute_search:
+            return self._providerkit.filter_providers(providers, attribute_search)
+        return list(providers)
+
+    def get_session(self, name: str) -> Any:
+        self.get_providers()
+        return self._sessions.get(name)
+
+    def record_latency(self, name: str, command: str, seconds: float) -> None:
+        key = (name, command)
+        if key not in self._latencies:
+            window = get_companyatlas_setting("LATENCY_WINDOW", COMPANYATLAS_LATENCY_WINDOW)
+            self._latencies.setdefault(key, deque(maxlen=window))
+        self._latencies[key].append(seconds)
+
+    def get_latency(
+        self, name: str, command: str, percentile: float = 90, min_samples: int = 1
+    ) -> float | None:
+        """Return the given percentile of the recorded response times, in seconds.
+
+        Returns ``None`` below ``min_samples`` samples.
+        """
+        samples = sorted(self._latencies.get((name, command), ()))
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percentile / 100))]
+
+    def close(self) -> None:
+        for session in self._sessions.values():
+            session.close()
+        self._sessions.clear()
+        self._providers = None
+
+    def stats(self) -> dict[str, Any]:
+        host_pools = sum(
+            len(adapter.poolmanager.pools)
+            for session in self._sessions.values()
+            for adapter in {id(a): a for a in session.adapters.values()}.values()
+        )
+        return {
+            "pid": self.pid,
+            "providers": len(self._providers or []),
+            "sessions": len(self._sessions),
+            "host_pools": host_pools,
+            "lookups": self.lookups,
+            "latencies": {
+                f"{name}.{command}": {
+                    "samples": len(samples),
+                    "p50": self.get_latency(name, command, 50),
+                    "p90": self.get_latency(name, command, 90),
+                }
+                for (name, command), samples in list(self._latencies.items())
+            },
+        }
+
+
+_pool: CompanyAtlasProviderPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_provider_pool() -> CompanyAtlasProviderPool:
+    """Return the pool of the current process, creating it after a fork."""
+    global _pool
+    if _pool is None or _pool.pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid():
+                _pool = CompanyAtlasProviderPool()
+    return _pool
+
+
+def reset_provider_pool() -> None:
+    """Drop the pool without closing sockets, which may belong to the parent process."""
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_provider_pool)
@@ -0,0 +1,178 @@
+"""One-off end-to-end profiling of companyatlas provider commands.
+
+A command runs once, after the providers are loaded and bypassing the command
+caches, under ``cProfile`` (calling thread), ``tracemalloc`` and a stack sampler
+covering every thread, provider worker threads included. The request timings (see
+``djcompanyatlas.timing``) give the per-bucket and per-provider breakdown.
+"""
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from .models import (
+    CompanyAtlasVirtualCompany,
+    CompanyAtlasVirtualDocument,
+    CompanyAtlasVirtualEvent,
+)
+from .providers import get_companyatlas_providers
+from .timing import timing_scope
+
+COMPANYATLAS_PROFILE_COMMANDS = [
+    "search_company",
+    "search_company_by_reference",
+    "get_company_documents",
+    "get_company_events",
+]
+COMPANYATLAS_PROFILE_INTERVAL = 0.005
+
+
+class CompanyAtlasStackSampler(threading.Thread):
+    """Sample the stacks of every other thread, counted as collapsed stacks.
+
+    Each stack is recorded as ``thread;outer frame;...;inner frame``, the format of
+    ``flamegraph.pl``, speedscope and similar tools.
+    """
+
+    def __init__(self, interval: float = COMPANYATLAS_PROFILE_INTERVAL) -> None:
+        super().__init__(name="companyatlas-sampler", daemon=True)
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def _frame_name(frame: Any) -> str:
+        code = frame.f_code
+        name = f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+        return name.replace(";", ",")
+
+    def sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == self.ident:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_name(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def write(self, path: Path) -> None:
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in self.stacks.items()))
+
+
+def run_command(
+    command: str, value: str, backend: str | None = None, country_code: str | None = None
+) -> list[Any]:
+    """Run a provider command once without cache and return its rows."""
+    kwargs: dict[str, Any] = {"country_code": country_code} if country_code else {}
+    if command == "search_company":
+        if backend:
+            kwargs["attribute_search"] = {"name": backend}
+        rows = CompanyAtlasVirtualCompany.objects.search_company(value, ignore_cache=True, **kwargs)
+    elif command == "search_company_by_reference":
+        code = f"{backend}_{value}" if backend else value
+        rows = CompanyAtlasVirtualCompany.objects.search_company_by_reference(
+            code, ignore_cache=True, **kwargs
+        )
+    elif command in ("get_company_documents", "get_company_events"):
+        if backend:
+            kwargs["attribute_search"] = {"name": backend}
+        if command == "get_company_documents":
+            get_rows = CompanyAtlasVirtualDocument.objects.get_company_documents
+        else:
+            get_rows = CompanyAtlasVirtualEvent.objects.get_company_events
+        rows = get_rows(value, local=False, ignore_cache=True, **kwargs)
+    else:
+        raise ValueError(f"Unknown command: {command}")
+    return list(rows)
+
+
+def profile_command(
+    command: str,
+    value: str,
+    output_dir: Path | str = ".",
+    backend: str | None = None,
+    country_code: str | None = None,
+    interval: float = COMPANYATLAS_PROFILE_INTERVAL,
+    memory: bool = True,
+    top: int = 20,
+) -> dict[str, Any]:
+    """Profile one provider command and write its profiles to ``output_dir``.
+
+    Args:
+        command: One of ``COMPANYATLAS_PROFILE_COMMANDS``.
+        value: Query of ``search_company``, company code of the other commands.
+        output_dir: Directory of the ``.prof`` (pstats) and ``.collapsed`` files.
+        backend: Only call the provider with this name.
+        country_code: Only call the providers covering this country.
+        interval: Seconds between two stack samples.
+        memory: Trace allocations with ``tracemalloc`` (slows the run down).
+        top: Number of functions and allocation sites reported.
+
+    Returns:
+        Dict with the number of ``rows``, the wall ``seconds``, the ``timings``
+        breakdown, the ``peak_memory`` in bytes (``None`` without ``memory``), the
+        ``stats`` and ``allocations`` reports and the written ``files``.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    get_companyatlas_providers()
+    stem = f"companyatlas-{command}-{datetime.now():%Y%m%dT%H%M%S}"
+
+    profiler = cProfile.Profile()
+    sampler = CompanyAtlasStackSampler(interval)
+    peak_memory, allocations = None, []
+    try:
+        if memory:
+            tracemalloc.start()
+        sampler.start()
+        start = time.perf_counter()
+        with timing_scope() as timings:
+            profiler.enable()
+            try:
+                rows = run_command(command, value, backend, country_code)
+            finally:
+                profiler.disable()
+                sampler.stop()
+            summary = timings.finish()
+        seconds = time.perf_counter() - start
+        if memory:
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot()
+            allocations = [str(stat) for stat in snapshot.statistics("lineno")[:top]]
+    finally:
+        if memory:
+            tracemalloc.stop()
+
+    files = {"prof": output_dir / f"{stem}.prof", "collapsed": output_dir / f"{stem}.collapsed"}
+    profiler.dump_stats(files["prof"])
+    sampler.write(files["collapsed"])
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+    return {
+        "rows": len(rows),
+        "seconds": seconds,
+        "timings": summary,
+        "peak_memory": peak_memory,
+        "stats": stream.getvalue(),
+        "allocations": allocations,
+        "files": files,
+    }
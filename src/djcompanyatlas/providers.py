@@ -0,0 +1,340 @@
+"""Per-provider execution of companyatlas commands."""
+
+import copy
+import inspect
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
+
+from providerkit.helpers import get_providers
+
+from .conf import get_companyatlas_setting
+from .identifiers import provider_covers
+from .pool import get_discovery_kwargs, get_provider_pool
+from .timing import record_provider_time, submit, timing_bucket
+
+COMPANYATLAS_HEDGE_DELAY = 0.5
+COMPANYATLAS_HEDGE_MIN_SAMPLES = 10
+COMPANYATLAS_HEDGE_TIMEOUT = 30
+COMPANYATLAS_BATCH_CONCURRENCY = 8
+
+
+def get_companyatlas_providers(
+    attribute_search: dict[str, Any] | None = None, country_code: str | None = None
+) -> list[Any]:
+    """Return the companyatlas providers, highest priority first.
+
+    Providers come from the process-wide pool unless ``COMPANYATLAS["PROVIDER_POOL"]``
+    is ``False``.
+
+    Args:
+        attribute_search: Attribute substrings the providers must match.
+        country_code: Only return the providers whose ``geo_data`` covers this
+            country, providers without ``geo_data`` covering every country. Without
+            it, every provider is returned.
+    """
+    if get_companyatlas_setting("PROVIDER_POOL", True):
+        providers = get_provider_pool().get_providers(attribute_search)
+    else:
+        kwargs = get_discovery_kwargs()
+        if attribute_search:
+            kwargs["attribute_search"] = attribute_search
+        providers = get_providers(**kwargs)
+        providers = list(providers.values() if isinstance(providers, dict) else providers)
+    return [provider for provider in providers if provider_covers(provider, country_code)]
+
+
+def provider_accepts(provider: Any, command: str, *params: str) -> bool:
+    """Whether the provider's service explicitly declares all ``params``."""
+    try:
+        parameters = inspect.signature(getattr(provider, command)).parameters
+    except (AttributeError, TypeError, ValueError):
+        return False
+    return all(param in parameters for param in params)
+
+
+def get_call_instance(provider: Any) -> Any:
+    """Return a shallow copy of a provider for one call.
+
+    Pooled providers are shared by every thread of the process, while providerkit
+    keeps the last result and the current service on the instance. The copy gets
+    its own, so concurrent calls cannot read each other's results; configuration,
+    session and other attributes stay shared with the pooled provider.
+    """
+    instance = copy.copy(provider)
+    instance._service_results_cache = {}
+    instance.current_service_name = None
+    return instance
+
+
+def call_provider(
+    provider: Any, command: str, optional: dict[str, Any] | None = None, **kwargs: Any
+) -> dict[str, Any]:
+    """Call one provider, returning a result shaped like ``call_providers`` items.
+
+    Args:
+        provider: Provider instance.
+        command: Service name.
+        optional: Arguments only passed when the service declares all of them, for
+            instance ``limit`` and ``ordering``. ``None`` values are dropped.
+        **kwargs: Arguments always passed to the service.
+
+    Returns:
+        Dict with ``name``, ``provider`` (the instance called, see
+        ``get_call_instance``), ``response_time``, ``result`` or ``error``, and
+        ``optional``, the optional arguments actually passed.
+    """
+    optional = {key: value for key, value in (optional or {}).items() if value is not None}
+    if not provider_accepts(provider, command, *optional):
+        optional = {}
+    instance = get_call_instance(provider)
+    result = {"name": provider.name, "provider": instance, "optional": optional}
+    start_time = time.time()
+    with timing_bucket("provider"):
+        try:
+            result["result"] = instance.call_service(command, **kwargs, **optional)
+        except Exception as e:
+            result["error"] = str(e)
+    result["response_time"] = round(time.time() - start_time, 3)
+    get_provider_pool().record_latency(provider.name, command, result["response_time"])
+    record_provider_time(provider.name, result["response_time"])
+    return result
+
+
+def call_providers(
+    command: str,
+    first: bool = False,
+    attribute_search: dict[str, Any] | None = None,
+    country_code: str | None = None,
+    **kwargs: Any,
+) -> list[dict[str, Any]]:
+    """Pooled equivalent of providerkit's ``call_providers`` for companyatlas.
+
+    Args:
+        command: Service name.
+        first: Stop at the first provider that does not fail.
+        attribute_search: Attribute substrings the providers must match.
+        country_code: Only call the providers covering this country.
+        **kwargs: Arguments passed to the service.
+    """
+    results = []
+    for provider in get_companyatlas_providers(attribute_search, country_code):
+        result = call_provider(provider, command, **kwargs)
+        results.append(result)
+        if first and "error" not in result:
+            break
+    return results
+
+
+_batch_lock = threading.Lock()
+_batch_semaphore: threading.BoundedSemaphore | None = None
+
+
+def _get_batch_semaphore() -> threading.BoundedSemaphore:
+    global _batch_semaphore
+    with _batch_lock:
+        if _batch_semaphore is None:
+            _batch_semaphore = threading.BoundedSemaphore(
+                get_companyatlas_setting("BATCH_CONCURRENCY", COMPANYATLAS_BATCH_CONCURRENCY)
+            )
+        return _batch_semaphore
+
+
+def _reset_batch_semaphore() -> None:
+    global _batch_lock, _batch_semaphore
+    _batch_lock = threading.Lock()
+    _batch_semaphore = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_batch_semaphore)
+
+
+def _is_answer(result: dict[str, Any]) -> bool:
+    answer = result.get("result")
+    if "error" in result or not answer:
+        return False
+    return not (isinstance(answer, dict) and "error" in answer)
+
+
+def get_hedge_delay(provider: Any, command: str) -> float:
+    """Seconds to wait for a provider before calling the next one: its p90 latency.
+
+    ``COMPANYATLAS["HEDGE_DELAY"]`` is used until ``COMPANYATLAS["HEDGE_MIN_SAMPLES"]``
+    response times are recorded.
+    """
+    latency = get_provider_pool().get_latency(
+        provider.name,
+        command,
+        90,
+        min_samples=get_companyatlas_setting("HEDGE_MIN_SAMPLES", COMPANYATLAS_HEDGE_MIN_SAMPLES),
+    )
+    if latency is None:
+        return get_companyatlas_setting("HEDGE_DELAY", COMPANYATLAS_HEDGE_DELAY)
+    return latency
+
+
+def call_providers_hedged(
+    command: str,
+    attribute_search: dict[str, Any] | None = None,
+    country_code: str | None = None,
+    **kwargs: Any,
+) -> list[dict[str, Any]]:
+    """Return the first good answer, hedging slow providers with the next ones.
+
+    The highest-priority provider is called first. When it has not answered within
+    its p90 latency, or answered nothing, the next provider is called too, and so
+    on. The first non-empty answer wins and calls not started yet are cancelled;
+    calls already running finish in the background and are ignored.
+
+    Each lookup runs on its own executor, one thread per provider, so concurrent
+    lookups never queue behind each other. No answer is awaited more than
+    ``COMPANYATLAS["HEDGE_TIMEOUT"]`` seconds after the lookup started.
+
+    Returns:
+        The winning result, or every result received when no provider answered.
+    """
+    kwargs.pop("first", None)
+    providers = get_companyatlas_providers(attribute_search, country_code)
+    if not providers:
+        return []
+    deadline = time.monotonic() + get_companyatlas_setting(
+        "HEDGE_TIMEOUT", COMPANYATLAS_HEDGE_TIMEOUT
+    )
+    executor = ThreadPoolExecutor(
+        max_workers=len(providers), thread_name_prefix="companyatlas-hedge"
+    )
+    pending: dict[Future, Any] = {}
+    results = []
+    index = 0
+    try:
+        while index < len(providers) or pending:
+            remaining = max(deadline - time.monotonic(), 0)
+            if index < len(providers):
+                provider = providers[index]
+                pending[submit(executor, call_provider, provider, command, **kwargs)] = provider
+                index += 1
+                if index < len(providers):
+                    remaining = min(remaining, get_hedge_delay(provider, command))
+            with timing_bucket("provider"):
+                done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done and time.monotonic() >= deadline:
+                break
+            for future in done:
+                del pending[future]
+                result = future.result()
+                if _is_answer(result):
+                    return [result]
+                results.append(result)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def call_provider_batch(
+    provider: Any, command: str, batch_command: str, queries: list[str]
+) -> dict[str, dict[str, Any]]:
+    """Call a provider's batch endpoint once for all ``queries``.
+
+    The endpoint receives ``queries`` and returns the raw rows of each query, as a
+    dict keyed by query or a list in the same order.
+
+    Returns:
+        Query to a result shaped like ``call_provider`` ones. Each has its own
+        provider instance, holding the rows as the cached result of ``command``
+        for its ``get_service_normalize``.
+    """
+    start_time = time.time()
+    try:
+        with timing_bucket("provider"):
+            answers = getattr(get_call_instance(provider), batch_command)(queries=list(queries))
+        if not isinstance(answers, dict):
+            answers = dict(zip(queries, answers))
+        outcomes = {query: {"result": answers.get(query)} for query in queries}
+    except Exception as e:
+        outcomes = {query: {"error": str(e)} for query in queries}
+    response_time = round(time.time() - start_time, 3)
+    get_provider_pool().record_latency(provider.name, batch_command, response_time)
+    record_provider_time(provider.name, response_time)
+
+    results = {}
+    for query, outcome in outcomes.items():
+        instance = get_call_instance(provider)
+        if "result" in outcome:
+            instance._service_results_cache[command] = {
+                "kwargs": {"query": query},
+                "result": outcome["result"],
+            }
+        results[query] = {
+            "name": provider.name,
+            "provider": instance,
+            "optional": {},
+            "response_time": response_time,
+            **outcome,
+        }
+    return results
+
+
+def call_providers_batch(
+    command: str, calls: dict[str, dict[str, Any]], batch_command: str | None = None
+) -> dict[str, list[dict[str, Any]]]:
+    """Run ``command`` for many queries concurrently.
+
+    Providers exposing ``batch_command`` are called once with all the queries routed
+    to them. The other calls run in threads, at most ``COMPANYATLAS["BATCH_CONCURRENCY"]``
+    provider calls at a time across the process.
+
+    Args:
+        command: Service name called per query.
+        calls: Query to the arguments of its call, as given to ``call_providers``.
+        batch_command: Provider method answering many queries at once.
+
+    Returns:
+        Query to its results, shaped like ``call_providers`` ones.
+    """
+    semaphore = _get_batch_semaphore()
+    routes = {
+        query: get_companyatlas_providers(
+            kwargs.get("attribute_search"), kwargs.get("country_code")
+        )
+        for query, kwargs in calls.items()
+    }
+
+    batches: dict[str, tuple[Any, list[str]]] = {}
+    batched: dict[str, dict[str, dict[str, Any]]] = {}
+    for query, providers in routes.items():
+        for provider in providers:
+            if batch_command and callable(getattr(provider, batch_command, None)):
+                batches.setdefault(provider.name, (provider, []))[1].append(query)
+
+    def run_batch(provider: Any, queries: list[str]) -> dict[str, dict[str, Any]]:
+        with semaphore:
+            return call_provider_batch(provider, command, batch_command, queries)
+
+    def run(query: str) -> list[dict[str, Any]]:
+        kwargs = dict(calls[query])
+        kwargs.pop("attribute_search", None)
+        kwargs.pop("country_code", None)
+        first = kwargs.pop("first", False)
+        results = []
+        for provider in routes[query]:
+            result = batched.get(provider.name, {}).get(query)
+            if result is None:
+                with semaphore:
+                    result = call_provider(provider, command, **kwargs)
+            results.append(result)
+            if first and "error" not in result:
+                break
+        return results
+
+    executor = ThreadPoolExecutor(
+        max_workers=get_companyatlas_setting("BATCH_CONCURRENCY", COMPANYATLAS_BATCH_CONCURRENCY),
+        thread_name_prefix="companyatlas-batch",
+    )
+    with timing_bucket("provider"), executor:
+        futures = {name: submit(executor, run_batch, *batch) for name, batch in batches.items()}
+        batched.update((name, future.result()) for name, future in futures.items())
+        futures = {query: submit(executor, run, query) for query in calls}
+        return {query: future.result() for query, future in futures.items()}
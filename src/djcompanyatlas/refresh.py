@@ -0,0 +1,195 @@
+"""Staleness-driven incremental refresh of stored companies."""
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .conf import get_companyatlas_setting
+from .detail import invalidate_company_details
+from .models import CompanyAtlasAddress, CompanyAtlasCompany, CompanyAtlasData
+from .sync import sync_company_documents, sync_company_events
+from .tasks import enqueue
+
+COMPANYATLAS_REFRESH_FACETS = {
+    "data": {"stamp": "data_refreshed_at", "service": "search_company_by_reference"},
+    "address": {"stamp": "address_refreshed_at", "service": "search_company_by_reference"},
+    "event": {"stamp": "event_refreshed_at", "service": "get_company_events"},
+    "document": {"stamp": "document_refreshed_at", "service": "get_company_documents"},
+}
+
+COMPANYATLAS_FRESHNESS = {
+    "data": timedelta(days=7),
+    "address": timedelta(days=30),
+    "event": timedelta(days=1),
+    "document": timedelta(days=1),
+}
+
+
+def get_freshness_policies() -> dict[str, timedelta]:
+    """Return the maximum age per facet.
+
+    ``COMPANYATLAS["FRESHNESS"]`` overrides the defaults with a number of seconds per
+    facet, e.g. ``{"address": 86400 * 30}``.
+    """
+    policies = dict(COMPANYATLAS_FRESHNESS)
+    for facet, seconds in get_companyatlas_setting("FRESHNESS", {}).items():
+        if facet in COMPANYATLAS_REFRESH_FACETS:
+            policies[facet] = timedelta(seconds=seconds)
+    return policies
+
+
+def get_stale_companies(facet: str, max_age: timedelta, limit: int, now: datetime) -> list[Any]:
+    """Return ``(pk, staleness)`` of the stalest companies for one facet.
+
+    A facet is stale when its last refresh (its ``*_refreshed_at`` stamp, the
+    creation of companies never refreshed) is older than ``max_age``. The stamps are
+    indexed, so only the returned companies are read. Staleness is the age divided
+    by ``max_age``.
+    """
+    stamp = COMPANYATLAS_REFRESH_FACETS[facet]["stamp"]
+    cutoff = now - max_age
+    never_refreshed = Q(**{f"{stamp}__isnull": True, "created_at__lt": cutoff})
+    rows = (
+        CompanyAtlasCompany.objects.filter(Q(**{f"{stamp}__lt": cutoff}) | never_refreshed)
+        .order_by(F(stamp).asc(nulls_first=True), "created_at")
+        .values_list("pk", stamp, "created_at")[:limit]
+    )
+    return [
+        (pk, (now - (refreshed_at or created_at)) / max_age)
+        for pk, refreshed_at, created_at in rows
+    ]
+
+
+def get_refresh_plan(budget: int, now: datetime | None = None) -> list[tuple[int, list[str]]]:
+    """Pick the stalest companies whose refresh fits in ``budget`` provider calls.
+
+    Facets served by the same provider service cost a single call per company.
+
+    Args:
+        budget: Maximum number of provider calls.
+        now: Reference time, defaults to the current time.
+
+    Returns:
+        ``(company_pk, facets)`` pairs, stalest first.
+    """
+    now = now or timezone.now()
+    candidates: dict[int, dict[str, float]] = {}
+    for facet, max_age in get_freshness_policies().items():
+        for pk, staleness in get_stale_companies(facet, max_age, budget, now):
+            candidates.setdefault(pk, {})[facet] = staleness
+
+    plan = []
+    for pk, facets in sorted(candidates.items(), key=lambda item: -max(item[1].values())):
+        cost = len({COMPANYATLAS_REFRESH_FACETS[facet]["service"] for facet in facets})
+        if cost > budget:
+            continue
+        budget -= cost
+        plan.append((pk, sorted(facets)))
+    return plan
+
+
+def _refresh_reference(companies: list[CompanyAtlasCompany]) -> dict[str, int]:
+    from .models.virtuals.company import CompanyAtlasVirtualCompany
+
+    datas, addresses = [], []
+    for company in companies:
+        # Companies without a source are looked up by their code on every backend.
+        obj = CompanyAtlasVirtualCompany.objects.search_company_by_reference(
+            code=company.code, backend=company.source or "",
+        ).first()
+        if not obj:
+            continue
+        datas.append(CompanyAtlasData(
+            company=company,
+            source=obj.backend,
+            country_code=obj.country_code,
+            data_type=obj.source_field,
+            value=obj.reference,
+        ))
+        if obj.address:
+            addresses.append(CompanyAtlasAddress(
+                company=company,
+                source=obj.backend,
+                country_code=obj.country_code,
+                address=obj.address_json,
+                is_headquarters=True,
+            ))
+    counts = CompanyAtlasData.objects.bulk_upsert(
+        datas, ["company", "source", "country_code", "data_type"],
+    )
+    for key, value in CompanyAtlasAddress.objects.bulk_upsert(
+        addresses, ["company", "source", "country_code", "is_headquarters"],
+    ).items():
+        counts[key] += value
+    # Companies not found are stamped too, so they are not picked again before
+    # their facets are stale.
+    now = timezone.now()
+    for company in companies:
+        company.data_refreshed_at = company.address_refreshed_at = now
+    CompanyAtlasCompany.objects.bulk_update(
+        companies, ["data_refreshed_at", "address_refreshed_at"]
+    )
+    return counts
+
+
+_refresh_services = {
+    "search_company_by_reference": _refresh_reference,
+    "get_company_events": sync_company_events,
+    "get_company_documents": sync_company_documents,
+}
+
+
+def refresh_company(company_pk: int, facets: list[str]) -> dict[str, int]:
+    """Refresh the given facets of a company from its providers.
+
+    Args:
+        company_pk: Primary key of the company.
+        facets: Facet names from ``COMPANYATLAS_REFRESH_FACETS``.
+
+    Returns:
+        Counts of ``inserted``, ``updated`` and ``unchanged`` rows.
+    """
+    return refresh_companies([(company_pk, facets)])
+
+
+def refresh_companies(batch: list[tuple[int, list[str]]]) -> dict[str, int]:
+    """Refresh a batch of ``(company_pk, facets)`` pairs and return the summed counts.
+
+    Each provider service is called once per company, and the rows of the whole
+    batch are written with one upsert per model. Each service stamps the facets it
+    refreshed: documents and events only once every provider answered (see
+    ``sync``).
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    companies = CompanyAtlasCompany.objects.in_bulk([company_pk for company_pk, _ in batch])
+    services: dict[str, list[CompanyAtlasCompany]] = {}
+    for company_pk, facets in batch:
+        if company_pk not in companies:
+            continue
+        for service in {COMPANYATLAS_REFRESH_FACETS[facet]["service"] for facet in facets}:
+            services.setdefault(service, []).append(companies[company_pk])
+    for service, members in services.items():
+        for key, value in _refresh_services[service](members).items():
+            counts[key] = counts.get(key, 0) + value
+
+    invalidate_company_details(companies)
+    return counts
+
+
+def schedule_refresh(budget: int, batch_size: int = 100) -> list[Any]:
+    """Enqueue batched refreshes of the stalest companies.
+
+    Args:
+        budget: Maximum number of provider calls.
+        batch_size: Number of companies per enqueued batch.
+
+    Returns:
+        One handle per enqueued batch, as returned by ``tasks.enqueue``.
+    """
+    plan = get_refresh_plan(budget)
+    return [
+        enqueue(refresh_companies, plan[i:i + batch_size])
+        for i in range(0, len(plan), batch_size)
+    ]
@@ -0,0 +1,141 @@
+"""Bulk resolution of identifiers (SIREN, VAT, ...) to local companies."""
+
+import json
+from collections.abc import Iterable, Iterator
+from functools import reduce
+from operator import or_
+from typing import Any
+
+from django.db.models import Q
+
+from .conf import get_companyatlas_setting
+from .models import CompanyAtlasData
+from .tasks import enqueue
+
+COMPANYATLAS_RESOLVE_CHUNK_SIZE = 500
+COMPANYATLAS_RESOLVE_MAX_ITEMS = 10000
+# Provider lookups cost a provider call per miss: they take far fewer identifiers.
+COMPANYATLAS_RESOLVE_LOOKUP_MAX_ITEMS = 100
+
+
+def parse_identifiers(payload: Any, lookup: bool = False) -> list[tuple[str, str]]:
+    """Read ``(data_type, value)`` pairs, given as pairs or as dicts.
+
+    Duplicates are dropped, the first occurrence keeping its position.
+
+    Raises:
+        ValueError: When the payload is not a list of identifiers or is too long
+            (``COMPANYATLAS["RESOLVE_MAX_ITEMS"]``, or
+            ``COMPANYATLAS["RESOLVE_LOOKUP_MAX_ITEMS"]`` with ``lookup``).
+    """
+    if not isinstance(payload, list):
+        raise ValueError("Expected a list of identifiers")
+    pairs = []
+    for item in payload:
+        if isinstance(item, dict):
+            item = (item.get("data_type"), item.get("value"))
+        if not isinstance(item, (list, tuple)) or len(item) != 2 or not all(item):
+            raise ValueError(f"Invalid identifier: {item!r}")
+        pairs.append((str(item[0]), str(item[1])))
+    pairs = list(dict.fromkeys(pairs))
+    if lookup:
+        maximum = get_companyatlas_setting(
+            "RESOLVE_LOOKUP_MAX_ITEMS", COMPANYATLAS_RESOLVE_LOOKUP_MAX_ITEMS
+        )
+    else:
+        maximum = get_companyatlas_setting("RESOLVE_MAX_ITEMS", COMPANYATLAS_RESOLVE_MAX_ITEMS)
+    if len(pairs) > maximum:
+        raise ValueError(f"At most {maximum} identifiers per call")
+    return pairs
+
+
+def resolve_chunk(pairs: list[tuple[str, str]]) -> dict[tuple[str, str], list[dict[str, Any]]]:
+    """Resolve identifiers in one query on the ``(data_type, value_hash)`` index.
+
+    Returns:
+        Each pair with the companies holding it, empty for misses.
+    """
+    by_type: dict[str, list[str]] = {}
+    for data_type, value in pairs:
+        by_type.setdefault(data_type, []).append(CompanyAtlasData.get_value_hash(value))
+    query = reduce(
+        or_,
+        (Q(data_type=data_type, value_hash__in=hashes) for data_type, hashes in by_type.items()),
+    )
+    resolved: dict[tuple[str, str], list[dict[str, Any]]] = {pair: [] for pair in pairs}
+    rows = (
+        CompanyAtlasData.objects.filter(query)
+        .order_by()
+        .values(
+            "data_type", "value", "source", "company_id", "company__denomination", "company__code",
+        )
+    )
+    for row in rows:
+        if (row["data_type"], row["value"]) not in resolved:
+            continue
+        resolved[(row["data_type"], row["value"])].append({
+            "id": row["company_id"],
+            "denomination": row["company__denomination"],
+            "code": row["company__code"],
+            "source": row["source"],
+        })
+    return resolved
+
+
+def lookup_identifiers(pairs: list[list[str]]) -> dict[str, int]:
+    """Search unresolved identifiers in the providers and create the companies found.
+
+    Identifiers resolved in the meantime are skipped.
+
+    Returns:
+        Counts of ``created`` and ``missing`` companies.
+    """
+    from .models.virtuals.company import CompanyAtlasVirtualCompany
+
+    counts = {"created": 0, "missing": 0}
+    for (data_type, value), companies in resolve_chunk([tuple(pair) for pair in pairs]).items():
+        if companies:
+            continue
+        results = CompanyAtlasVirtualCompany.objects.search_company_by_reference(
+            code=value, backend=""
+        )
+        obj = next((obj for obj in results if obj.source_field == data_type), None)
+        if obj is None:
+            counts["missing"] += 1
+            continue
+        obj.create_company()
+        counts["created"] += 1
+    return counts
+
+
+def iter_resolved(
+    pairs: list[tuple[str, str]], lookup: bool = False, chunk_size: int | None = None
+) -> Iterator[dict[str, Any]]:
+    """Yield the resolution of each identifier, one indexed query per chunk.
+
+    Args:
+        pairs: ``(data_type, value)`` pairs, from ``parse_identifiers``.
+        lookup: Enqueue provider lookups for the identifiers of each chunk that
+            resolve to no company (see ``lookup_identifiers``).
+        chunk_size: Identifiers per query, ``COMPANYATLAS["RESOLVE_CHUNK_SIZE"]`` by
+            default.
+    """
+    if not chunk_size:
+        chunk_size = get_companyatlas_setting("RESOLVE_CHUNK_SIZE", COMPANYATLAS_RESOLVE_CHUNK_SIZE)
+    for start in range(0, len(pairs), chunk_size):
+        resolved = resolve_chunk(pairs[start:start + chunk_size])
+        misses = [list(pair) for pair, companies in resolved.items() if not companies]
+        if lookup and misses:
+            enqueue(lookup_identifiers, misses)
+        for (data_type, value), companies in resolved.items():
+            yield {
+                "data_type": data_type,
+                "value": value,
+                "companies": companies,
+                "enqueued": lookup and not companies,
+            }
+
+
+def iter_resolved_jsonl(rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + "\n"
@@ -0,0 +1,29 @@
+"""Signal receivers invalidating cached company details.
+
+The loader connects its own receivers while a scope is open (see ``loader``).
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .detail import COMPANYATLAS_DETAIL_RELATIONS, invalidate_company_detail
+from .models import CompanyAtlasCompany
+
+
+@receiver([post_save, post_delete], sender=CompanyAtlasCompany)
+def invalidate_company(sender, instance, **kwargs):
+    invalidate_company_detail(instance.pk)
+
+
+def invalidate_related(sender, instance, **kwargs):
+    invalidate_company_detail(instance.company_id)
+
+
+for model in COMPANYATLAS_DETAIL_RELATIONS.values():
+    name = model.__name__
+    post_save.connect(
+        invalidate_related, sender=model, dispatch_uid=f"companyatlas_detail_{name}"
+    )
+    post_delete.connect(
+        invalidate_related, sender=model, dispatch_uid=f"companyatlas_detail_delete_{name}"
+    )
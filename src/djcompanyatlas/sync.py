@@ -0,0 +1,162 @@
+"""Materialization of provider documents and events into local tables."""
+
+from collections.abc import Callable, Iterable
+from datetime import date, datetime
+from typing import Any
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .detail import invalidate_company_details
+from .models import (
+    CompanyAtlasCompany,
+    CompanyAtlasDocument,
+    CompanyAtlasEvent,
+    CompanyAtlasVirtualDocument,
+    CompanyAtlasVirtualEvent,
+)
+
+
+def _get_value(item: dict[str, Any], *keys: str, default: Any = "") -> Any:
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, ""):
+            return value
+    return default
+
+
+def _get_date(item: dict[str, Any]) -> date | None:
+    value = _get_value(item, "date", default=None)
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date) or value is None:
+        return value
+    try:
+        return parse_date(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _build_document(company: CompanyAtlasCompany, item: dict[str, Any]) -> CompanyAtlasDocument:
+    return CompanyAtlasDocument(
+        company=company,
+        source=_get_value(item, "backend", "source", default=company.source),
+        country_code=_get_value(item, "country_code", default=company.country_code),
+        document_type=str(_get_value(item, "document_type", "type"))[:100],
+        title=str(_get_value(item, "title", "label", "name"))[:255],
+        date=_get_date(item),
+        url=str(_get_value(item, "url", "link"))[:200],
+        content=str(_get_value(item, "content", "description", "summary")),
+    )
+
+
+def _build_event(company: CompanyAtlasCompany, item: dict[str, Any]) -> CompanyAtlasEvent:
+    return CompanyAtlasEvent(
+        company=company,
+        source=_get_value(item, "backend", "source", default=company.source),
+        country_code=_get_value(item, "country_code", default=company.country_code),
+        event_type=str(_get_value(item, "event_type", "type"))[:100],
+        title=str(_get_value(item, "title", "label", "name"))[:255],
+        date=_get_date(item),
+        description=str(_get_value(item, "description", "content", "summary")),
+    )
+
+
+def _sync(
+    companies: Iterable[CompanyAtlasCompany],
+    model: Any,
+    manager: Any,
+    command: str,
+    facet: str,
+    build: Callable[[CompanyAtlasCompany, dict[str, Any]], Any],
+    batch_size: int,
+) -> dict[str, int]:
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    synced: list[CompanyAtlasCompany] = []
+
+    def flush(objs: list[Any]) -> None:
+        result = model.objects.bulk_upsert(
+            objs, ["company", "natural_key"], batch_size=batch_size, ignore_conflicts=True,
+        )
+        for key, value in result.items():
+            counts[key] += value
+        # Mark the companies as synced, so reads use the local rows (see
+        # CompanyAtlasVirtualCommandManager.get_local_queryset).
+        now = timezone.now()
+        for company in synced:
+            setattr(company, f"{facet}_refreshed_at", now)
+        CompanyAtlasCompany.objects.bulk_update(
+            synced, [f"{facet}_refreshed_at"], batch_size=batch_size
+        )
+        invalidate_company_details({obj.company_id for obj in objs} | {c.pk for c in synced})
+        synced.clear()
+
+    objs: list[Any] = []
+    for company in companies:
+        # Rows of other registries sharing the code must not land on this company.
+        kwargs = {"attribute_search": {"name": company.source}} if company.source else {}
+        rows = manager.fetch_command_data(command, code=company.code, **kwargs)
+        failed = bool(rows.errors)
+        for item in rows:
+            if not isinstance(item, dict) or "error" in item:
+                failed = True
+                continue
+            obj = build(company, item)
+            obj.natural_key = obj.compute_natural_key()
+            objs.append(obj)
+        # A company is only marked as synced when every provider answered, since its
+        # reads then stop calling the providers.
+        if not failed:
+            synced.append(company)
+        if len(objs) >= batch_size:
+            flush(objs)
+            objs = []
+    if objs or synced:
+        flush(objs)
+    return counts
+
+
+def sync_company_documents(
+    companies: Iterable[CompanyAtlasCompany], batch_size: int = 500
+) -> dict[str, int]:
+    """Fetch the documents of ``companies`` from providers and store the new ones.
+
+    Documents are identified by their natural key (company, source, type, date,
+    url, title): new ones are bulk inserted, skipping conflicting rows, and stored
+    ones are updated when their content changed.
+
+    Returns:
+        Counts of ``inserted``, ``updated`` and ``unchanged`` documents.
+    """
+    return _sync(
+        companies,
+        CompanyAtlasDocument,
+        CompanyAtlasVirtualDocument.objects,
+        "get_company_documents",
+        "document",
+        _build_document,
+        batch_size,
+    )
+
+
+def sync_company_events(
+    companies: Iterable[CompanyAtlasCompany], batch_size: int = 500
+) -> dict[str, int]:
+    """Fetch the events of ``companies`` from providers and store the new ones.
+
+    Events are identified by their natural key (company, source, type, date, title):
+    new ones are bulk inserted, skipping conflicting rows, and stored ones are
+    updated when their content changed.
+
+    Returns:
+        Counts of ``inserted``, ``updated`` and ``unchanged`` events.
+    """
+    return _sync(
+        companies,
+        CompanyAtlasEvent,
+        CompanyAtlasVirtualEvent.objects,
+        "get_company_events",
+        "event",
+        _build_event,
+        batch_size,
+    )
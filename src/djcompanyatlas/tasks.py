@@ -0,0 +1,53 @@
+"""Background task dispatch for companyatlas."""
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from .conf import get_companyatlas_setting
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=get_companyatlas_setting("TASK_WORKERS", 4),
+            thread_name_prefix="companyatlas",
+        )
+    return _executor
+
+
+def _run(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    try:
+        return func(*args, **kwargs)
+    finally:
+        connections.close_all()
+
+
+def enqueue(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run ``func`` outside of the caller.
+
+    When ``COMPANYATLAS["TASK_RUNNER"]`` is set, it is imported and called with the
+    dotted path of ``func`` followed by the arguments, so a task queue (Celery, RQ, ...)
+    can be plugged in. Arguments must then be JSON serializable. Otherwise ``func`` runs
+    in an in-process thread pool of ``COMPANYATLAS["TASK_WORKERS"]`` threads: provider
+    calls then share the web worker's CPU and connections, and tasks not finished
+    when the worker stops are lost. Production setups should set a task runner.
+
+    Args:
+        func: Module-level function to run.
+        *args: Positional arguments for ``func``.
+        **kwargs: Keyword arguments for ``func``.
+
+    Returns:
+        Whatever the task runner returns, or a ``concurrent.futures.Future``.
+    """
+    runner = get_companyatlas_setting("TASK_RUNNER")
+    if runner:
+        return import_string(runner)(f"{func.__module__}.{func.__name__}", *args, **kwargs)
+    return _get_executor().submit(_run, func, *args, **kwargs)
@@ -0,0 +1,40 @@
+"""Per-client rate limits of the endpoints calling providers."""
+
+import time
+from typing import Any
+
+from django.core.cache import cache
+
+COMPANYATLAS_THROTTLE_PREFIX = "companyatlas:throttle:"
+
+
+def get_client_key(request: Any) -> str:
+    """The authenticated user, else the remote address."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def allow_request(request: Any, scope: str, rate: int | None, period: int = 60) -> bool:
+    """Count a request of the client in ``scope`` and tell whether it is allowed.
+
+    Counters live in the default cache, for fixed windows of ``period`` seconds.
+
+    Args:
+        request: Request of the client.
+        scope: Name of the limited action.
+        rate: Requests allowed per window, ``None`` for no limit.
+        period: Window length in seconds.
+    """
+    if rate is None:
+        return True
+    window = int(time.time() // period)
+    key = f"{COMPANYATLAS_THROTTLE_PREFIX}{scope}:{get_client_key(request)}:{window}"
+    cache.add(key, 0, period)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, period)
+        count = 1
+    return count <= rate
@@ -0,0 +1,219 @@
+"""Per-request wall time breakdown between providers, normalization, queries and rendering.
+
+While a timing scope is active (see ``CompanyAtlasTimingMiddleware`` and
+``timing_scope``), the request thread's wall time is attributed to exclusive buckets:
+``provider`` (waiting on providers), ``normalize`` (normalization of provider rows),
+``db`` (SQL queries), ``render`` (Django template rendering) and ``app`` (everything
+else).
+A nested bucket pauses its parent, so the buckets add up to the request's wall time.
+
+Provider call durations are also summed per provider name. Calls running
+concurrently may add up to more than the ``provider`` bucket.
+"""
+
+import functools
+import re
+import statistics
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import Any
+
+from .conf import get_companyatlas_setting
+
+COMPANYATLAS_TIMING_BUCKETS = ["provider", "normalize", "db", "render", "app"]
+COMPANYATLAS_TIMING_WINDOW = 200
+COMPANYATLAS_TIMING_HEADER = "staff"
+
+
+class CompanyAtlasTimings:
+    """Wall time of one request, per bucket and per provider."""
+
+    def __init__(self) -> None:
+        self.thread = threading.get_ident()
+        self.start = self._mark = time.perf_counter()
+        self.buckets: dict[str, list[float]] = {"app": [0.0, 1]}
+        self.providers: dict[str, list[float]] = {}
+        self._stack = ["app"]
+        self._lock = threading.Lock()
+
+    def _switch(self) -> None:
+        now = time.perf_counter()
+        self.buckets[self._stack[-1]][0] += now - self._mark
+        self._mark = now
+
+    def enter(self, bucket: str) -> None:
+        self._switch()
+        entry = self.buckets.setdefault(bucket, [0.0, 0])
+        if bucket != self._stack[-1]:
+            entry[1] += 1
+        self._stack.append(bucket)
+
+    def exit(self, bucket: str) -> None:
+        if len(self._stack) > 1 and self._stack[-1] == bucket:
+            self._switch()
+            self._stack.pop()
+
+    def add_provider(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.providers.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def finish(self) -> dict[str, Any]:
+        """Close the open buckets and return the breakdown in milliseconds."""
+        self._switch()
+        self._stack = ["app"]
+        return {
+            "total": round((self._mark - self.start) * 1000, 3),
+            "buckets": {
+                name: {"ms": round(seconds * 1000, 3), "count": int(count)}
+                for name, (seconds, count) in self.buckets.items()
+            },
+            "providers": {
+                name: {"ms": round(seconds * 1000, 3), "count": int(count)}
+                for name, (seconds, count) in self.providers.items()
+            },
+        }
+
+
+_timings: ContextVar[CompanyAtlasTimings | None] = ContextVar("companyatlas_timings", default=None)
+
+
+def get_timings() -> CompanyAtlasTimings | None:
+    return _timings.get()
+
+
+@contextmanager
+def timing_scope() -> Iterator[CompanyAtlasTimings]:
+    """Time the block, attributing its wall time to the buckets."""
+    token = _timings.set(CompanyAtlasTimings())
+    try:
+        yield _timings.get()
+    finally:
+        _timings.reset(token)
+
+
+@contextmanager
+def timing_bucket(bucket: str) -> Iterator[None]:
+    """Attribute the block to ``bucket``, when run by the thread of the active scope."""
+    timings = _timings.get()
+    if timings is None or timings.thread != threading.get_ident():
+        yield
+        return
+    timings.enter(bucket)
+    try:
+        yield
+    finally:
+        timings.exit(bucket)
+
+
+def time_template_rendering() -> None:
+    """Attribute the rendering of Django templates to the ``render`` bucket.
+
+    Wraps the Django template backend's ``Template.render`` once, so views calling
+    ``render()`` or ``render_to_string`` are timed like template responses.
+    """
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, "companyatlas_timed", False):
+        return
+    render = Template.render
+
+    @functools.wraps(render)
+    def timed_render(self: Template, *args: Any, **kwargs: Any) -> Any:
+        with timing_bucket("render"):
+            return render(self, *args, **kwargs)
+
+    timed_render.companyatlas_timed = True
+    Template.render = timed_render
+
+
+def record_provider_time(name: str, seconds: float) -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings.add_provider(name, seconds)
+
+
+def submit(executor: Executor, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """Submit ``func`` to run in a copy of the current context.
+
+    Provider calls made by worker threads are then recorded in the request's timings.
+    """
+    return executor.submit(copy_context().run, func, *args, **kwargs)
+
+
+def format_server_timing(summary: dict[str, Any]) -> str:
+    """Format a breakdown as a ``Server-Timing`` header value."""
+    metrics = [
+        f'{name};dur={entry["ms"]};desc="{entry["count"]}"'
+        for name, entry in summary["buckets"].items()
+    ]
+    for name, entry in summary["providers"].items():
+        name = re.sub(r"[^\w.-]", "_", name)
+        metrics.append(f'provider.{name};dur={entry["ms"]};desc="{entry["count"]} calls"')
+    metrics.append(f"total;dur={summary['total']}")
+    return ", ".join(metrics)
+
+
+_log_lock = threading.Lock()
+_log: deque | None = None
+
+
+def log_timings(record: dict[str, Any]) -> None:
+    """Keep a request breakdown, ``COMPANYATLAS["TIMING_WINDOW"]`` at most."""
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = deque(
+                    maxlen=get_companyatlas_setting("TIMING_WINDOW", COMPANYATLAS_TIMING_WINDOW)
+                )
+    _log.append(record)
+
+
+def get_timing_report(slowest: int = 20) -> dict[str, Any]:
+    """Aggregate the kept breakdowns per bucket and per provider.
+
+    Returns:
+        Dict with the number of ``requests``, the ``buckets`` (average, 90th
+        percentile and share of the wall time), the ``providers`` (calls, total and
+        average per call) and the ``slowest`` requests. Durations are in
+        milliseconds.
+    """
+    records = list(_log or ())
+    total = sum(record["total"] for record in records) or 1
+
+    def aggregate(values: list[float]) -> dict[str, float]:
+        values = sorted(values)
+        return {
+            "avg": round(statistics.fmean(values), 3),
+            "p90": values[min(len(values) - 1, int(len(values) * 0.9))],
+            "sum": round(sum(values), 3),
+        }
+
+    buckets = []
+    for name in COMPANYATLAS_TIMING_BUCKETS:
+        values = [record["buckets"].get(name, {}).get("ms", 0.0) for record in records]
+        if any(values):
+            row = aggregate(values)
+            buckets.append({"name": name, "share": round(row["sum"] * 100 / total, 1), **row})
+    providers: dict[str, dict[str, Any]] = {}
+    for record in records:
+        for name, entry in record["providers"].items():
+            row = providers.setdefault(name, {"name": name, "requests": 0, "calls": 0, "sum": 0.0})
+            row["requests"] += 1
+            row["calls"] += entry["count"]
+            row["sum"] = round(row["sum"] + entry["ms"], 3)
+    for row in providers.values():
+        row["avg"] = round(row["sum"] / max(row["calls"], 1), 3)
+    return {
+        "requests": len(records),
+        "buckets": buckets,
+        "providers": sorted(providers.values(), key=lambda row: row["sum"], reverse=True),
+        "slowest": sorted(records, key=lambda record: record["total"], reverse=True)[:slowest],
+    }
@@ -8,6 +8,21 @@ app_name = "djcompanyatlas"
 
 urlpatterns = [
     path("", views.company_list, name="company-list"),
+    path("api/companies/", views.company_api_list, name="company-api-list"),
+    path("api/companies/<int:pk>/", views.company_api_detail, name="company-api-detail"),
+    path("autocomplete/", views.company_autocomplete, name="company-autocomplete"),
+    path("export/", views.company_export, name="company-export"),
+    path("resolve/", views.company_resolve, name="company-resolve"),
     path("<int:pk>/", views.company_detail, name="company-detail"),
     path("<int:pk>/enrich/", views.company_enrich, name="company-enrich"),
+    path(
+        "<int:pk>/enrich/<str:job_id>/",
+        views.company_enrich_status,
+        name="company-enrich-status",
+    ),
+    path(
+        "<int:pk>/enrich/<str:job_id>/events/",
+        views.company_enrich_events,
+        name="company-enrich-events",
+    ),
 ]
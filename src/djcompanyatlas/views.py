@@ -1,9 +1,37 @@
 """Views for companyatlas app."""
 
-from django.contrib import messages
-from django.shortcuts import get_object_or_404, redirect, render
+import json
+import time
 
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import ImproperlyConfigured
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_POST, require_safe
+
+from .api import (
+    CompanyAtlasJSONEncoder,
+    get_api_page,
+    get_api_queryset,
+    get_api_state,
+    parse_api_params,
+    serialize_company,
+)
+from .autocomplete import COMPANYATLAS_AUTOCOMPLETE_RATE, autocomplete
+from .conf import get_companyatlas_setting
+from .detail import get_detail_queryset, render_company_detail
+from .enrich import (
+    COMPANYATLAS_ENRICH_DONE,
+    COMPANYATLAS_ENRICH_RATE,
+    get_job,
+    start_enrich,
+)
+from .export import COMPANYATLAS_EXPORT_FORMATS, iter_csv, iter_export_rows, iter_jsonl
 from .models import CompanyAtlasCompany
+from .resolve import iter_resolved, iter_resolved_jsonl, parse_identifiers
+from .throttle import allow_request
 
 
 def company_list(request):
@@ -16,23 +44,203 @@ def company_list(request):
 
 
 def company_detail(request, pk):
-    """Show company details."""
-    company = get_object_or_404(CompanyAtlasCompany, pk=pk)
+    """Show company details, the details fragment coming from the cache when fresh."""
+    company = get_object_or_404(get_detail_queryset(), pk=pk)
     context = {
         "company": company,
+        "company_detail": render_company_detail(company),
     }
     return render(request, "djcompanyatlas/company_detail.html", context)
 
 
+@staff_member_required
 def company_enrich(request, pk):
-    """Trigger company enrichment."""
+    """Start a company enrichment job for staff, answering 202 with its status URLs.
+
+    Jobs call every provider: starting one needs the permission to change
+    companies, and each client starts at most ``COMPANYATLAS["ENRICH_RATE"]`` a
+    minute. Without a shared job cache (see ``enrich.get_job_cache``), the view
+    answers 503.
+    """
     company = get_object_or_404(CompanyAtlasCompany, pk=pk)
 
     if request.method == "POST":
-        if company.enrich(force=True):
-            messages.success(request, f"Successfully enriched {company.name}")
-        else:
-            messages.error(request, f"Failed to enrich {company.name}")
-        return redirect("djcompanyatlas:company-detail", pk=pk)
+        if not request.user.has_perm("djcompanyatlas.change_companyatlascompany"):
+            return JsonResponse(
+                {"error": "Enrichment needs the permission to change companies"}, status=403
+            )
+        rate = get_companyatlas_setting("ENRICH_RATE", COMPANYATLAS_ENRICH_RATE)
+        if not allow_request(request, "enrich", rate):
+            return JsonResponse({"error": "Too many enrichment jobs started"}, status=429)
+        try:
+            job = start_enrich(company.pk, request.POST.getlist("facets") or None)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        except ImproperlyConfigured as e:
+            return JsonResponse({"error": str(e)}, status=503)
+        status_url = reverse("djcompanyatlas:company-enrich-status", args=[company.pk, job["id"]])
+        events_url = reverse("djcompanyatlas:company-enrich-events", args=[company.pk, job["id"]])
+        response = JsonResponse(
+            {**job, "status_url": status_url, "events_url": events_url}, status=202
+        )
+        response["Location"] = status_url
+        return response
 
     return render(request, "djcompanyatlas/company_enrich.html", {"company": company})
+
+
+def _get_enrich_job(pk, job_id):
+    try:
+        job = get_job(job_id)
+    except ImproperlyConfigured:
+        job = None
+    if job is None or job["company"] != pk:
+        raise Http404("Unknown enrichment job")
+    return job
+
+
+@staff_member_required
+def company_enrich_status(request, pk, job_id):
+    """Report the progress of an enrichment job."""
+    response = JsonResponse(_get_enrich_job(pk, job_id))
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+@staff_member_required
+def company_enrich_events(request, pk, job_id):
+    """Stream the progress of an enrichment job as server-sent events.
+
+    The cached job is polled every ``COMPANYATLAS["ENRICH_EVENTS_INTERVAL"]`` seconds
+    and sent when it changes, until it ends or ``COMPANYATLAS["ENRICH_EVENTS_TIMEOUT"]``
+    seconds (60) have passed. The stream holds its worker all along: with sync WSGI
+    workers, lower the timeout or have clients poll the status URL instead.
+    """
+    job = _get_enrich_job(pk, job_id)
+    interval = get_companyatlas_setting("ENRICH_EVENTS_INTERVAL", 1)
+    deadline = time.monotonic() + get_companyatlas_setting("ENRICH_EVENTS_TIMEOUT", 60)
+
+    def events():
+        current, version = job, None
+        while current is not None:
+            if current["version"] != version:
+                version = current["version"]
+                yield f"event: progress\ndata: {json.dumps(current)}\n\n"
+            if current["status"] in COMPANYATLAS_ENRICH_DONE or time.monotonic() > deadline:
+                break
+            time.sleep(interval)
+            current = get_job(job_id)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@staff_member_required
+def company_export(request):
+    """Stream all companies with their data and addresses as CSV or JSONL."""
+    export_format = request.GET.get("format", "csv")
+    if export_format not in COMPANYATLAS_EXPORT_FORMATS:
+        raise Http404(f"Unknown export format: {export_format}")
+
+    rows = iter_export_rows()
+    lines = iter_csv(rows) if export_format == "csv" else iter_jsonl(rows)
+    response = StreamingHttpResponse(lines, content_type=COMPANYATLAS_EXPORT_FORMATS[export_format])
+    response["Content-Disposition"] = f'attachment; filename="companies.{export_format}"'
+    return response
+
+
+def company_autocomplete(request):
+    """Suggest companies for the partial denomination in ``q``.
+
+    Queries falling through to the providers are limited per client to
+    ``COMPANYATLAS["AUTOCOMPLETE_RATE"]`` a minute; beyond, only local and cached
+    suggestions are returned, with the ``throttled`` origin.
+    """
+    try:
+        limit = int(request.GET.get("limit", 0)) or None
+    except ValueError:
+        limit = None
+    rate = get_companyatlas_setting("AUTOCOMPLETE_RATE", COMPANYATLAS_AUTOCOMPLETE_RATE)
+    response = JsonResponse(autocomplete(
+        request.GET.get("q", ""),
+        limit=limit,
+        allow_providers=lambda: allow_request(request, "autocomplete", rate),
+    ))
+    max_age = get_companyatlas_setting("AUTOCOMPLETE_MAX_AGE", 60)
+    patch_cache_control(response, private=True, max_age=max_age)
+    return response
+
+
+@staff_member_required
+@require_POST
+def company_resolve(request):
+    """Resolve identifiers to companies for staff, streaming one JSON line each.
+
+    The body is a JSON object with ``identifiers``, a list of ``[data_type, value]``
+    pairs or ``{"data_type": ..., "value": ...}`` objects, and optionally ``lookup``
+    to enqueue provider lookups for the unresolved ones. Lookups create companies:
+    they need the permission to add one, and take at most
+    ``COMPANYATLAS["RESOLVE_LOOKUP_MAX_ITEMS"]`` identifiers. Requests go through
+    the CSRF check, session clients sending the token in ``X-CSRFToken``.
+    """
+    try:
+        payload = json.loads(request.body)
+        if not isinstance(payload, dict):
+            raise ValueError("Expected a JSON object")
+        lookup = bool(payload.get("lookup"))
+        pairs = parse_identifiers(payload.get("identifiers"), lookup=lookup)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    if lookup and not request.user.has_perm("djcompanyatlas.add_companyatlascompany"):
+        return JsonResponse({"error": "Lookups need the permission to add companies"}, status=403)
+    rows = iter_resolved(pairs, lookup=lookup)
+    return StreamingHttpResponse(iter_resolved_jsonl(rows), content_type="application/x-ndjson")
+
+
+def _get_api_state(request, pk=None):
+    if not hasattr(request, "companyatlas_api_state"):
+        request.companyatlas_api_state = get_api_state(request.GET, pk)
+    return request.companyatlas_api_state
+
+
+def _api_etag(request, pk=None):
+    state = _get_api_state(request, pk)
+    return state["etag"] if state else None
+
+
+def _api_last_modified(request, pk=None):
+    state = _get_api_state(request, pk)
+    return state["last_modified"] if state else None
+
+
+@staff_member_required
+@require_safe
+@condition(etag_func=_api_etag, last_modified_func=_api_last_modified)
+def company_api_list(request):
+    """List companies as JSON for staff, ``cursor`` pointing to the next page."""
+    try:
+        params = parse_api_params(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    results, cursor = get_api_page(params)
+    next_url = None
+    if cursor:
+        query = request.GET.copy()
+        query["cursor"] = cursor
+        next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+    return JsonResponse({"results": results, "next": next_url}, encoder=CompanyAtlasJSONEncoder)
+
+
+@staff_member_required
+@require_safe
+@condition(etag_func=_api_etag, last_modified_func=_api_last_modified)
+def company_api_detail(request, pk):
+    """Show a company as JSON for staff."""
+    try:
+        params = parse_api_params(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    company = get_object_or_404(get_api_queryset(params), pk=pk)
+    return JsonResponse(serialize_company(company, params), encoder=CompanyAtlasJSONEncoder)
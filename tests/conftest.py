@@ -0,0 +1,46 @@
+"""Pytest configuration for django-companyatlas."""
+
+import pytest
+
+from djcompanyatlas.models import CompanyAtlasVirtualCompany
+from djcompanyatlas.pool import reset_provider_pool
+
+from .query_budget import MEASURES
+
+
+@pytest.fixture
+def fake_providers(settings):
+    """Replace the providers with fake ones, configured by the returned callable.
+
+    Each keyword argument set is one ``CompanyAtlasFakeProvider``; the default is a
+    single provider named ``fake``.
+    """
+
+    def configure(*providers):
+        settings.COMPANYATLAS = {
+            **settings.COMPANYATLAS,
+            "PROVIDERS": [
+                {"class": "djcompanyatlas.fake.CompanyAtlasFakeProvider", "kwargs": kwargs}
+                for kwargs in providers or [{}]
+            ],
+        }
+        reset_provider_pool()
+        CompanyAtlasVirtualCompany.objects.command_cache.clear()
+        CompanyAtlasVirtualCompany.objects.negative_cache.clear()
+
+    configure()
+    yield configure
+    reset_provider_pool()
+    CompanyAtlasVirtualCompany.objects.command_cache.clear()
+    CompanyAtlasVirtualCompany.objects.negative_cache.clear()
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not MEASURES:
+        return
+    terminalreporter.section("query budgets")
+    for page in MEASURES:
+        terminalreporter.write_line(
+            f"{page.name:<45} rows={page.rows:<5} queries={page.queries:<4} "
+            f"{page.seconds * 1000:8.1f} ms"
+        )
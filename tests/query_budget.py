@@ -0,0 +1,124 @@
+"""Query budget harness for the admin pages and views.
+
+Pages are rendered against a seeded dataset and their query count and duration
+recorded. A page fails when it runs more queries than its budget, or when its query
+count grows with the number of rows. ``COMPANYATLAS_QUERY_BUDGET_ROWS`` sets the
+number of seeded companies (10 by default).
+"""
+
+import os
+import time
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from djcompanyatlas.models import (
+    CompanyAtlasAddress,
+    CompanyAtlasCompany,
+    CompanyAtlasData,
+    CompanyAtlasDocument,
+    CompanyAtlasEvent,
+    CompanyAtlasPerson,
+)
+
+COMPANYATLAS_QUERY_BUDGET_ROWS = int(os.environ.get("COMPANYATLAS_QUERY_BUDGET_ROWS", "10"))
+
+
+@dataclass
+class PageMeasure:
+    name: str
+    rows: int
+    status: int
+    queries: int
+    seconds: float
+
+
+MEASURES: list[PageMeasure] = []
+
+
+def seed_companies(count: int, facets: int = 2) -> list[CompanyAtlasCompany]:
+    """Create ``count`` deterministic companies with ``facets`` rows per facet."""
+    start = CompanyAtlasCompany.objects.count()
+    companies = CompanyAtlasCompany.objects.bulk_create([
+        CompanyAtlasCompany(
+            denomination=f"Company {n:05d}", code=f"{n:09d}", source="seed", country_code="FR"
+        )
+        for n in range(start, start + count)
+    ])
+    rows: dict = {}
+    for company in companies:
+        for i in range(facets):
+            source = {"company": company, "source": f"seed{i}", "country_code": "FR"}
+            for obj in [
+                CompanyAtlasData(data_type="siren", value=company.code, **source),
+                CompanyAtlasAddress(address={"city": "Paris"}, is_headquarters=i == 0, **source),
+                CompanyAtlasPerson(
+                    officer_or_owner="officer",
+                    physical_or_moral="physical",
+                    first_name="Jane",
+                    last_name=f"Doe {i}",
+                    **source,
+                ),
+                CompanyAtlasEvent(event_type="creation", title=f"Event {i}", **source),
+                CompanyAtlasDocument(
+                    document_type="statuts",
+                    title=f"Document {i}",
+                    url=f"https://example.com/{company.code}/{i}",
+                    **source,
+                ),
+            ]:
+                rows.setdefault(type(obj), []).append(obj)
+    for model, objs in rows.items():
+        model.objects.bulk_create(objs)
+    return companies
+
+
+def measure(client, name: str, url: str, rows: int) -> PageMeasure:
+    """Render ``url`` and record its status, query count and duration."""
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = client.get(url)
+        if getattr(response, "streaming", False):
+            b"".join(response.streaming_content)
+        seconds = time.perf_counter() - start
+    page = PageMeasure(name, rows, response.status_code, len(queries), seconds)
+    MEASURES.append(page)
+    return page
+
+
+def assert_query_budget(client, name: str, url: str, budget: int, rows: int) -> PageMeasure:
+    page = measure(client, name, url, rows)
+    assert page.status == 200, f"{name}: status {page.status}"
+    assert page.queries <= budget, f"{name}: {page.queries} queries, budget {budget}"
+    return page
+
+
+def assert_constant_queries(
+    client, name: str, url_for, budget: int, rows: int | None = None
+) -> None:
+    """Check the budget of a page with ``rows`` companies, then with twice as many.
+
+    The second batch of companies has twice as many rows per facet, so pages about
+    the last company grow too. A first unmeasured request warms the per-process
+    caches (content types, sessions) up, the Django cache is then cleared so
+    pages are measured uncached.
+
+    Args:
+        client: Logged-in test client.
+        name: Page name used in reports.
+        url_for: Callable returning the URL of the page from the seeded companies.
+        budget: Maximum number of queries.
+        rows: Companies seeded first, ``COMPANYATLAS_QUERY_BUDGET_ROWS`` by default.
+    """
+    rows = rows or COMPANYATLAS_QUERY_BUDGET_ROWS
+    companies = seed_companies(rows)
+    client.get(url_for(companies))
+    cache.clear()
+    small = assert_query_budget(client, name, url_for(companies), budget, rows)
+    companies += seed_companies(rows, facets=4)
+    large = assert_query_budget(client, name, url_for(companies), budget, rows * 2)
+    assert large.queries == small.queries, (
+        f"{name}: {small.queries} queries with {rows} companies, {large.queries} with {rows * 2}"
+    )
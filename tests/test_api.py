@@ -0,0 +1,35 @@
+"""JSON API access and conditional requests."""
+
+import pytest
+from django.urls import reverse
+
+from djcompanyatlas.models import CompanyAtlasCompany, CompanyAtlasData
+
+
+@pytest.fixture
+def companies():
+    return [
+        CompanyAtlasCompany.objects.create(denomination=f"Company {n}", code=f"{n:09d}")
+        for n in range(4)
+    ]
+
+
+@pytest.mark.django_db
+def test_api_is_staff_only(client, companies):
+    response = client.get(reverse("djcompanyatlas:company-api-list"))
+    assert response.status_code == 302
+    response = client.get(reverse("djcompanyatlas:company-api-detail", args=[companies[0].pk]))
+    assert response.status_code == 302
+
+
+@pytest.mark.django_db
+def test_list_etag_only_depends_on_the_page(admin_client, companies):
+    url = reverse("djcompanyatlas:company-api-list") + "?limit=2&include=data"
+    etag = admin_client.get(url)["ETag"]
+    assert admin_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    companies[3].save()
+    assert admin_client.get(url)["ETag"] == etag
+
+    CompanyAtlasData.objects.create(company=companies[1], source="s", data_type="siren")
+    assert admin_client.get(url)["ETag"] != etag
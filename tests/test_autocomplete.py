@@ -0,0 +1,30 @@
+"""Company autocomplete."""
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from djcompanyatlas.autocomplete import _get_cache_key, get_provider_suggestions
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_prefix_results_are_filtered_by_prefix():
+    results = [{"denomination": "Acme One"}, {"denomination": "Big Acme"}]
+    cache.set(_get_cache_key("acm"), {"complete": True, "results": results})
+    assert get_provider_suggestions("acme") == ([{"denomination": "Acme One"}], "prefix")
+
+
+@pytest.mark.django_db
+def test_provider_lookups_are_throttled(fake_providers, client, settings):
+    settings.COMPANYATLAS = {**settings.COMPANYATLAS, "AUTOCOMPLETE_RATE": 1}
+    url = reverse("djcompanyatlas:company-autocomplete")
+    assert client.get(url, {"q": "acme"}).json()["origin"] == "providers"
+    assert client.get(url, {"q": "acme"}).json()["origin"] == "cache"
+    response = client.get(url, {"q": "globex"}).json()
+    assert (response["origin"], response["results"]) == ("throttled", [])
@@ -0,0 +1,43 @@
+"""Concurrent provider calls of batched searches."""
+
+import threading
+
+from djcompanyatlas.managers.virtuals.queryset import normalize_provider_results
+from djcompanyatlas.providers import call_providers_batch
+
+
+def denominations(results):
+    result = results[0]
+    rows = result["provider"].get_service_result("search_company")
+    assert rows is result["result"]
+    return {row["denomination"].split()[0] for row in rows}
+
+
+def test_batch_queries_do_not_share_results(fake_providers):
+    fake_providers({"latency": 0.05})
+    calls = {query: {"query": query} for query in ["acme", "globex", "initech"]}
+    batch = call_providers_batch("search_company", calls)
+    for query, results in batch.items():
+        assert denominations(results) == {query.title()}
+
+
+def test_concurrent_batches(fake_providers):
+    fake_providers({"latency": 0.05})
+    barrier = threading.Barrier(2)
+    found = {}
+
+    def search(query):
+        barrier.wait()
+        found[query] = call_providers_batch("search_company", {query: {"query": query}})[query]
+
+    threads = [threading.Thread(target=search, args=(query,)) for query in ["acme", "globex"]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Normalized once both calls are over, as cached querysets are.
+    for query, results in found.items():
+        assert denominations(results) == {query.title()}
+        rows = normalize_provider_results(results, "search_company")
+        assert {row["denomination"].split()[0] for row in rows} == {query.title()}
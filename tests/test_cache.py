@@ -0,0 +1,55 @@
+"""Command and negative caches of the virtual managers."""
+
+import json
+import time
+
+import pytest
+
+from djcompanyatlas.managers.virtuals.base import CompanyAtlasCommandCache
+from djcompanyatlas.models import CompanyAtlasVirtualCompany
+from djcompanyatlas.pool import get_provider_pool
+
+
+def test_lru_eviction_and_ttl():
+    cache = CompanyAtlasCommandCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.info() == {"hits": 3, "misses": 2, "size": 1, "maxsize": 2}
+
+
+def test_clear_by_prefix():
+    cache = CompanyAtlasCommandCache()
+    cache.set(cache.make_key("search_company", query="a"), 1)
+    cache.set(cache.make_key("get_company_events", code="a"), 2)
+    cache.clear(json.dumps(["search_company"])[:-1])
+    assert cache.info()["size"] == 1
+
+
+def test_commands_are_cached(fake_providers):
+    manager = CompanyAtlasVirtualCompany.objects
+    provider = get_provider_pool().get_providers()[0]
+    assert manager.search_company("acme").count() == 20
+    assert manager.search_company("acme").count() == 20
+    assert provider.calls == 1
+    manager.search_company("acme", ignore_cache=True)
+    assert provider.calls == 2
+
+
+@pytest.mark.parametrize("failed", [False, True])
+def test_empty_results_use_the_negative_cache(failed):
+    manager = CompanyAtlasVirtualCompany.objects
+    manager.command_cache.clear()
+    manager.negative_cache.clear()
+    result = {"name": "fake", "error": "down"} if failed else {"name": "fake", "result": []}
+    queryset = manager.cache_results("search_company", [result], [], query="nothing")
+    assert not queryset.exists()
+    assert manager.cache_info()["size"] == 0
+    # Failed calls are not cached: the providers are asked again.
+    assert manager.negative_cache_info()["size"] == (0 if failed else 1)
+    cached = manager.get_cached_command("search_company", query="nothing")
+    assert (cached is None) == failed
@@ -0,0 +1,42 @@
+"""Duplicate company detection and merge."""
+
+import pytest
+
+from djcompanyatlas.dedup import find_duplicate_groups, merge_groups
+from djcompanyatlas.models import CompanyAtlasAddress, CompanyAtlasCompany, CompanyAtlasData
+
+
+def create_company(denomination, postcode, siren=None):
+    company = CompanyAtlasCompany.objects.create(denomination=denomination, code=siren or "")
+    CompanyAtlasAddress.objects.create(
+        company=company, is_headquarters=True, address={"postal_code": postcode}
+    )
+    if siren:
+        CompanyAtlasData.objects.create(company=company, data_type="siren", value=siren)
+    return company
+
+
+@pytest.mark.django_db
+def test_find_duplicate_groups():
+    first = create_company("ACME S.A.", "75001", "552100554")
+    second = create_company("Acme SA", "75 001")
+    third = create_company("Other", "69001", "552100554")
+    create_company("Acme SA", "69001")
+    assert find_duplicate_groups() == [[first.pk, second.pk, third.pk]]
+
+
+@pytest.mark.django_db
+def test_merge_groups_in_chunks():
+    companies = [create_company(f"Acme {i}", "75001", f"55210055{i}") for i in range(6)]
+    updated_at = CompanyAtlasAddress.objects.order_by("updated_at").last().updated_at
+    groups = [[companies[i].pk, companies[i + 1].pk] for i in range(0, 6, 2)]
+
+    assert merge_groups(groups, batch_size=3) == 3
+    assert set(CompanyAtlasCompany.objects.values_list("pk", flat=True)) == {
+        group[0] for group in groups
+    }
+    for target in groups:
+        assert CompanyAtlasData.objects.filter(company_id=target[0]).count() == 1
+        addresses = CompanyAtlasAddress.objects.filter(company_id=target[0])
+        assert len(addresses) == 2
+        assert max(address.updated_at for address in addresses) > updated_at
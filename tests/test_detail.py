@@ -0,0 +1,40 @@
+"""Cached company detail fragments."""
+
+import pytest
+from django.core.cache import cache
+from django.utils import translation
+
+from djcompanyatlas.dedup import merge_groups
+from djcompanyatlas.detail import _get_cache_key, get_detail_queryset, render_company_detail
+from djcompanyatlas.models import CompanyAtlasCompany
+from djcompanyatlas.sync import sync_company_events
+
+
+@pytest.fixture
+def company():
+    return CompanyAtlasCompany.objects.create(denomination="Acme", code="552100554")
+
+
+def render(pk, language):
+    with translation.override(language):
+        render_company_detail(get_detail_queryset().get(pk=pk))
+
+
+@pytest.mark.django_db
+def test_fragments_are_cached_per_language(company):
+    cache.clear()
+    render(company.pk, "fr")
+    assert cache.get(_get_cache_key(company.pk, "fr")) is not None
+    assert cache.get(_get_cache_key(company.pk, "en")) is None
+
+
+@pytest.mark.django_db
+def test_bulk_writes_invalidate_fragments(fake_providers, company):
+    render(company.pk, "fr")
+    sync_company_events([company])
+    assert cache.get(_get_cache_key(company.pk, "fr")) is None
+
+    duplicate = CompanyAtlasCompany.objects.create(denomination="Acme", code="552100554")
+    render(company.pk, "en")
+    merge_groups([[company.pk, duplicate.pk]])
+    assert cache.get(_get_cache_key(company.pk, "en")) is None
@@ -0,0 +1,36 @@
+"""Cached companyatlas discovery snapshot."""
+
+import json
+from pathlib import Path
+
+import pytest
+from django.utils.functional import Promise
+
+from djcompanyatlas import discovery
+
+
+def test_snapshot_is_written_atomically_and_rebuilt_when_stale(settings, tmp_path):
+    path = tmp_path / "cache" / "discovery.json"
+    settings.COMPANYATLAS = {**settings.COMPANYATLAS, "DISCOVERY_SNAPSHOT": path}
+
+    snapshot = discovery._load_snapshot()
+    assert json.loads(path.read_text()) == snapshot
+    assert [item.name for item in path.parent.iterdir()] == ["discovery.json"]
+
+    path.write_text(json.dumps({**snapshot, "services": [], "fingerprint": "stale"}))
+    assert discovery._load_snapshot()["services"] == snapshot["services"]
+
+
+def test_snapshot_labels_are_lazy():
+    fields = discovery.get_snapshot()["search_company_fields"]
+    assert all(isinstance(field["label"], Promise) for field in fields.values())
+
+
+def test_installed_packages_are_keyed_on_versions_and_settings(settings, monkeypatch):
+    monkeypatch.setattr(discovery, "_is_source_tree", lambda: False)
+    monkeypatch.setattr(Path, "rglob", lambda *args: pytest.fail("modules were walked"))
+    fingerprint = discovery._get_fingerprint()
+    assert discovery._get_fingerprint() == fingerprint
+
+    settings.COMPANYATLAS = {**settings.COMPANYATLAS, "PROVIDERS": [{"class": "fake"}]}
+    assert discovery._get_fingerprint() != fingerprint
@@ -0,0 +1,78 @@
+"""Company enrichment jobs."""
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from djcompanyatlas.checks import check_enrich_cache
+from djcompanyatlas.enrich import get_job, start_enrich
+from djcompanyatlas.models import CompanyAtlasCompany
+
+
+def run_inline(path, *args, **kwargs):
+    return import_string(path)(*args, **kwargs)
+
+
+@pytest.fixture
+def company():
+    return CompanyAtlasCompany.objects.create(denomination="Acme", code="552100554")
+
+
+@pytest.mark.django_db
+def test_process_local_cache_is_refused(company):
+    with pytest.raises(ImproperlyConfigured):
+        start_enrich(company.pk)
+
+
+@pytest.mark.django_db
+def test_enrich_job_reports_progress(fake_providers, settings, company):
+    settings.COMPANYATLAS = {
+        **settings.COMPANYATLAS,
+        "ENRICH_LOCAL_CACHE": True,
+        "TASK_RUNNER": "tests.test_enrich.run_inline",
+    }
+    job = get_job(start_enrich(company.pk, ["event", "document"])["id"])
+    assert job["status"] == "done"
+    assert {facet: progress["status"] for facet, progress in job["facets"].items()} == {
+        "event": "done",
+        "document": "done",
+    }
+
+
+@pytest.mark.django_db
+def test_process_local_cache_is_reported(client, admin_client, settings, company):
+    assert [warning.id for warning in check_enrich_cache(None)] == ["djcompanyatlas.W001"]
+    url = reverse("djcompanyatlas:company-enrich", args=[company.pk])
+    assert admin_client.post(url).status_code == 503
+
+    settings.COMPANYATLAS = {**settings.COMPANYATLAS, "ENRICH_LOCAL_CACHE": True}
+    assert check_enrich_cache(None) == []
+
+
+@pytest.mark.django_db
+def test_enrich_is_restricted_and_throttled(
+    fake_providers, client, django_user_model, settings, company
+):
+    settings.COMPANYATLAS = {
+        **settings.COMPANYATLAS,
+        "ENRICH_LOCAL_CACHE": True,
+        "ENRICH_RATE": 1,
+        "TASK_RUNNER": "tests.test_enrich.run_inline",
+    }
+    cache.clear()
+    url = reverse("djcompanyatlas:company-enrich", args=[company.pk])
+    assert client.post(url).status_code == 302
+
+    user = django_user_model.objects.create_user("staff", is_staff=True)
+    client.force_login(user)
+    assert client.post(url).status_code == 403
+
+    user.user_permissions.add(Permission.objects.get(codename="change_companyatlascompany"))
+    client.force_login(django_user_model.objects.get(pk=user.pk))
+    response = client.post(url, {"facets": ["event"]})
+    assert response.status_code == 202
+    assert client.get(response["Location"]).json()["status"] == "done"
+    assert client.post(url, {"facets": ["event"]}).status_code == 429
@@ -0,0 +1,19 @@
+"""Streaming export of companies."""
+
+import pytest
+
+from djcompanyatlas.export import iter_export_rows
+from djcompanyatlas.models import CompanyAtlasCompany, CompanyAtlasData
+
+
+@pytest.mark.django_db
+def test_export_chunks_prefetch(django_assert_num_queries):
+    for index in range(3):
+        company = CompanyAtlasCompany.objects.create(denomination=f"Acme {index}")
+        CompanyAtlasData.objects.create(company=company, data_type="siren", value=str(index))
+
+    # Each chunk: companies, data, addresses; then one empty chunk.
+    with django_assert_num_queries(7):
+        rows = list(iter_export_rows(chunk_size=2))
+    assert [row["denomination"] for row in rows] == ["Acme 0", "Acme 1", "Acme 2"]
+    assert [row["data"][0]["value"] for row in rows] == ["0", "1", "2"]
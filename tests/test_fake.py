@@ -0,0 +1,40 @@
+"""Fake provider for offline load testing."""
+
+import pytest
+
+from djcompanyatlas.fake import CompanyAtlasFakeProvider
+from djcompanyatlas.providers import call_provider, get_call_instance
+
+
+def test_rows_are_deterministic():
+    first, second = CompanyAtlasFakeProvider(seed=1), CompanyAtlasFakeProvider(seed=1)
+    assert first.search_company("acme") == second.search_company("acme")
+    assert first.get_company_events("552100554") == second.get_company_events("552100554")
+    assert CompanyAtlasFakeProvider(seed=2).search_company("acme") != first.search_company("acme")
+
+
+def test_failures_raise_and_are_counted():
+    provider = CompanyAtlasFakeProvider(error_rate=1)
+    with pytest.raises(ConnectionError):
+        provider.search_company("acme")
+    assert (provider.calls, provider.errors) == (1, 1)
+
+
+def test_counters_are_shared_with_call_copies():
+    provider = CompanyAtlasFakeProvider(error_rate=1)
+    result = call_provider(provider, "search_company", query="acme")
+    assert "error" in result
+    assert result["provider"] is not provider
+    with pytest.raises(ConnectionError):
+        get_call_instance(provider).get_company_documents("552100554")
+    assert (provider.calls, provider.errors) == (2, 2)
+
+
+def test_search_honours_ordering_offset_and_limit():
+    provider = CompanyAtlasFakeProvider(results=10)
+    rows = provider.search_company("acme", ordering=["-reference"])
+    references = [row["reference"] for row in rows]
+    assert references == sorted(references, reverse=True)
+    page = provider.search_company("acme", offset=2, limit=3, ordering=["-reference"])
+    assert page == rows[2:5]
+    assert len(provider.search_company("acme", offset=8)) == 2
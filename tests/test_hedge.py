@@ -0,0 +1,30 @@
+"""Hedged provider lookups."""
+
+import time
+
+from djcompanyatlas.models import CompanyAtlasVirtualCompany
+from djcompanyatlas.providers import call_providers_hedged
+
+
+def test_slow_provider_is_hedged(fake_providers, settings):
+    fake_providers({"name": "a_slow", "latency": 1.0}, {"name": "b_fast"})
+    settings.COMPANYATLAS = {**settings.COMPANYATLAS, "HEDGE_DELAY": 0.05}
+    start = time.monotonic()
+    results = call_providers_hedged("search_company_by_reference", code="552100554")
+    assert [result["name"] for result in results] == ["b_fast"]
+    assert time.monotonic() - start < 0.5
+
+
+def test_hedged_lookup_gives_up_after_timeout(fake_providers, settings):
+    fake_providers({"name": "slow", "latency": 1.0})
+    settings.COMPANYATLAS = {**settings.COMPANYATLAS, "HEDGE_TIMEOUT": 0.1}
+    start = time.monotonic()
+    assert call_providers_hedged("search_company_by_reference", code="552100554") == []
+    assert time.monotonic() - start < 0.5
+
+
+def test_windows_do_not_pass_hedge_to_providers(fake_providers):
+    manager = CompanyAtlasVirtualCompany.objects
+    assert manager.get_queryset_command("search_company", query="acme", limit=5, hedge=True)
+    provider = manager._cached_providers["search_company"][0]["provider"]
+    assert "hedge" not in provider.get_service_results_cache()["search_company"]["kwargs"]
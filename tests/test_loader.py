@@ -0,0 +1,50 @@
+"""Request-scoped batching of company and facet lookups."""
+
+import pytest
+from django.db.models.signals import post_init
+
+from djcompanyatlas.loader import loader_scope
+from djcompanyatlas.models import CompanyAtlasAddress, CompanyAtlasCompany, CompanyAtlasData
+
+
+@pytest.fixture
+def companies():
+    companies = []
+    for n in range(3):
+        company = CompanyAtlasCompany.objects.create(denomination=f"Company {n}", code=f"{n:09d}")
+        CompanyAtlasData.objects.create(company=company, source="s", data_type="siren")
+        CompanyAtlasAddress.objects.create(
+            company=company, source="s", address={"city": "Paris"}, is_headquarters=True
+        )
+        companies.append(company)
+    return companies
+
+
+def test_receivers_are_only_connected_in_scopes():
+    assert not post_init.has_listeners(CompanyAtlasData)
+    with loader_scope():
+        with loader_scope():
+            assert post_init.has_listeners(CompanyAtlasData)
+        assert post_init.has_listeners(CompanyAtlasData)
+    assert not post_init.has_listeners(CompanyAtlasData)
+
+
+@pytest.mark.django_db
+def test_companies_are_loaded_once_for_every_model(companies, django_assert_num_queries):
+    with loader_scope() as loader, django_assert_num_queries(3):
+        rows = [*CompanyAtlasData.objects.all(), *CompanyAtlasAddress.objects.all()]
+        assert len({str(row).split(" - ")[0] for row in rows}) == 3
+    assert loader.batches == 1
+
+
+@pytest.mark.django_db
+def test_relations_are_batched_for_new_instances_only(companies, django_assert_num_queries):
+    with loader_scope() as loader:
+        first = list(CompanyAtlasCompany.objects.filter(pk__in=[c.pk for c in companies[:2]]))
+        with django_assert_num_queries(1):
+            assert [company.headquarters_address for company in first]
+        later = CompanyAtlasCompany.objects.get(pk=companies[2].pk)
+        with django_assert_num_queries(1):
+            assert later.headquarters_address
+    assert loader.batches == 2
+    assert len(loader.instances[CompanyAtlasCompany]) == 3
@@ -0,0 +1,39 @@
+"""Process-wide provider pool and per-call provider instances."""
+
+import pytest
+
+from djcompanyatlas.pool import get_provider_pool
+from djcompanyatlas.providers import call_provider, get_companyatlas_providers
+
+
+def test_pool_instantiates_providers_once(fake_providers):
+    pool = get_provider_pool()
+    first = get_companyatlas_providers()
+    assert [provider.name for provider in first] == ["fake"]
+    assert get_companyatlas_providers()[0] is first[0]
+    assert pool.stats()["providers"] == 1
+    # The fake provider declares no session: none is attached.
+    assert pool.get_session("fake") is None
+    assert not hasattr(first[0], "session")
+
+
+def test_call_provider_runs_on_a_copy(fake_providers):
+    provider = get_companyatlas_providers()[0]
+    first = call_provider(provider, "search_company", query="acme")
+    second = call_provider(provider, "search_company", query="globex")
+
+    assert first["provider"] is not provider
+    assert first["provider"] is not second["provider"]
+    assert provider.get_service_results_cache() == {}
+    assert first["provider"].get_service_result("search_company") is first["result"]
+    assert second["provider"].get_service_result("search_company") is second["result"]
+    assert provider.calls == 2
+
+
+@pytest.mark.parametrize("pooled", [True, False])
+def test_providers_without_pool(fake_providers, settings, pooled):
+    settings.COMPANYATLAS = {**settings.COMPANYATLAS, "PROVIDER_POOL": pooled}
+    providers = get_companyatlas_providers()
+    assert isinstance(providers, list)
+    assert [provider.name for provider in providers] == ["fake"]
+    assert (providers[0] is get_companyatlas_providers()[0]) is pooled
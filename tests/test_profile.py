@@ -0,0 +1,48 @@
+"""End-to-end profiling of provider commands."""
+
+import pstats
+import tracemalloc
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from djcompanyatlas import profiling
+
+
+@pytest.mark.django_db
+def test_profile_writes_the_profiles(fake_providers, tmp_path):
+    fake_providers({"name": "fake", "latency": 0.02})
+    stdout = StringIO()
+    call_command(
+        "companyatlas_profile",
+        "get_company_events",
+        "552100554",
+        output_dir=str(tmp_path),
+        interval=0.001,
+        stdout=stdout,
+    )
+    output = stdout.getvalue()
+    assert "Peak traced memory" in output
+    assert "Top allocations:" in output
+    assert "fake" in output
+
+    prof = next(tmp_path.glob("companyatlas-get_company_events-*.prof"))
+    stats = pstats.Stats(str(prof))
+    assert any(name == "run_command" for _, _, name in stats.stats)
+    collapsed = next(tmp_path.glob("companyatlas-get_company_events-*.collapsed"))
+    samples = [line.rsplit(" ", 1) for line in collapsed.read_text().splitlines()]
+    assert samples
+    assert any("run_command" in stack for stack, _ in samples)
+    assert not tracemalloc.is_tracing()
+
+
+@pytest.mark.django_db
+def test_tracemalloc_is_stopped_on_errors(fake_providers, tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise ConnectionError("provider down")
+
+    monkeypatch.setattr(profiling, "run_command", fail)
+    with pytest.raises(ConnectionError):
+        profiling.profile_command("get_company_events", "552100554", output_dir=tmp_path)
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,85 @@
+"""Query budgets of the admin pages and views."""
+
+import pytest
+from django.apps import apps
+from django.urls import reverse
+
+from .query_budget import assert_constant_queries
+
+ADMIN_MODELS = {
+    "companyatlascompany": 6,
+    "companyatlasdata": 6,
+    "companyatlasaddress": 7,
+    "companyatlasperson": 5,
+    "companyatlasevent": 8,
+    "companyatlasdocument": 8,
+}
+
+ADMIN_CHANGE_MODELS = {
+    "companyatlasdata": 8,
+    "companyatlasaddress": 8,
+    "companyatlasperson": 8,
+    "companyatlasevent": 7,
+    "companyatlasdocument": 7,
+}
+
+VIEWS = {
+    "company-list": (2, lambda companies: reverse("djcompanyatlas:company-list")),
+    "company-detail": (
+        6,
+        lambda companies: reverse("djcompanyatlas:company-detail", args=[companies[-1].pk]),
+    ),
+    "company-api-list": (
+        10,
+        lambda companies: (
+            reverse("djcompanyatlas:company-api-list") + "?include=data,addresses,events"
+        ),
+    ),
+    "company-api-detail": (
+        14,
+        lambda companies: reverse("djcompanyatlas:company-api-detail", args=[companies[-1].pk])
+        + "?include=data,addresses,persons,events,documents",
+    ),
+}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("model", ADMIN_MODELS)
+def test_admin_changelist(admin_client, model):
+    url = reverse(f"admin:djcompanyatlas_{model}_changelist")
+    assert_constant_queries(
+        admin_client, f"admin {model} changelist", lambda companies: url, ADMIN_MODELS[model]
+    )
+
+
+@pytest.mark.django_db
+def test_admin_company_change(admin_client):
+    assert_constant_queries(
+        admin_client,
+        "admin companyatlascompany change",
+        lambda companies: reverse(
+            "admin:djcompanyatlas_companyatlascompany_change", args=[companies[-1].pk]
+        ),
+        9,
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("model", ADMIN_CHANGE_MODELS)
+def test_admin_change(admin_client, model):
+    related = apps.get_model("djcompanyatlas", model).objects
+
+    def url_for(companies):
+        obj = related.filter(company=companies[-1]).order_by("pk").first()
+        return reverse(f"admin:djcompanyatlas_{model}_change", args=[obj.pk])
+
+    assert_constant_queries(
+        admin_client, f"admin {model} change", url_for, ADMIN_CHANGE_MODELS[model]
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", VIEWS)
+def test_view(admin_client, name):
+    budget, url_for = VIEWS[name]
+    assert_constant_queries(admin_client, name, url_for, budget)
@@ -0,0 +1,47 @@
+"""Lazy normalization and ordering of virtual querysets."""
+
+from djcompanyatlas.fake import CompanyAtlasFakeProvider
+from djcompanyatlas.managers.virtuals.queryset import (
+    CompanyAtlasLazyList,
+    CompanyAtlasVirtualQuerySet,
+    normalize_provider_results,
+)
+from djcompanyatlas.models import CompanyAtlasVirtualCompany
+from djcompanyatlas.providers import call_providers
+
+
+def test_rows_are_normalized_per_provider_on_access(fake_providers, monkeypatch):
+    fake_providers({"name": "first"}, {"name": "second"})
+    calls = []
+    normalize = CompanyAtlasFakeProvider.get_service_normalize
+
+    def counted(self, service_name, **kwargs):
+        calls.append(self.name)
+        return normalize(self, service_name, **kwargs)
+
+    monkeypatch.setattr(CompanyAtlasFakeProvider, "get_service_normalize", counted)
+    results = call_providers("search_company", query="acme")
+    rows = normalize_provider_results(results, "search_company")
+    assert len(rows) == 40 and calls == []
+    assert rows[0]["backend"] == "first"
+    assert rows[19]["backend"] == "first"
+    assert calls == ["first"]
+    assert rows[20]["backend"] == "second"
+    assert calls == ["first", "second"]
+
+
+def test_pk_ordering_keeps_or_reverses_provider_order():
+    companies = []
+    for pk in range(5):
+        company = CompanyAtlasVirtualCompany()
+        company.pk = pk
+        companies.append(company)
+    queryset = CompanyAtlasVirtualQuerySet(
+        model=CompanyAtlasVirtualCompany, data=CompanyAtlasLazyList(companies, lambda obj: obj)
+    )
+    assert [obj.pk for obj in queryset.order_by("pk")] == [0, 1, 2, 3, 4]
+    descending = queryset.order_by("-pk")
+    assert [obj.pk for obj in descending] == [4, 3, 2, 1, 0]
+    assert [obj.pk for obj in descending[:2]] == [4, 3]
+    assert [obj.pk for obj in descending.order_by("-pk")] == [4, 3, 2, 1, 0]
+    assert [obj.pk for obj in descending.order_by("pk")] == [0, 1, 2, 3, 4]
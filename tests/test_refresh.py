@@ -0,0 +1,55 @@
+"""Incremental refresh of stored companies."""
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from djcompanyatlas.models import CompanyAtlasCompany, CompanyAtlasData
+from djcompanyatlas.refresh import get_refresh_plan, get_stale_companies, refresh_company
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("source", ["fake", None])
+def test_refresh_reference(fake_providers, source):
+    company = CompanyAtlasCompany.objects.create(
+        denomination="Acme", code="552100554", source=source
+    )
+    counts = refresh_company(company.pk, ["data", "address"])
+
+    assert counts["inserted"] == 2
+    data = CompanyAtlasData.objects.get(company=company)
+    assert (data.source, data.value) == ("fake", "552100554")
+    assert refresh_company(company.pk, ["data", "address"])["unchanged"] == 2
+
+
+@pytest.mark.django_db
+def test_refresh_plan(fake_providers):
+    company = CompanyAtlasCompany.objects.create(denomination="Acme", code="552100554")
+    plan = dict(get_refresh_plan(budget=10, now=company.created_at.replace(year=2100)))
+    assert plan[company.pk] == ["address", "data", "document", "event"]
+
+    refresh_company(company.pk, ["event"])
+    company.refresh_from_db()
+    assert company.event_refreshed_at is not None
+    assert company.data_refreshed_at is None
+    assert get_refresh_plan(budget=1, now=company.created_at.replace(year=2100)) == []
+
+
+@pytest.mark.django_db
+def test_stale_companies_read_the_stamps():
+    never, old, fresh = (
+        CompanyAtlasCompany.objects.create(denomination=name, code=name)
+        for name in ("never", "old", "fresh")
+    )
+    now = never.created_at + timedelta(days=30)
+    CompanyAtlasCompany.objects.filter(pk=old.pk).update(data_refreshed_at=now - timedelta(days=14))
+    CompanyAtlasCompany.objects.filter(pk=fresh.pk).update(data_refreshed_at=now)
+
+    with CaptureQueriesContext(connection) as queries:
+        stale = get_stale_companies("data", timedelta(days=7), 10, now)
+    assert [pk for pk, _ in stale] == [never.pk, old.pk]
+    assert stale[1][1] == 2
+    # The stamps are read from the company table, without joining the data rows.
+    assert "JOIN" not in queries[0]["sql"]
@@ -0,0 +1,63 @@
+"""Bulk identifier resolution."""
+
+import json
+
+import pytest
+from django.test import Client
+from django.urls import reverse
+
+from djcompanyatlas.models import CompanyAtlasCompany, CompanyAtlasData
+from djcompanyatlas.resolve import lookup_identifiers, resolve_chunk
+
+
+@pytest.fixture
+def company():
+    company = CompanyAtlasCompany.objects.create(denomination="Acme", code="552100554")
+    CompanyAtlasData.objects.create(
+        company=company, source="seed", data_type="siren", value="552100554"
+    )
+    return company
+
+
+def post(client, identifiers, **payload):
+    return client.post(
+        reverse("djcompanyatlas:company-resolve"),
+        json.dumps({"identifiers": identifiers, **payload}),
+        content_type="application/json",
+    )
+
+
+@pytest.mark.django_db
+def test_resolve_chunk(company):
+    resolved = resolve_chunk([("siren", "552100554"), ("siren", "000000000")])
+    assert [row["id"] for row in resolved[("siren", "552100554")]] == [company.pk]
+    assert resolved[("siren", "000000000")] == []
+
+
+@pytest.mark.django_db
+def test_resolve_is_staff_only_and_csrf_protected(client, admin_user, company):
+    assert post(client, [["siren", "552100554"]]).status_code == 302
+    csrf_client = Client(enforce_csrf_checks=True)
+    csrf_client.force_login(admin_user)
+    assert post(csrf_client, [["siren", "552100554"]]).status_code == 403
+
+
+@pytest.mark.django_db
+def test_resolve_streams_one_line_per_identifier(admin_client, company):
+    response = post(admin_client, [["siren", "552100554"], ["siren", "000000000"]])
+    rows = [json.loads(line) for line in response.streaming_content]
+    assert [len(row["companies"]) for row in rows] == [1, 0]
+
+
+@pytest.mark.django_db
+def test_lookups_are_capped(admin_client, settings):
+    settings.COMPANYATLAS = {**settings.COMPANYATLAS, "RESOLVE_LOOKUP_MAX_ITEMS": 1}
+    identifiers = [["siren", "552100554"], ["siren", "000000000"]]
+    assert post(admin_client, identifiers).status_code == 200
+    assert post(admin_client, identifiers, lookup=True).status_code == 400
+
+
+@pytest.mark.django_db
+def test_lookup_searches_every_backend(fake_providers):
+    assert lookup_identifiers([["siren", "552100554"]]) == {"created": 1, "missing": 0}
+    assert resolve_chunk([("siren", "552100554")])[("siren", "552100554")]
@@ -0,0 +1,52 @@
+"""Provider routing by the country of company identifiers."""
+
+import pytest
+
+from djcompanyatlas.identifiers import infer_country_code
+from djcompanyatlas.models import CompanyAtlasVirtualCompany
+from djcompanyatlas.pool import get_provider_pool
+from djcompanyatlas.providers import call_providers, get_companyatlas_providers
+
+PROVIDERS = ({"name": "a_gb", "geo_data": "GB"}, {"name": "b_fr", "geo_data": "FR"})
+
+
+@pytest.mark.parametrize(
+    ("value", "country_code"),
+    [("552100554", "FR"), ("552100555", None), ("01234567", "GB"), ("FR40303265045", "FR")],
+)
+def test_infer_country_code(value, country_code):
+    assert infer_country_code(value) == country_code
+
+
+def test_only_covering_providers_are_returned(fake_providers):
+    fake_providers(*PROVIDERS, {"name": "c_world", "geo_data": ""})
+    names = ["a_gb", "b_fr", "c_world"]
+    assert [provider.name for provider in get_companyatlas_providers()] == names
+    providers = get_companyatlas_providers(country_code="FR")
+    assert [provider.name for provider in providers] == ["b_fr", "c_world"]
+
+
+@pytest.mark.parametrize("pooled", [True, False])
+def test_routing_skips_providers_not_covering_the_code(fake_providers, settings, pooled):
+    fake_providers(*PROVIDERS)
+    settings.COMPANYATLAS = {**settings.COMPANYATLAS, "PROVIDER_POOL": pooled}
+    manager = CompanyAtlasVirtualCompany.objects
+
+    list(manager.search_company_by_reference("552100554", backend=""))
+    results = manager._cached_providers["search_company_by_reference"]
+    assert [result["name"] for result in results] == ["b_fr"]
+
+
+def test_non_covering_providers_are_not_called(fake_providers):
+    fake_providers(*PROVIDERS)
+    providers = {provider.name: provider for provider in get_provider_pool().get_providers()}
+    call_providers("search_company_by_reference", code="552100554", country_code="FR")
+    assert (providers["a_gb"].calls, providers["b_fr"].calls) == (0, 1)
+
+
+def test_free_text_queries_are_not_routed(fake_providers):
+    fake_providers(*PROVIDERS)
+    manager = CompanyAtlasVirtualCompany.objects
+    list(manager.search_company(query="552100554"))
+    results = manager._cached_providers["search_company"]
+    assert [result["name"] for result in results] == ["a_gb", "b_fr"]
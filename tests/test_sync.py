@@ -0,0 +1,98 @@
+"""Materialization of provider documents and events."""
+
+import pytest
+
+from djcompanyatlas.models import (
+    CompanyAtlasCompany,
+    CompanyAtlasDocument,
+    CompanyAtlasEvent,
+    CompanyAtlasVirtualDocument,
+    CompanyAtlasVirtualEvent,
+)
+from djcompanyatlas.pool import get_provider_pool
+from djcompanyatlas.sync import sync_company_documents, sync_company_events
+
+
+@pytest.fixture
+def company():
+    return CompanyAtlasCompany.objects.create(denomination="Acme", code="552100554")
+
+
+@pytest.mark.django_db
+def test_sync_counts_and_updates_changed_rows(fake_providers, company):
+    assert sync_company_documents([company]) == {"inserted": 5, "updated": 0, "unchanged": 0}
+    assert sync_company_documents([company]) == {"inserted": 0, "updated": 0, "unchanged": 5}
+
+    document = CompanyAtlasDocument.objects.order_by("pk").first()
+    CompanyAtlasDocument.objects.filter(pk=document.pk).update(content="stale", content_hash="x")
+    assert sync_company_documents([company]) == {"inserted": 0, "updated": 1, "unchanged": 4}
+    document.refresh_from_db()
+    assert document.content == ""
+    assert CompanyAtlasDocument.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_sync_skipped_conflicts_are_not_inserted(fake_providers, company):
+    sync_company_events([company])
+    stored = list(CompanyAtlasEvent.objects.all())
+    CompanyAtlasEvent.objects.all().delete()
+    CompanyAtlasEvent.objects.bulk_create(stored[:2])
+
+    objs = [CompanyAtlasEvent(**{
+        field.attname: getattr(event, field.attname)
+        for field in CompanyAtlasEvent._meta.concrete_fields if not field.primary_key
+    }) for event in stored]
+    counts = CompanyAtlasEvent.objects.bulk_upsert(
+        objs[2:] + objs[:2], ["company", "natural_key"], ignore_conflicts=True
+    )
+    assert counts["inserted"] == 3
+    assert CompanyAtlasEvent.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_synced_rows_are_read_locally(fake_providers, company):
+    provider = get_provider_pool().get_providers()[0]
+    remote = list(CompanyAtlasVirtualEvent.objects.get_company_events(code=company.code))
+    sync_company_events([company])
+    calls = provider.calls
+
+    local = list(CompanyAtlasVirtualEvent.objects.get_company_events(code=company.code))
+    assert provider.calls == calls
+    assert len(local) == len(remote) == CompanyAtlasEvent.objects.count()
+
+    list(CompanyAtlasVirtualEvent.objects.get_company_events(
+        code=company.code, local=False, ignore_cache=True
+    ))
+    assert provider.calls == calls + 1
+    assert list(CompanyAtlasVirtualDocument.objects.get_company_documents(code="000000000"))
+
+
+@pytest.mark.django_db
+def test_failed_syncs_keep_reading_providers(fake_providers, company):
+    fake_providers({"name": "up"}, {"name": "down", "error_rate": 1})
+    assert sync_company_events([company])["inserted"] == 5
+    company.refresh_from_db()
+    assert company.event_refreshed_at is None
+
+    down = next(p for p in get_provider_pool().get_providers() if p.name == "down")
+    calls = down.calls
+    list(CompanyAtlasVirtualEvent.objects.get_company_events(code=company.code, ignore_cache=True))
+    assert down.calls == calls + 1
+
+
+@pytest.mark.django_db
+def test_sync_and_local_reads_stay_on_the_company_source(fake_providers):
+    fake_providers({"name": "registry_fr"}, {"name": "registry_gb"})
+    french, british = (
+        CompanyAtlasCompany.objects.create(denomination="Acme", code="552100554", source=source)
+        for source in ("registry_fr", "registry_gb")
+    )
+    sync_company_events([french, british])
+    sources = set(CompanyAtlasEvent.objects.values_list("company__source", "source"))
+    assert sources == {("registry_fr", "registry_fr"), ("registry_gb", "registry_gb")}
+
+    manager = CompanyAtlasVirtualEvent.objects
+    assert manager.get_local_company(french.code) is None
+    assert manager.get_local_company(french.code, "registry_gb") == british.pk
+    rows = manager.get_company_events(code=french.code, company=french.pk)
+    assert rows.count() == CompanyAtlasEvent.objects.filter(company=french).count() == 5
@@ -0,0 +1,86 @@
+"""Per-request wall time breakdown and its middleware."""
+
+import time
+
+import pytest
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from djcompanyatlas.models import CompanyAtlasCompany
+from djcompanyatlas.timing import (
+    format_server_timing,
+    get_timing_report,
+    record_provider_time,
+    timing_bucket,
+    timing_scope,
+)
+
+TIMING_MIDDLEWARE = "djcompanyatlas.middleware.CompanyAtlasTimingMiddleware"
+
+
+@pytest.fixture
+def timing_middleware(settings):
+    settings.MIDDLEWARE = [TIMING_MIDDLEWARE, *settings.MIDDLEWARE]
+
+
+def server_timing(response):
+    return {
+        metric.split(";")[0]: float(metric.split("dur=")[1].split(";")[0])
+        for metric in response["Server-Timing"].split(", ")
+    }
+
+
+def test_nested_buckets_pause_their_parent():
+    with timing_scope() as timings:
+        with timing_bucket("render"):
+            time.sleep(0.01)
+            with timing_bucket("db"):
+                time.sleep(0.02)
+        record_provider_time("fake", 0.5)
+        record_provider_time("fake", 0.25)
+    summary = timings.finish()
+    buckets = summary["buckets"]
+    assert buckets["db"]["ms"] >= 20
+    assert 10 <= buckets["render"]["ms"] < 20
+    total = sum(entry["ms"] for entry in buckets.values())
+    assert total == pytest.approx(summary["total"], abs=0.01)
+    assert summary["providers"] == {"fake": {"ms": 750.0, "count": 2}}
+    assert 'provider.fake;dur=750.0;desc="2 calls"' in format_server_timing(summary)
+
+
+def test_render_to_string_is_timed():
+    with timing_scope() as timings:
+        render_to_string("djcompanyatlas/company_list.html", {"companies": []})
+    assert timings.finish()["buckets"]["render"]["count"] == 1
+
+
+@pytest.mark.django_db
+def test_middleware_sends_the_breakdown(fake_providers, timing_middleware, admin_client):
+    url = reverse("djcompanyatlas:company-autocomplete")
+    response = admin_client.get(url, {"q": "acme"})
+    assert response.status_code == 200
+    metrics = server_timing(response)
+    assert {"provider", "db", "app", "provider.fake"} <= set(metrics)
+    buckets = [metric for name, metric in metrics.items() if name != "total" and "." not in name]
+    assert sum(buckets) == pytest.approx(metrics["total"], abs=0.01)
+    assert get_timing_report()["slowest"][0]["path"] == url
+
+
+@pytest.mark.django_db
+def test_render_is_timed_for_direct_render_views(timing_middleware, admin_client):
+    company = CompanyAtlasCompany.objects.create(denomination="Acme", code="552100554")
+    for url in (
+        reverse("djcompanyatlas:company-list"),
+        reverse("djcompanyatlas:company-detail", args=[company.pk]),
+    ):
+        metrics = server_timing(admin_client.get(url))
+        assert metrics["render"] > 0
+        assert metrics["db"] > 0
+
+
+@pytest.mark.django_db
+def test_header_is_only_sent_to_staff(timing_middleware, client, settings):
+    url = reverse("djcompanyatlas:company-list")
+    assert "Server-Timing" not in client.get(url)
+    settings.COMPANYATLAS = {**settings.COMPANYATLAS, "TIMING_HEADER": True}
+    assert "Server-Timing" in client.get(url)
@@ -0,0 +1,43 @@
+"""Content hashes and bulk upserts of source rows."""
+
+import pytest
+
+from djcompanyatlas.models import CompanyAtlasCompany, CompanyAtlasData
+
+KEY_FIELDS = ["company", "source", "country_code", "data_type"]
+
+
+@pytest.fixture
+def company():
+    return CompanyAtlasCompany.objects.create(denomination="Acme", code="552100554")
+
+
+def build(company, value, data_type="siren"):
+    return CompanyAtlasData(company=company, source="fake", data_type=data_type, value=value)
+
+
+@pytest.mark.django_db
+def test_bulk_upsert_skips_unchanged_rows(company):
+    counts = CompanyAtlasData.objects.bulk_upsert(
+        [build(company, "1"), build(company, "2", "siret")], KEY_FIELDS
+    )
+    assert counts == {"inserted": 2, "updated": 0, "unchanged": 0}
+    updated_at = CompanyAtlasData.objects.get(data_type="siren").updated_at
+
+    counts = CompanyAtlasData.objects.bulk_upsert(
+        [build(company, "1"), build(company, "3", "siret")], KEY_FIELDS
+    )
+    assert counts == {"inserted": 0, "updated": 1, "unchanged": 1}
+    assert CompanyAtlasData.objects.get(data_type="siren").updated_at == updated_at
+    assert CompanyAtlasData.objects.get(data_type="siret").value == "3"
+
+
+@pytest.mark.django_db
+def test_save_update_fields_writes_content_hash(company):
+    data = build(company, "1")
+    data.save()
+    data.value = "2"
+    data.save(update_fields=["value"])
+
+    stored = CompanyAtlasData.objects.get(pk=data.pk)
+    assert stored.content_hash == stored.compute_content_hash() != ""
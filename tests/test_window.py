@@ -0,0 +1,48 @@
+"""Changelist windows pushed down to the providers."""
+
+import pytest
+from django.core.paginator import Paginator
+from django.urls import reverse
+
+from djcompanyatlas.models import CompanyAtlasVirtualCompany
+from djcompanyatlas.pool import get_provider_pool
+
+
+def search(offset, limit, **kwargs):
+    return CompanyAtlasVirtualCompany.objects.search_company(
+        query="acme", offset=offset, limit=limit, ignore_cache=True, **kwargs
+    ).order_by("pk")
+
+
+def test_offset_is_pushed_down(fake_providers):
+    provider = get_provider_pool().get_providers()[0]
+    queryset = search(10, 5)
+    assert provider.calls == 1
+    assert queryset.count() == 16
+    assert len(queryset[10:15]) == 5
+
+
+@pytest.mark.parametrize(("results", "pages"), [(10, 2), (11, 3), (20, 4)])
+def test_last_page_is_never_empty(fake_providers, results, pages):
+    fake_providers({"results": results})
+    for number in range(1, pages + 1):
+        paginator = Paginator(search((number - 1) * 5, 5), 5)
+        assert paginator.num_pages >= number
+        assert len(paginator.page(number).object_list) > 0
+    assert Paginator(search((pages - 1) * 5, 5), 5).num_pages == pages
+
+
+def test_window_without_pool_uses_the_full_results(fake_providers, settings):
+    settings.COMPANYATLAS = {**settings.COMPANYATLAS, "PROVIDER_POOL": False}
+    full = CompanyAtlasVirtualCompany.objects.search_company(query="acme", ignore_cache=True)
+    assert search(5, 5).count() == full.count()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("model", ["companyatlasvirtualdocument", "companyatlasvirtualevent"])
+def test_company_code_search_box(fake_providers, admin_client, model):
+    url = reverse(f"admin:djcompanyatlas_{model}_changelist")
+    response = admin_client.get(url, {"q": "552100554"})
+    assert response.status_code == 200
+    assert b'id="searchbar"' in response.content
+    assert len(response.context["cl"].result_list) == 5